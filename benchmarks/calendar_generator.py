@@ -0,0 +1,137 @@
+"""
+Seeded generator of synthetic calendars.
+
+The same seed always gives the same events (IDs included), so that runs
+of the benchmarks can be compared.
+"""
+
+import datetime
+import random
+import uuid
+from collections.abc import Iterator
+
+from dateutil import rrule
+
+from comnuoc.calendar.domain.event.event import (
+    Event,
+    EventDateTimeRange,
+    EventId,
+    EventInterval,
+    EventTitle,
+)
+
+TITLE_WORDS = [
+    "Team",
+    "Weekly",
+    "Project",
+    "Review",
+    "Planning",
+    "Lunch",
+    "Dentist",
+    "Birthday",
+    "Standup",
+    "Workshop",
+    "Call",
+    "Gym",
+    "Training",
+    "Interview",
+    "Retrospective",
+    "Anniversary",
+]
+
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+
+class CalendarGenerator(object):
+    """
+    Events start in the `years` years before `endDate`, between 07:00 and 21:00
+    (UTC), and last from 15 minutes to 3 hours.
+    A share (`recurringRatio`) of them is recurring, with a frequency picked
+    by the `frequencies` weights, and either no end, a COUNT or an UNTIL.
+    """
+
+    FREQUENCIES = {"DAILY": 1, "WEEKLY": 4, "MONTHLY": 3, "YEARLY": 2}
+
+    def __init__(
+        self,
+        seed: int = 0,
+        recurringRatio: float = 0.2,
+        years: int = 5,
+        endDate: datetime.datetime = None,
+        frequencies: dict[str, int] = None,
+    ) -> None:
+        if endDate is None:
+            endDate = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+        if frequencies is None:
+            frequencies = self.FREQUENCIES
+
+        self._random = random.Random(seed)
+        self._recurringRatio = recurringRatio
+        self._startDate = endDate - datetime.timedelta(days=365 * years)
+        self._days = 365 * years
+        self._frequencies = list(frequencies)
+        self._frequencyWeights = list(frequencies.values())
+
+    def generate(self, count: int) -> Iterator[Event]:
+        for i in range(count):
+            yield self.createEvent()
+
+    def createEvent(self) -> Event:
+        startDate = self.createDate() + datetime.timedelta(
+            hours=self._random.randint(7, 20), minutes=15 * self._random.randint(0, 3)
+        )
+        endDate = startDate + datetime.timedelta(
+            minutes=15 * self._random.randint(1, 12)
+        )
+        interval = None
+
+        if self._random.random() < self._recurringRatio:
+            interval = EventInterval(
+                rrule.rrulestr(self.__createRule(startDate), dtstart=startDate)
+            )
+
+        return Event(
+            id=EventId(uuid.UUID(int=self._random.getrandbits(128), version=4)),
+            title=EventTitle(" ".join(self._random.sample(TITLE_WORDS, 2))),
+            dateTimeRange=EventDateTimeRange(startDate, endDate),
+            isRecurrent=interval is not None,
+            recurrenceInterval=interval,
+        )
+
+    def createDate(self) -> datetime.datetime:
+        """
+        Return a random midnight (UTC) in the generated period.
+        """
+        return self._startDate + datetime.timedelta(
+            days=self._random.randrange(self._days)
+        )
+
+    def sample(self, values: list, count: int) -> list:
+        """
+        Return `count` distinct values, picked by the seeded generator.
+        """
+        return self._random.sample(values, count)
+
+    def __createRule(self, startDate: datetime.datetime) -> str:
+        freq = self._random.choices(self._frequencies, self._frequencyWeights)[0]
+        parts = [f"FREQ={freq}"]
+
+        if self._random.random() < 0.3:
+            parts.append(f"INTERVAL={self._random.randint(2, 3)}")
+
+        if "WEEKLY" == freq and self._random.random() < 0.5:
+            byWeekDay = self._random.sample(WEEKDAYS, self._random.randint(1, 3))
+            parts.append(f"BYDAY={','.join(byWeekDay)}")
+
+        end = self._random.random()
+
+        if end < 0.3:
+            parts.append(f"COUNT={self._random.randint(2, 50)}")
+        elif end < 0.6:
+            untilDate = startDate + datetime.timedelta(
+                days=self._random.randint(7, 730)
+            )
+            parts.append(f"UNTIL={untilDate.strftime('%Y%m%dT%H%M%SZ')}")
+
+        return ";".join(parts)
@@ -0,0 +1,299 @@
+"""
+Repository and service benchmark.
+
+Fill every events storage with a synthetic calendar of several sizes
+(see benchmarks.calendar_generator) and time the services on it.
+Results are written as JSON, a previous results file can be given
+to print the change of each timing.
+
+    poetry run python -m benchmarks.services --sizes 100,1000 --output results.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+
+from benchmarks.calendar_generator import CalendarGenerator
+
+from comnuoc.calendar.application.service_container import ServiceContainer
+from comnuoc.calendar.application.setting.setting_service import SettingService
+
+from comnuoc.calendar.domain.event.event_repository import DictEventRepository
+
+BACKENDS = ["dict"] + list(SettingService.EVENTS_STORAGES)
+
+# backend, size, operation and timings of the operation
+Result = dict[str, object]
+
+
+def measure(operation: Callable[[object], object], arguments: Iterable) -> dict:
+    """
+    Call the operation once per argument and return the timings in milliseconds.
+    """
+    times = []
+
+    for argument in arguments:
+        startTime = time.perf_counter()
+        operation(argument)
+        times.append((time.perf_counter() - startTime) * 1000)
+
+    return {
+        "runs": len(times),
+        "totalMs": sum(times),
+        "meanMs": statistics.mean(times),
+        "medianMs": statistics.median(times),
+        "minMs": min(times),
+        "maxMs": max(times),
+    }
+
+
+def createContainer(dirName: str, backend: str) -> ServiceContainer:
+    settingsPath = os.path.join(dirName, "settings.ini")
+    storage = "csv" if "dict" == backend else backend
+    extension = SettingService.EVENTS_STORAGES[storage]
+
+    with open(settingsPath, "w") as file:
+        file.write(
+            "[comnuoc.calendar]\n"
+            "timeZone = UTC\n"
+            f"eventsStorage = {storage}\n"
+            f"eventsFilePath = {os.path.join(dirName, f'events.{extension}')}\n"
+        )
+
+    container = ServiceContainer(settingsPath)
+
+    if "dict" == backend:
+        container.setProvider(
+            "eventRepository",
+            lambda: DictEventRepository(
+                idNormalizer=container.get("eventIdNormalizer"),
+                idGenerator=container.get("eventIdGenerator"),
+                recurrenceChecker=container.get("eventRecurrenceChecker"),
+            ),
+        )
+
+    return container
+
+
+def closeContainer(container: ServiceContainer) -> None:
+    if not container.has("eventRepository"):
+        return
+
+    repository = container.get("eventRepository")
+
+    if hasattr(repository, "waitForCompaction"):
+        repository.waitForCompaction()
+
+    if hasattr(repository, "close"):
+        repository.close()
+
+
+def runBackend(
+    backend: str, size: int, seed: int, recurringRatio: float, runs: int
+) -> list[Result]:
+    # each event is read, updated or deleted once at most
+    runs = max(1, min(runs, size // 3))
+    generator = CalendarGenerator(seed=seed, recurringRatio=recurringRatio)
+    events = list(generator.generate(size))
+    dates = [generator.createDate() for i in range(runs)]
+    results = []
+
+    def addResult(operation: str, timing: dict) -> None:
+        results.append(
+            {"backend": backend, "size": size, "operation": operation, **timing}
+        )
+
+    with tempfile.TemporaryDirectory() as dirName:
+        container = createContainer(dirName, backend)
+        repository = container.get("eventRepository")
+        addResult("populate (insert)", measure(repository.insert, events))
+
+        if "dict" != backend:
+            # start again as a new process would, with the filled storage
+            closeContainer(container)
+            container = createContainer(dirName, backend)
+
+        eventService = container.getEventService()
+        calendarService = container.getCalendarService()
+        idNormalizer = container.get("eventIdNormalizer")
+        ids = [idNormalizer.normalize(event.getId()) for event in events]
+        # separate samples, so that no event is deleted before being read
+        sample = generator.sample(ids, 3 * runs)
+        readIds = sample[:runs]
+        updateIds = sample[runs : 2 * runs]
+        deleteIds = sample[2 * runs :]
+
+        addResult(
+            "getEventsByDate (first)",
+            measure(
+                lambda date: eventService.getEventsByDate(
+                    date.year, date.month, date.day
+                ),
+                dates[:1],
+            ),
+        )
+        addResult(
+            "getEventsByDate",
+            measure(
+                lambda date: eventService.getEventsByDate(
+                    date.year, date.month, date.day
+                ),
+                dates,
+            ),
+        )
+        addResult(
+            "getMonthDates",
+            measure(
+                lambda date: calendarService.getMonthDates(date.year, date.month), dates
+            ),
+        )
+        addResult(
+            "getYearDates",
+            measure(lambda date: calendarService.getYearDates(date.year), dates),
+        )
+        addResult("getEvent", measure(eventService.getEvent, readIds))
+        queries = [eventService.getEvent(id).title.split()[0].lower() for id in readIds]
+        addResult(
+            "searchEvents (first)", measure(eventService.searchEvents, queries[:1])
+        )
+        addResult("searchEvents", measure(eventService.searchEvents, queries))
+
+        newDtos = []
+
+        for id in readIds:
+            dto = eventService.getEvent(id)
+            dto.id = None
+            dto.title = f"New {dto.title}"
+            newDtos.append(dto)
+
+        addResult("insertEvent", measure(eventService.insertEvent, newDtos))
+        addResult("insertEvents (batch)", measure(eventService.insertEvents, [newDtos]))
+
+        updateDtos = []
+
+        for id in updateIds:
+            dto = eventService.getEvent(id)
+            dto.title = f"Updated {dto.title}"
+            updateDtos.append(dto)
+
+        addResult("updateEvent", measure(eventService.updateEvent, updateDtos))
+        addResult(
+            "updateEvents (batch)", measure(eventService.updateEvents, [updateDtos])
+        )
+        addResult("deleteEvent", measure(eventService.deleteEvent, deleteIds))
+
+        closeContainer(container)
+
+    return results
+
+
+def compareResults(results: list[Result], baseline: list[Result]) -> dict:
+    """
+    Return (backend, size, operation) => ratio of the median times.
+    """
+    baselineTimes = {
+        (result["backend"], result["size"], result["operation"]): result["medianMs"]
+        for result in baseline
+    }
+    ratios = {}
+
+    for result in results:
+        key = (result["backend"], result["size"], result["operation"])
+
+        if baselineTimes.get(key):
+            ratios[key] = result["medianMs"] / baselineTimes[key]
+
+    return ratios
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default="100,1000,5000",
+        help="comma separated numbers of events (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--backends",
+        default=",".join(BACKENDS),
+        help="comma separated events storages (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--recurring",
+        type=float,
+        default=0.2,
+        help="share of recurring events (default: %(default)s)",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="generator seed")
+    parser.add_argument(
+        "--runs", type=int, default=20, help="number of calls per operation"
+    )
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--baseline", help="JSON results of a previous run")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    backends = [backend.strip() for backend in args.backends.split(",")]
+
+    for backend in backends:
+        if backend not in BACKENDS:
+            parser.error(f'Unknown backend "{backend}", use: {", ".join(BACKENDS)}')
+
+    results = []
+
+    for backend in backends:
+        for size in sizes:
+            results.extend(
+                runBackend(backend, size, args.seed, args.recurring, args.runs)
+            )
+
+    ratios = {}
+
+    if args.baseline is not None:
+        with open(args.baseline, encoding="utf-8") as file:
+            ratios = compareResults(results, json.load(file)["results"])
+
+    print(f"{'backend':8} {'size':>7} {'operation':24} {'median':>10} {'mean':>10}")
+
+    for result in results:
+        key = (result["backend"], result["size"], result["operation"])
+        line = (
+            f"{result['backend']:8} {result['size']:>7} {result['operation']:24}"
+            f" {result['medianMs']:>7.3f} ms {result['meanMs']:>7.3f} ms"
+        )
+
+        if key in ratios:
+            line += f" {(ratios[key] - 1) * 100:+7.1f} %"
+
+        print(line)
+
+    if args.output is not None:
+        data = {
+            "metadata": {
+                "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "seed": args.seed,
+                "recurringRatio": args.recurring,
+                "runs": args.runs,
+                "sizes": sizes,
+                "backends": backends,
+            },
+            "results": results,
+        }
+
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Startup benchmark.
+
+Launch the CLI application (with a temporary settings and events file)
+and measure the time until its menu prompt appears on stdout, then exit it.
+Report the slowest imports of a run under `python -X importtime`.
+Exit with status 1 if the startup time is over the budget.
+
+    poetry run python -m benchmarks.startup --budget 300
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from comnuoc.calendar.presentation.cli.application import Application
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# the prompt is written (and flushed) by input() when the menu is displayed
+MENU_PROMPT = (Application.MENU_PROMPT + ": ").encode()
+EXIT_ACTION = str(Application.EXIT_ACTION)
+CHILD_SCRIPT = """
+import sys
+
+from comnuoc.calendar.presentation.cli.application import Application
+
+Application(sys.argv[1]).run()
+"""
+
+# (name, self time, cumulative time, depth), times are in microseconds
+ImportTime = tuple[str, int, int, int]
+
+
+def parseImportTimes(output: str) -> list[ImportTime]:
+    """
+    Parse the `-X importtime` lines.
+    """
+    importTimes = []
+
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        columns = line[len("import time:") :].split("|")
+
+        if 3 != len(columns) or not columns[0].strip().isdigit():
+            continue
+
+        # the name is preceded by one space and 2 spaces per nesting level
+        name = columns[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+
+        importTimes.append((name.strip(), int(columns[0]), int(columns[1]), depth))
+
+    return importTimes
+
+
+def runApplication(pythonOptions: list[str] = None) -> tuple[float, str]:
+    """
+    Return the time (in seconds) from the launch of the application
+    until its menu prompt appears, and its stderr output.
+    """
+    pythonOptions = pythonOptions or []
+
+    with tempfile.TemporaryDirectory() as dirName:
+        settingsPath = os.path.join(dirName, "settings.ini")
+
+        with open(settingsPath, "w") as file:
+            file.write(
+                "[comnuoc.calendar]\n"
+                f"eventsFilePath = {os.path.join(dirName, 'events.csv')}\n"
+            )
+
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            [os.path.join(ROOT_DIR, "src")]
+            + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else [])
+        )
+        env["TERM"] = "dumb"
+        startTime = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable] + pythonOptions + ["-c", CHILD_SCRIPT, settingsPath],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+        )
+        output = b""
+        startupTime = None
+
+        while startupTime is None:
+            chunk = os.read(process.stdout.fileno(), 65536)
+
+            if b"" == chunk:
+                break
+
+            output += chunk
+
+            if MENU_PROMPT in output:
+                startupTime = time.perf_counter() - startTime
+
+        stdout, stderr = process.communicate((EXIT_ACTION + "\n").encode())
+
+    if 0 != process.returncode or startupTime is None:
+        raise RuntimeError(
+            f"The application failed:\n{(output + stdout + stderr).decode()}"
+        )
+
+    return startupTime, stderr.decode()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=float(os.environ.get("CALENDAR_STARTUP_BUDGET_MS", 300)),
+        help="maximum time until the menu prompt in milliseconds"
+        " (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--top", type=int, default=10, help="number of slowest modules to report"
+    )
+    parser.add_argument(
+        "--runs", type=int, default=3, help="number of runs, the best one is kept"
+    )
+    args = parser.parse_args()
+
+    startupTime = min(runApplication()[0] for i in range(max(args.runs, 1)))
+    # a separate run, importtime slows the imports down
+    importTimes = parseImportTimes(runApplication(["-X", "importtime"])[1])
+
+    print(f"Time until the menu prompt: {startupTime * 1000:.1f} ms")
+    print(f"Slowest modules (self time):")
+
+    for name, selfTime, cumulative, depth in sorted(
+        importTimes, key=lambda importTime: -importTime[1]
+    )[: args.top]:
+        print(f"  {selfTime / 1000:8.1f} ms  {cumulative / 1000:8.1f} ms  {name}")
+
+    if startupTime * 1000 > args.budget:
+        print(f"Over the budget of {args.budget:.1f} ms.", file=sys.stderr)
+
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,44 @@
+import argparse
+import os
+
+from comnuoc.calendar.application.service_container import ServiceContainer
 from comnuoc.calendar.presentation.cli.application import Application
 
-app = Application()
-app.run(True)
+parser = argparse.ArgumentParser(description="Simple Calendar")
+parser.add_argument(
+    "--profile",
+    action="store_true",
+    default=os.environ.get("CALENDAR_PROFILE", "") not in ["", "0"],
+    help="print the profile of each action (or set CALENDAR_PROFILE=1)",
+)
+parser.add_argument(
+    "--profile-output",
+    default=os.environ.get("CALENDAR_PROFILE_OUTPUT"),
+    help="append the profile of each action as a JSON line to this file"
+    " (or set CALENDAR_PROFILE_OUTPUT)",
+)
+parser.add_argument(
+    "--import-ics",
+    metavar="PATH",
+    help="import the events of an iCalendar file, then exit",
+)
+parser.add_argument(
+    "--export-ics",
+    metavar="PATH",
+    help="export all events to an iCalendar file, then exit",
+)
+args = parser.parse_args()
+
+if args.import_ics is not None or args.export_ics is not None:
+    icsService = ServiceContainer().getEventIcsService()
+
+    if args.import_ics is not None:
+        count = icsService.importFile(args.import_ics)
+        print(f"{count} events imported from {args.import_ics}")
+
+    if args.export_ics is not None:
+        icsService.exportFile(args.export_ics)
+        print(f"Events exported to {args.export_ics}")
+else:
+    app = Application(profile=args.profile, profileOutputPath=args.profile_output)
+    app.run(True)
@@ -2,10 +2,11 @@ import datetime
 
 from dateutil import relativedelta
 
+from comnuoc.calendar.domain.event.event_repository import EventRepository
 from comnuoc.calendar.domain.util.calendar import CalendarUtil
 from comnuoc.calendar.domain.util.datetime_range import DateTimeRange
+from comnuoc.calendar.domain.util.profiler import Profiler
 
-from comnuoc.calendar.infrastructure.event.event_repository import EventRepository
 from comnuoc.calendar.infrastructure.util.setting_repository import (
     FileSettingRepository,
 )
@@ -16,52 +17,113 @@ class CalendarService(object):
     WeekDateHasEvent = bool
     WeekDates = tuple[WeekDateYear, WeekDateMonth, WeekDateDay, WeekDateHasEvent]
     WeekDatesResponse = tuple[WeekNumber, list[WeekDates]]
+    MonthNumber = int
+    MonthDatesResponse = tuple[MonthNumber, list[WeekDatesResponse]]
 
     def __init__(
         self,
         settings: FileSettingRepository,
         calendarUtil: CalendarUtil,
         eventRepository: EventRepository,
+        profiler: Profiler = None,
     ) -> None:
+        if profiler is None:
+            profiler = Profiler()
+
         self._settings = settings
         self._calendarUtil = calendarUtil
         self._eventRepository = eventRepository
+        self._profiler = profiler
 
     def getMonthDates(self, year: int, month: int) -> list[WeekDatesResponse]:
-        monthDates = []
-        weekDatesTuples = self._calendarUtil.getMonthDates(year, month)
+        with self._profiler.measure("CalendarService.getMonthDates"):
+            monthDates = []
+            weekDatesTuples = self._calendarUtil.getMonthDates(year, month)
+            occupiedDates = self.__findOccupiedDates(
+                weekDatesTuples[0][1][0], weekDatesTuples[-1][1][-1]
+            )
 
-        for weekDatesTuple in weekDatesTuples:
-            monthDates.append(self.__createWeekDatesResponse(weekDatesTuple))
+            for weekDatesTuple in weekDatesTuples:
+                monthDates.append(
+                    self.__createWeekDatesResponse(weekDatesTuple, occupiedDates)
+                )
 
-        return monthDates
+            return monthDates
 
     def getWeekDates(self, year: int, week: int) -> WeekDatesResponse:
-        return self.__createWeekDatesResponse(
-            self._calendarUtil.getWeekDates(year, week)
-        )
+        with self._profiler.measure("CalendarService.getWeekDates"):
+            weekDatesTuple = self._calendarUtil.getWeekDates(year, week)
+            occupiedDates = self.__findOccupiedDates(
+                weekDatesTuple[1][0], weekDatesTuple[1][-1]
+            )
+
+            return self.__createWeekDatesResponse(weekDatesTuple, occupiedDates)
+
+    def getYearDates(self, year: int) -> list[MonthDatesResponse]:
+        """
+        Return the weeks of each month of the year.
+        Occupied dates of the whole year are found at once.
+        """
+        with self._profiler.measure("CalendarService.getYearDates"):
+            monthWeekDatesTuples = [
+                self._calendarUtil.getMonthDates(year, month) for month in range(1, 13)
+            ]
+            occupiedDates = self.__findOccupiedDates(
+                monthWeekDatesTuples[0][0][1][0], monthWeekDatesTuples[-1][-1][1][-1]
+            )
+            yearDates = []
+
+            for month, weekDatesTuples in enumerate(monthWeekDatesTuples, 1):
+                monthDates = []
+
+                for weekDatesTuple in weekDatesTuples:
+                    monthDates.append(
+                        self.__createWeekDatesResponse(weekDatesTuple, occupiedDates)
+                    )
+
+                yearDates.append((month, monthDates))
+
+            return yearDates
+
+    def getRangeOccupancy(
+        self, startDate: datetime.date, endDate: datetime.date
+    ) -> dict[datetime.date, bool]:
+        """
+        Return whether each date between the dates (included) has an event.
+        """
+        with self._profiler.measure("CalendarService.getRangeOccupancy"):
+            if startDate > endDate:
+                return {}
+
+            occupiedDates = self.__findOccupiedDates(startDate, endDate)
+            occupancy = {}
+
+            for days in range((endDate - startDate).days + 1):
+                date = startDate + datetime.timedelta(days=days)
+                occupancy[date] = date in occupiedDates
+
+            return occupancy
 
     def __createWeekDatesResponse(
-        self, weekDates: CalendarUtil.WeekDatesTuple
+        self, weekDates: CalendarUtil.WeekDatesTuple, occupiedDates: set[datetime.date]
     ) -> WeekDatesResponse:
         weekNumber, dates = weekDates
         dateTuples = [
-            (
-                date.year,
-                date.month,
-                date.day,
-                self.__hasDayEvent(year=date.year, month=date.month, day=date.day),
-            )
-            for date in dates
+            (date.year, date.month, date.day, date in occupiedDates) for date in dates
         ]
 
         return (weekNumber, dateTuples)
 
-    def __hasDayEvent(self, year: int, month: int, day: int) -> bool:
+    def __findOccupiedDates(
+        self, firstDate: datetime.date, lastDate: datetime.date
+    ) -> set[datetime.date]:
+        tzInfo = self._settings.getSnapshot().getTzInfo()
         startDate = datetime.datetime(
-            year=year, month=month, day=day, tzinfo=self._settings.getTzInfo()
+            year=firstDate.year, month=firstDate.month, day=firstDate.day, tzinfo=tzInfo
         )
-        endDate = startDate + relativedelta.relativedelta(days=+1)
+        endDate = datetime.datetime(
+            year=lastDate.year, month=lastDate.month, day=lastDate.day, tzinfo=tzInfo
+        ) + relativedelta.relativedelta(days=+1)
         range = DateTimeRange(startDate, endDate, True, False)
 
-        return self._eventRepository.hasEventInRange(range)
+        return self._eventRepository.findOccupiedDates(range)
@@ -0,0 +1,241 @@
+import datetime
+from collections.abc import Iterable, Iterator
+from typing import Union
+
+from comnuoc.calendar.domain.event.event_occurrence_stream import (
+    EventOccurrenceStream,
+)
+from comnuoc.calendar.domain.event.event_repository import EventRepository
+from comnuoc.calendar.domain.util.datetime_range import DateTimeRange
+from comnuoc.calendar.domain.util.profiler import Profiler
+
+from comnuoc.calendar.infrastructure.util.setting_repository import (
+    FileSettingRepository,
+)
+
+
+class FreeBusyService(object):
+    """
+    Busy blocks and free slots of one or more event repositories.
+    Occurrences are streamed in chronological order and merged into busy blocks
+    by a sweep line, so that slots are found without expanding the whole range.
+    Occurrences which start before the range but end in it are found by looking
+    back by the duration of the longest event which occupies the start of the range.
+    Naive dates are in the time zone of the settings,
+    returned dates are in the time zone of the settings.
+    """
+
+    SlotStartDate = SlotEndDate = datetime.datetime
+    Slot = tuple[SlotStartDate, SlotEndDate]
+
+    def __init__(
+        self,
+        settings: FileSettingRepository,
+        repositories: Iterable[EventRepository],
+        occurrenceStream: EventOccurrenceStream,
+        profiler: Profiler = None,
+    ) -> None:
+        if profiler is None:
+            profiler = Profiler()
+
+        self._settings = settings
+        self._repositories = list(repositories)
+        self._occurrenceStream = occurrenceStream
+        self._profiler = profiler
+
+    def getBusyBlocks(
+        self, startDate: datetime.datetime, endDate: datetime.datetime
+    ) -> list[Slot]:
+        with self._profiler.measure("FreeBusyService.getBusyBlocks"):
+            return list(self.iterBusyBlocks(startDate, endDate))
+
+    def iterBusyBlocks(
+        self, startDate: datetime.datetime, endDate: datetime.datetime
+    ) -> Iterator[Slot]:
+        """
+        Yield the merged occurrences between the dates, cut at the dates.
+        """
+        startDate, endDate = self.__localize(startDate, endDate)
+        occurrences = self._occurrenceStream.iterate(
+            self._repositories, startDate - self.__getLookback(startDate), endDate
+        )
+        block = None
+
+        for occurrenceStartDate, occurrenceEndDate, event in occurrences:
+            if occurrenceEndDate <= startDate:
+                continue
+
+            occurrenceStartDate = max(occurrenceStartDate, startDate)
+            occurrenceEndDate = min(occurrenceEndDate, endDate)
+
+            if block is not None and occurrenceStartDate <= block[1]:
+                block = (block[0], max(block[1], occurrenceEndDate))
+            else:
+                if block is not None:
+                    yield block
+
+                block = (occurrenceStartDate, occurrenceEndDate)
+
+        if block is not None:
+            yield block
+
+    def iterFreeSlots(
+        self,
+        startDate: datetime.datetime,
+        endDate: datetime.datetime,
+        duration: datetime.timedelta = datetime.timedelta(),
+        dayStartTime: datetime.time = None,
+        dayEndTime: datetime.time = None,
+    ) -> Iterator[Slot]:
+        """
+        Yield the free slots (at least as long as the duration) between the dates,
+        within the hours of each day (dayStartTime to dayEndTime, midnight
+        is the end of the day) if given.
+        """
+        if (
+            dayEndTime is not None
+            and datetime.time() != dayEndTime
+            and dayEndTime <= (dayStartTime or datetime.time())
+        ):
+            raise ValueError("The day end time should be after the day start time.")
+
+        return self.__iterFreeSlots(
+            startDate, endDate, duration, dayStartTime, dayEndTime
+        )
+
+    def findFirstAvailableSlot(
+        self,
+        startDate: datetime.datetime,
+        endDate: datetime.datetime,
+        duration: datetime.timedelta,
+        dayStartTime: datetime.time = None,
+        dayEndTime: datetime.time = None,
+    ) -> Union[Slot, None]:
+        """
+        Return the first free slot of the duration, or None if there is not any.
+        """
+        with self._profiler.measure("FreeBusyService.findFirstAvailableSlot"):
+            freeSlots = self.iterFreeSlots(
+                startDate, endDate, duration, dayStartTime, dayEndTime
+            )
+            freeSlot = next(freeSlots, None)
+            freeSlots.close()
+
+            if freeSlot is None:
+                return None
+
+            return (freeSlot[0], freeSlot[0] + duration)
+
+    def __iterFreeSlots(
+        self,
+        startDate: datetime.datetime,
+        endDate: datetime.datetime,
+        duration: datetime.timedelta,
+        dayStartTime: Union[datetime.time, None],
+        dayEndTime: Union[datetime.time, None],
+    ) -> Iterator[Slot]:
+        startDate, endDate = self.__localize(startDate, endDate)
+        # empty slots are skipped
+        duration = max(duration, datetime.timedelta(microseconds=1))
+        busyBlocks = self.iterBusyBlocks(startDate, endDate)
+        busyBlock = next(busyBlocks, None)
+
+        for windowStartDate, windowEndDate in self.__iterDayWindows(
+            startDate, endDate, dayStartTime, dayEndTime
+        ):
+            slotStartDate = windowStartDate
+
+            while busyBlock is not None and busyBlock[1] <= slotStartDate:
+                busyBlock = next(busyBlocks, None)
+
+            while busyBlock is not None and busyBlock[0] < windowEndDate:
+                if busyBlock[0] - slotStartDate >= duration:
+                    yield (slotStartDate, busyBlock[0])
+
+                slotStartDate = max(slotStartDate, busyBlock[1])
+
+                if busyBlock[1] > windowEndDate:
+                    # the block goes on in the next window
+                    break
+
+                busyBlock = next(busyBlocks, None)
+
+            if windowEndDate - slotStartDate >= duration:
+                yield (slotStartDate, windowEndDate)
+
+    def __getLookback(self, startDate: datetime.datetime) -> datetime.timedelta:
+        """
+        Return the longest duration of the events which occupy the date,
+        occurrences which start up to that duration before the date may end after it.
+        """
+        lookback = datetime.timedelta()
+
+        for repository in self._repositories:
+            events = repository.findOverlapping(DateTimeRange(startDate, startDate))
+
+            try:
+                for event in events:
+                    dateTimeRange = event.getDateTimeRange()
+                    lookback = max(
+                        lookback,
+                        dateTimeRange.getRealEndDate()
+                        - dateTimeRange.getRealStartDate(),
+                    )
+            finally:
+                events.close()  # as https://peps.python.org/pep-0533/
+
+        return lookback
+
+    def __localize(
+        self, startDate: datetime.datetime, endDate: datetime.datetime
+    ) -> tuple[datetime.datetime, datetime.datetime]:
+        tzInfo = self._settings.getSnapshot().getTzInfo()
+
+        if startDate.tzinfo is None:
+            startDate = startDate.replace(tzinfo=tzInfo)
+
+        if endDate.tzinfo is None:
+            endDate = endDate.replace(tzinfo=tzInfo)
+
+        return startDate.astimezone(tzInfo), endDate.astimezone(tzInfo)
+
+    def __iterDayWindows(
+        self,
+        startDate: datetime.datetime,
+        endDate: datetime.datetime,
+        dayStartTime: datetime.time = None,
+        dayEndTime: datetime.time = None,
+    ) -> Iterator[Slot]:
+        if dayStartTime is None and dayEndTime is None:
+            yield (startDate, endDate)
+
+            return
+
+        if dayStartTime is None:
+            dayStartTime = datetime.time()
+
+        date = startDate.date()
+
+        while date <= endDate.date():
+            windowStartDate = datetime.datetime.combine(
+                date, dayStartTime, tzinfo=startDate.tzinfo
+            )
+
+            if dayEndTime is None or datetime.time() == dayEndTime:
+                windowEndDate = datetime.datetime.combine(
+                    date + datetime.timedelta(days=1),
+                    datetime.time(),
+                    tzinfo=startDate.tzinfo,
+                )
+            else:
+                windowEndDate = datetime.datetime.combine(
+                    date, dayEndTime, tzinfo=startDate.tzinfo
+                )
+
+            windowStartDate = max(windowStartDate, startDate)
+            windowEndDate = min(windowEndDate, endDate)
+
+            if windowEndDate > windowStartDate:
+                yield (windowStartDate, windowEndDate)
+
+            date += datetime.timedelta(days=1)
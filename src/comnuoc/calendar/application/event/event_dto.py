@@ -1,9 +1,6 @@
 import datetime
 from typing import Union
 
-from dateutil import rrule
-from recurrent.event_parser import RecurringEvent
-
 from comnuoc.calendar.domain.event.event import *
 from comnuoc.calendar.domain.event.event_serializer import (
     EventIdNormalizer,
@@ -180,7 +177,7 @@ class EventDtoTransformer(object):
         dto.id = self._idNormalizer.normalize(event.getId())
         dto.title = str(event.getTitle())
 
-        tzInfo = self._settings.getTzInfo()
+        tzInfo = self._settings.getSnapshot().getTzInfo()
         startDate = event.getDateTimeRange().getRealStartDate().astimezone(tzInfo)
         endDate = event.getDateTimeRange().getRealEndDate().astimezone(tzInfo)
         dto.dateYear = startDate.year
@@ -242,6 +239,9 @@ class EventDtoTransformer(object):
                 EventRecurrenceAssembler.BYMONTH
             ]
 
+        # imported on demand, as it is slow to import
+        from recurrent.event_parser import RecurringEvent
+
         r = RecurringEvent()
         dto.recurrenceIntervalHumanText = r.format(
             self._intervalNormalizer.normalize(
@@ -257,7 +257,7 @@ class EventDtoTransformer(object):
     def createEventFromDto(self, dto: EventDto, eventId: EventId) -> Event:
         title = EventTitle(dto.title)
 
-        tzInfo = self._settings.getTzInfo()
+        tzInfo = self._settings.getSnapshot().getTzInfo()
         startDate = datetime.datetime(
             year=dto.dateYear,
             month=dto.dateMonth,
@@ -308,13 +308,20 @@ class EventDtoTransformer(object):
     def __ensureRecurrenceIntervalIntegrity(
         self, interval: EventInterval, startDate: datetime.datetime
     ) -> EventInterval:
+        from dateutil import rrule
+
+        from comnuoc.calendar.infrastructure.event.event_occurrence import (
+            RruleComponents,
+        )
+
         rule = interval.getInterval()
 
         # Replace start date and first week day in the rule
         # in order to ensure the integrity.
         if isinstance(rule, rrule.rrule):
-            weekStart = self._settings.getFirstWeekDay()
-            rule = rule.replace(dtstart=startDate, wkst=weekStart)
+            weekStart = self._settings.getSnapshot().getFirstWeekDay()
+            until = RruleComponents(rule).getUntil(startDate.tzinfo)
+            rule = rule.replace(dtstart=startDate, wkst=weekStart, until=until)
             interval = EventInterval(rule)
 
         return interval
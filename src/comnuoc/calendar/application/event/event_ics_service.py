@@ -0,0 +1,127 @@
+import datetime
+import itertools
+from collections.abc import Iterable, Iterator
+
+from comnuoc.calendar.domain.event.event_repository import EventRepository
+from comnuoc.calendar.domain.util.datetime_range import DateTimeRange
+from comnuoc.calendar.domain.util.profiler import Profiler
+
+from comnuoc.calendar.infrastructure.event.ics_serializer import (
+    IcsEventReader,
+    IcsEventWriter,
+)
+from comnuoc.calendar.infrastructure.util.setting_repository import (
+    FileSettingRepository,
+)
+
+
+class EventIcsService(object):
+    """
+    Import and export of iCalendar (.ics) files.
+    Events are streamed: imported by batches through the bulk insert
+    of the repository, exported one by one from the repository iterators.
+    """
+
+    def __init__(
+        self,
+        settings: FileSettingRepository,
+        repository: EventRepository,
+        reader: IcsEventReader,
+        writer: IcsEventWriter,
+        profiler: Profiler = None,
+    ) -> None:
+        if profiler is None:
+            profiler = Profiler()
+
+        self._settings = settings
+        self._repository = repository
+        self._reader = reader
+        self._writer = writer
+        self._profiler = profiler
+
+    def importEvents(self, lines: Iterable[str], batchSize: int = 1000) -> int:
+        """
+        Import the VEVENTs of the lines and return the number of imported events.
+        Events which already exist (same UID) are updated,
+        of the events of a batch with the same UID, the last one is imported.
+        """
+        with self._profiler.measure("EventIcsService.importEvents"):
+            events = self._reader.read(lines, self._settings.getSnapshot().getTzInfo())
+            count = 0
+
+            while True:
+                # the repository does not find events inserted in the transaction
+                batch = {
+                    str(event.getId()): event
+                    for event in itertools.islice(events, batchSize)
+                }
+
+                if 0 == len(batch):
+                    break
+
+                with self._repository.transaction():
+                    insertedEvents = []
+
+                    for event in batch.values():
+                        if self._repository.find(event.getId()) is None:
+                            insertedEvents.append(event)
+                        else:
+                            self._repository.update(event)
+
+                    self._repository.insertMany(insertedEvents)
+
+                count += len(batch)
+
+            return count
+
+    def importFile(self, filePath: str, batchSize: int = 1000) -> int:
+        with open(filePath, encoding="utf-8", newline="") as file:
+            return self.importEvents(file, batchSize)
+
+    def exportEvents(
+        self, startDate: datetime.date = None, endDate: datetime.date = None
+    ) -> Iterator[str]:
+        """
+        Yield the lines of a calendar of all events, or of the events
+        which start (or have an occurrence) between the dates (included).
+        """
+        if startDate is None and endDate is None:
+            events = self._repository.findAll()
+        else:
+            events = self._repository.findByStartDate(
+                self.__createDateRange(startDate, endDate)
+            )
+
+        settingSnapshot = self._settings.getSnapshot()
+
+        yield from self._writer.write(
+            events, settingSnapshot.getTzInfo(), settingSnapshot.getTimeZone()
+        )
+
+    def exportFile(
+        self,
+        filePath: str,
+        startDate: datetime.date = None,
+        endDate: datetime.date = None,
+    ) -> None:
+        with self._profiler.measure("EventIcsService.exportFile"):
+            with open(filePath, "w", encoding="utf-8", newline="") as file:
+                file.writelines(self.exportEvents(startDate, endDate))
+
+    def __createDateRange(
+        self, startDate: datetime.date = None, endDate: datetime.date = None
+    ) -> DateTimeRange:
+        tzInfo = self._settings.getSnapshot().getTzInfo()
+        rangeStartDate = rangeEndDate = None
+
+        if startDate is not None:
+            rangeStartDate = datetime.datetime(
+                startDate.year, startDate.month, startDate.day, tzinfo=tzInfo
+            )
+
+        if endDate is not None:
+            rangeEndDate = datetime.datetime(
+                endDate.year, endDate.month, endDate.day, tzinfo=tzInfo
+            ) + datetime.timedelta(days=1)
+
+        return DateTimeRange(rangeStartDate, rangeEndDate, True, False)
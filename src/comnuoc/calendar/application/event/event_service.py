@@ -1,85 +1,498 @@
+import bisect
 import datetime
+import itertools
+from collections.abc import Iterable, Iterator
 from typing import Union
 
 from dateutil import relativedelta
 
 from comnuoc.calendar.application.event.event_dto import EventDto, EventDtoTransformer
 
-from comnuoc.calendar.domain.event.event import *
-from comnuoc.calendar.domain.event.event_serializer import *
+from comnuoc.calendar.domain.event.event import Event
+from comnuoc.calendar.domain.event.event_index import EventTitleIndex
+from comnuoc.calendar.domain.event.event_occurrence_stream import (
+    EventOccurrenceStream,
+)
+from comnuoc.calendar.domain.event.event_repository import EventRepository
+from comnuoc.calendar.domain.event.event_serializer import EventIdNormalizer
 from comnuoc.calendar.domain.util.datetime_range import DateTimeRange
-
-from comnuoc.calendar.infrastructure.event.event_repository import *
-from comnuoc.calendar.infrastructure.event.event_serializer import *
+from comnuoc.calendar.domain.util.profiler import Profiler
 from comnuoc.calendar.infrastructure.util.setting_repository import (
     FileSettingRepository,
 )
 
 
 class EventService(object):
+    OccurrenceStartDate = OccurrenceEndDate = datetime.datetime
+    Occurrence = tuple[OccurrenceStartDate, OccurrenceEndDate, EventDto]
+
+    # occurrences of a recurring event which are checked for conflicts
+    CONFLICT_HORIZON = relativedelta.relativedelta(years=+1)
+
     def __init__(
         self,
         settings: FileSettingRepository,
         idNormalizer: EventIdNormalizer,
         repository: EventRepository,
         dtoTransformer: EventDtoTransformer,
+        occurrenceStream: EventOccurrenceStream,
+        titleIndex: EventTitleIndex,
+        profiler: Profiler = None,
     ) -> None:
+        if profiler is None:
+            profiler = Profiler()
+
         self._settings = settings
         self._idNormalizer = idNormalizer
         self._repository = repository
         self._dtoTransformer = dtoTransformer
+        self._occurrenceStream = occurrenceStream
+        self._titleIndex = titleIndex
+        self._profiler = profiler
 
     def getEvent(self, id: str) -> Union[EventDto, None]:
-        event = self.__getEventById(id, False)
+        with self._profiler.measure("EventService.getEvent"):
+            event = self.__getEventById(id, False)
 
-        if event is None:
-            return None
+            if event is None:
+                return None
 
-        return self._dtoTransformer.createDtoFromEvent(event)
+            return self._dtoTransformer.createDtoFromEvent(event)
 
     def getEventsByDate(self, year: int, month: int, day: int) -> list[EventDto]:
-        tzInfo = self._settings.getTzInfo()
-        startDate = datetime.datetime(year=year, month=month, day=day, tzinfo=tzInfo)
-        endDate = startDate + relativedelta.relativedelta(days=+1)
-        range = DateTimeRange(startDate, endDate, True, False)
+        with self._profiler.measure("EventService.getEventsByDate"):
+            tzInfo = self._settings.getSnapshot().getTzInfo()
+            startDate = datetime.datetime(
+                year=year, month=month, day=day, tzinfo=tzInfo
+            )
+            endDate = startDate + relativedelta.relativedelta(days=+1)
+            range = DateTimeRange(startDate, endDate, True, False)
 
-        events = self._repository.findByStartDate(range)
-        eventDtos = []
+            events = self._repository.findByStartDate(range)
+            eventDtos = []
+
+            try:
+                for event in events:
+                    eventDtos.append(self._dtoTransformer.createDtoFromEvent(event))
+            finally:
+                events.close()  # as https://peps.python.org/pep-0533/
+
+            return eventDtos
+
+    def iterOccurrences(
+        self,
+        startDate: datetime.datetime,
+        endDate: datetime.datetime,
+        limit: int = None,
+        offset: int = 0,
+    ) -> Iterator[Occurrence]:
+        """
+        Lazily yield the occurrences which start between the dates (end date excluded)
+        in chronological order, with their dates in the time zone of the settings.
+        Naive dates are in the time zone of the settings.
+        Occurrences are merged one by one (see EventOccurrenceStream),
+        so that the first ones are yielded without expanding the whole range.
+        """
+        occurrences = self.__iterOccurrences(startDate, endDate)
+
+        if limit is None:
+            return itertools.islice(occurrences, offset, None)
+
+        return itertools.islice(occurrences, offset, offset + limit)
+
+    def searchEvents(
+        self,
+        query: str,
+        startDate: datetime.datetime = None,
+        endDate: datetime.datetime = None,
+        limit: int = 10,
+    ) -> list[EventDto]:
+        """
+        Return the events whose title matches the query, the most relevant first.
+        If the dates are given, only the events which start (or have an occurrence
+        which starts) between them (end date excluded) are returned.
+        Naive dates are in the time zone of the settings.
+        """
+        with self._profiler.measure("EventService.searchEvents"):
+            tzInfo = self._settings.getSnapshot().getTzInfo()
+
+            if startDate is not None and startDate.tzinfo is None:
+                startDate = startDate.replace(tzinfo=tzInfo)
+
+            if endDate is not None and endDate.tzinfo is None:
+                endDate = endDate.replace(tzinfo=tzInfo)
+
+            eventDtos = []
+
+            for id, score in self.__getTitleIndex().search(query):
+                if limit is not None and len(eventDtos) >= limit:
+                    break
+
+                event = self.__getEventById(id)
+
+                if event is None or not self.__occursBetween(event, startDate, endDate):
+                    continue
 
-        try:
-            for event in events:
                 eventDtos.append(self._dtoTransformer.createDtoFromEvent(event))
+
+            return eventDtos
+
+    def findConflicts(self, dto: EventDto) -> list[EventDto]:
+        """
+        Return the other events which overlap the event (a recurring event
+        by its next occurrences in the conflict horizon), ordered by start date.
+        Back-to-back events do not conflict.
+        """
+        with self._profiler.measure("EventService.findConflicts"):
+            if dto.id is None or "" == dto.id:
+                id = self._repository.generateId()
+            else:
+                id = self._idNormalizer.denormalize(dto.id)
+
+            return [
+                self._dtoTransformer.createDtoFromEvent(event)
+                for event in self.__findConflicts(
+                    self._dtoTransformer.createEventFromDto(dto, id)
+                )
+            ]
+
+    def insertEvent(self, dto: EventDto, allowConflicts: bool = True) -> EventDto:
+        """
+        Raise ValueError if the event overlaps other events and conflicts are not allowed.
+        """
+        with self._profiler.measure("EventService.insertEvent"):
+            id = self._repository.generateId()
+            event = self._dtoTransformer.createEventFromDto(dto, id)
+
+            if not allowConflicts:
+                self.__checkConflicts(event)
+
+            isTitleIndexFresh = self.__isTitleIndexFresh()
+            self._repository.insert(event)
+            self.__updateTitleIndex(isTitleIndexFresh, [event], [])
+
+            return self._dtoTransformer.createDtoFromEvent(event)
+
+    def insertEvents(
+        self, dtos: Iterable[EventDto], batchSize: int = 1000
+    ) -> list[str]:
+        """
+        Insert the events by batches and return their IDs.
+        """
+        with self._profiler.measure("EventService.insertEvents"):
+            ids = []
+            dtos = iter(dtos)
+
+            while True:
+                batch = list(itertools.islice(dtos, batchSize))
+
+                if 0 == len(batch):
+                    break
+
+                eventIds = self._repository.generateIds(len(batch))
+                events = [
+                    self._dtoTransformer.createEventFromDto(dto, eventId)
+                    for dto, eventId in zip(batch, eventIds)
+                ]
+                isTitleIndexFresh = self.__isTitleIndexFresh()
+                self._repository.insertMany(events)
+                # the index is saved once, after the last batch
+                self.__updateTitleIndex(isTitleIndexFresh, events, [], False)
+                ids.extend(
+                    self._idNormalizer.normalize(eventId) for eventId in eventIds
+                )
+
+            if len(ids) > 0 and self._titleIndex.isFresh(
+                self._titleIndex.getStoreSignature()
+            ):
+                self._titleIndex.save()
+
+            return ids
+
+    def updateEvent(self, dto: EventDto, allowConflicts: bool = True) -> EventDto:
+        """
+        Raise ValueError if the event overlaps other events and conflicts are not allowed.
+        """
+        with self._profiler.measure("EventService.updateEvent"):
+            if dto.id is None or "" == dto.id:
+                raise KeyError(f"Event ID is required")
+
+            event = self.__getEventById(dto.id, True)
+
+            newEvent = self._dtoTransformer.createEventFromDto(dto, event.getId())
+
+            if not allowConflicts:
+                self.__checkConflicts(newEvent)
+
+            isTitleIndexFresh = self.__isTitleIndexFresh()
+            self._repository.update(newEvent)
+            self.__updateTitleIndex(isTitleIndexFresh, [newEvent], [])
+
+            return self._dtoTransformer.createDtoFromEvent(newEvent)
+
+    def deleteEvent(self, id: str) -> EventDto:
+        with self._profiler.measure("EventService.deleteEvent"):
+            event = self.__getEventById(id, True)
+
+            isTitleIndexFresh = self.__isTitleIndexFresh()
+            self._repository.delete(event)
+            self.__updateTitleIndex(isTitleIndexFresh, [], [event])
+
+            return self._dtoTransformer.createDtoFromEvent(event)
+
+    def updateEvents(self, dtos: Iterable[EventDto]) -> None:
+        """
+        Update the events in one transaction of the repository.
+        """
+        with self._profiler.measure("EventService.updateEvents"):
+            isTitleIndexFresh = self.__isTitleIndexFresh()
+            newEvents = []
+
+            with self._repository.transaction():
+                for dto in dtos:
+                    if dto.id is None or "" == dto.id:
+                        raise KeyError(f"Event ID is required")
+
+                    event = self.__getEventById(dto.id, True)
+                    newEvent = self._dtoTransformer.createEventFromDto(
+                        dto, event.getId()
+                    )
+                    self._repository.update(newEvent)
+                    newEvents.append(newEvent)
+
+            self.__updateTitleIndex(isTitleIndexFresh, newEvents, [])
+
+    def deleteEvents(self, ids: Iterable[str]) -> None:
+        """
+        Delete the events in one transaction of the repository.
+        """
+        with self._profiler.measure("EventService.deleteEvents"):
+            isTitleIndexFresh = self.__isTitleIndexFresh()
+            deletedEvents = []
+
+            with self._repository.transaction():
+                for id in ids:
+                    event = self.__getEventById(id, True)
+                    self._repository.delete(event)
+                    deletedEvents.append(event)
+
+            self.__updateTitleIndex(isTitleIndexFresh, [], deletedEvents)
+
+    def __iterOccurrences(
+        self, startDate: datetime.datetime, endDate: datetime.datetime
+    ) -> Iterator[Occurrence]:
+        tzInfo = self._settings.getSnapshot().getTzInfo()
+
+        if startDate.tzinfo is None:
+            startDate = startDate.replace(tzinfo=tzInfo)
+
+        if endDate.tzinfo is None:
+            endDate = endDate.replace(tzinfo=tzInfo)
+
+        occurrences = self._occurrenceStream.iterate(
+            [self._repository], startDate.astimezone(tzInfo), endDate
+        )
+
+        for occurrenceStartDate, occurrenceEndDate, event in occurrences:
+            yield (
+                occurrenceStartDate,
+                occurrenceEndDate,
+                self._dtoTransformer.createDtoFromEvent(event),
+            )
+
+    def __findConflicts(self, event: Event) -> list[Event]:
+        """
+        The span of the occurrences of the event is looked up once
+        in the interval index of the repository. When the event occurs
+        more than once, the occurrences of the events in the span
+        are checked against its occurrences.
+        """
+        tzInfo = self._settings.getSnapshot().getTzInfo()
+        normalizedId = self._idNormalizer.normalize(event.getId())
+        startDate = event.getDateTimeRange().getRealStartDate().astimezone(tzInfo)
+
+        if event.isRecurrent():
+            # past occurrences do not conflict
+            startDate = max(startDate, datetime.datetime.now(tzInfo))
+
+        occurrences = self._occurrenceStream.iterateEvent(
+            event, startDate, startDate + self.CONFLICT_HORIZON
+        )
+        # the end date is not occupied, unless the event is a point in time
+        startDates, endDates = [], []
+
+        for occurrenceStartDate, occurrenceEndDate, occurrenceEvent in occurrences:
+            startDates.append(occurrenceStartDate)
+            endDates.append(
+                self.__getLastOccupiedDate(occurrenceStartDate, occurrenceEndDate)
+            )
+
+        if len(startDates) == 0:
+            return []
+
+        events = self._repository.findOverlapping(
+            DateTimeRange(startDates[0], endDates[-1], True, True)
+        )
+        conflicts = {}
+
+        try:
+            for otherEvent in events:
+                otherId = self._idNormalizer.normalize(otherEvent.getId())
+
+                if otherId == normalizedId:
+                    continue
+
+                if len(startDates) == 1 or self.__overlapsOccurrences(
+                    otherEvent, startDates, endDates
+                ):
+                    conflicts[otherId] = otherEvent
         finally:
             events.close()  # as https://peps.python.org/pep-0533/
 
-        return eventDtos
+        return sorted(
+            conflicts.values(),
+            key=lambda otherEvent: otherEvent.getDateTimeRange().getRealStartDate(),
+        )
 
-    def insertEvent(self, dto: EventDto) -> EventDto:
-        id = self._repository.generateId()
-        event = self._dtoTransformer.createEventFromDto(dto, id)
+    def __overlapsOccurrences(
+        self,
+        event: Event,
+        startDates: list[datetime.datetime],
+        endDates: list[datetime.datetime],
+    ) -> bool:
+        """
+        Whether an occurrence of the event overlaps one of the occurrences
+        given by their sorted start dates and last occupied dates.
+        """
+        dateTimeRange = event.getDateTimeRange()
+        duration = dateTimeRange.getRealEndDate() - dateTimeRange.getRealStartDate()
+        occurrences = self._occurrenceStream.iterateEvent(
+            event,
+            startDates[0] - duration,
+            endDates[-1] + datetime.timedelta(microseconds=1),
+        )
 
-        self._repository.insert(event)
+        try:
+            for occurrenceStartDate, occurrenceEndDate, occurrenceEvent in occurrences:
+                lastDate = self.__getLastOccupiedDate(
+                    occurrenceStartDate, occurrenceEndDate
+                )
+                # the first occurrence which does not end before this one
+                i = bisect.bisect_left(endDates, occurrenceStartDate)
 
-        return self._dtoTransformer.createDtoFromEvent(event)
+                if i < len(startDates) and startDates[i] <= lastDate:
+                    return True
+        finally:
+            occurrences.close()  # as https://peps.python.org/pep-0533/
 
-    def updateEvent(self, dto: EventDto) -> EventDto:
-        if dto.id is None or "" == dto.id:
-            raise KeyError(f"Event ID is required")
+        return False
 
-        event = self.__getEventById(dto.id, True)
+    def __getLastOccupiedDate(
+        self, startDate: datetime.datetime, endDate: datetime.datetime
+    ) -> datetime.datetime:
+        return max(startDate, endDate - datetime.timedelta(microseconds=1))
 
-        newEvent = self._dtoTransformer.createEventFromDto(dto, event.getId())
+    def __checkConflicts(self, event: Event) -> None:
+        conflicts = self.__findConflicts(event)
 
-        self._repository.update(newEvent)
+        if len(conflicts) > 0:
+            titles = ", ".join(f'"{otherEvent.getTitle()}"' for otherEvent in conflicts)
 
-        return self._dtoTransformer.createDtoFromEvent(newEvent)
+            raise ValueError(f"Event overlaps {titles}")
 
-    def deleteEvent(self, id: str) -> EventDto:
-        event = self.__getEventById(id, True)
+    def __getTitleIndex(self) -> EventTitleIndex:
+        """
+        Return the title index, loaded from its sidecar file
+        or rebuilt from the events if it is stale.
+        """
+        signature = self._titleIndex.getStoreSignature()
+
+        if self._titleIndex.isFresh(signature):
+            return self._titleIndex
+
+        if self._titleIndex.load(signature):
+            self._profiler.count("EventService.titleIndexLoads")
+
+            return self._titleIndex
+
+        self._profiler.count("EventService.titleIndexBuilds")
+        events = self._repository.findAll()
+
+        try:
+            self._titleIndex.build(
+                signature,
+                (
+                    (self._idNormalizer.normalize(event.getId()), str(event.getTitle()))
+                    for event in events
+                ),
+            )
+        finally:
+            events.close()  # as https://peps.python.org/pep-0533/
+
+        self._titleIndex.save()
+
+        return self._titleIndex
+
+    def __isTitleIndexFresh(self) -> bool:
+        """
+        Whether the title index is fresh before a write,
+        if it is stale, it is rebuilt on the next search instead.
+        """
+        signature = self._titleIndex.getStoreSignature()
+
+        return self._titleIndex.isFresh(signature) or self._titleIndex.load(signature)
+
+    def __updateTitleIndex(
+        self,
+        isTitleIndexFresh: bool,
+        events: list[Event],
+        deletedEvents: list[Event],
+        save: bool = True,
+    ) -> None:
+        """
+        Keep the title index fresh after a write instead of rebuilding it
+        on the next search, if it was fresh before the write.
+        """
+        if not isTitleIndexFresh:
+            return
+
+        for event in deletedEvents:
+            self._titleIndex.remove(self._idNormalizer.normalize(event.getId()))
+
+        for event in events:
+            self._titleIndex.add(
+                self._idNormalizer.normalize(event.getId()), str(event.getTitle())
+            )
+
+        self._titleIndex.setSignature(self._titleIndex.getStoreSignature())
+
+        if save:
+            self._titleIndex.save()
+
+    def __occursBetween(
+        self,
+        event: Event,
+        startDate: Union[datetime.datetime, None],
+        endDate: Union[datetime.datetime, None],
+    ) -> bool:
+        """
+        Return whether the event (or an occurrence) starts between the dates,
+        end date excluded.
+        """
+        if startDate is None and endDate is None:
+            return True
+
+        if startDate is None:
+            startDate = event.getDateTimeRange().getRealStartDate()
+
+        if endDate is not None and endDate <= startDate:
+            return False
 
-        self._repository.delete(event)
+        occurrences = self._occurrenceStream.iterateEvent(event, startDate, endDate)
+        hasOccurrence = next(occurrences, None) is not None
+        occurrences.close()
 
-        return self._dtoTransformer.createDtoFromEvent(event)
+        return hasOccurrence
 
     def __getEventById(
         self, id: str, throwExceptionIfNotFound: bool = False
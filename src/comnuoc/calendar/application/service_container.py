@@ -1,4 +1,7 @@
 import os
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING
 
 from comnuoc.calendar.application.calendar.calendar_service import CalendarService
 from comnuoc.calendar.application.event.event_dto import (
@@ -8,86 +11,351 @@ from comnuoc.calendar.application.event.event_dto import (
 from comnuoc.calendar.application.event.event_service import EventService
 from comnuoc.calendar.application.setting.setting_service import SettingService
 
+from comnuoc.calendar.domain.event.event_index import EventTitleIndex
+from comnuoc.calendar.domain.event.event_occurrence_stream import (
+    EventOccurrenceStream,
+)
+from comnuoc.calendar.domain.event.event_repository import (
+    EventIdGenerator,
+    EventRecurrenceChecker,
+    EventRepository,
+)
 from comnuoc.calendar.domain.event.event_serializer import EventNormalizer
 from comnuoc.calendar.domain.util.calendar import CalendarUtil
+from comnuoc.calendar.domain.util.profiler import Profiler
 
-from comnuoc.calendar.infrastructure.event.event_repository import (
-    CsvEventRepository,
-    EventIdUuidGenerator,
-    EventRecurrenceRruleChecker,
+from comnuoc.calendar.infrastructure.event.event_serializer import (
+    EventIdUuidNormalizer,
+    EventIntervalRruleNormalizer,
 )
-from comnuoc.calendar.infrastructure.event.event_serializer import *
 from comnuoc.calendar.infrastructure.util.setting_repository import (
     FileSettingRepository,
 )
 
+if TYPE_CHECKING:
+    from comnuoc.calendar.application.calendar.free_busy_service import (
+        FreeBusyService,
+    )
+    from comnuoc.calendar.application.event.event_ics_service import EventIcsService
+    from comnuoc.calendar.infrastructure.util.time_zone_names import (
+        TimeZoneNameRepository,
+    )
+
 
 class ServiceContainer(object):
-    def __init__(self, settingsPath: str = None) -> None:
-        # @todo: lazy initialize services
-        self._services = {}
-        dirName = os.path.dirname(__file__)
+    """
+    Registry of service providers.
+    Each service is built by its provider on first use (get() or get*Service())
+    and shared afterward. Providers can be replaced by setProvider()
+    (e.g. in tests and benchmarks) before the service is built.
+    Modules of the event storages, of the title index and of the services
+    which are not used by every run (ICS, free/busy) are imported
+    by the providers, so that only the used ones are imported.
+    The profiler records the hot paths of the services only if profile is True.
+    """
+
+    def __init__(self, settingsPath: str = None, profile: bool = False) -> None:
+        self._dirName = os.path.dirname(__file__)
 
         if settingsPath is None:
-            settingsPath = os.path.join(dirName, "data", "settings.ini")
+            settingsPath = os.path.join(self._dirName, "data", "settings.ini")
+
+        self._settingsPath = settingsPath
+        self._providers: dict[str, Callable[[], object]] = {}
+        self._services: dict[str, object] = {}
+        # service name => construction time (seconds), in the construction order
+        self._constructionTimes: dict[str, float] = {}
+        # construction time of the dependencies of the services being built
+        self._dependencyTimes: list[float] = []
+
+        self.setProvider("profiler", lambda: Profiler(profile))
+        self.setProvider("settingRepository", self.__createSettingRepository)
+        self.setProvider("calendarUtil", self.__createCalendarUtil)
+        self.setProvider("timeZoneNameRepository", self.__createTimeZoneNameRepository)
+        self.setProvider("setting", self.__createSettingService)
+        self.setProvider("eventIdNormalizer", EventIdUuidNormalizer)
+        self.setProvider("eventIntervalNormalizer", EventIntervalRruleNormalizer)
+        self.setProvider("eventNormalizer", self.__createEventNormalizer)
+        self.setProvider("eventIdGenerator", self.__createEventIdGenerator)
+        self.setProvider("eventRecurrenceChecker", self.__createRecurrenceChecker)
+        self.setProvider("eventRepository", self.__createEventRepository)
+        self.setProvider("eventOccurrenceStream", self.__createEventOccurrenceStream)
+        self.setProvider("eventTitleIndex", self.__createEventTitleIndex)
+        self.setProvider("eventDtoTransformer", self.__createEventDtoTransformer)
+        self.setProvider("event", self.__createEventService)
+        self.setProvider("calendar", self.__createCalendarService)
+        self.setProvider("eventIcs", self.__createEventIcsService)
+        self.setProvider("freeBusy", lambda: self.createFreeBusyService([]))
+
+    def get(self, name: str) -> object:
+        if name in self._services:
+            return self._services[name]
+
+        if name not in self._providers:
+            raise ValueError(f'Service "{name}" is not registered.')
+
+        self._dependencyTimes.append(0.0)
+        startTime = time.perf_counter()
+
+        try:
+            service = self._providers[name]()
+        finally:
+            elapsedTime = time.perf_counter() - startTime
+            dependencyTime = self._dependencyTimes.pop()
+
+            if len(self._dependencyTimes) > 0:
+                self._dependencyTimes[-1] += elapsedTime
+
+        self._services[name] = service
+        self._constructionTimes[name] = elapsedTime - dependencyTime
+
+        return service
+
+    def setProvider(self, name: str, provider: Callable[[], object]) -> None:
+        self._providers[name] = provider
+        self._services.pop(name, None)
+
+    def has(self, name: str) -> bool:
+        """
+        Return True if the service has already been built.
+        """
+        return name in self._services
+
+    def getConstructionTimes(self) -> dict[str, float]:
+        """
+        Return the construction time (in seconds) of each built service,
+        excluding the time spent building its dependencies.
+        """
+        return dict(self._constructionTimes)
+
+    def getEventService(self) -> EventService:
+        return self.get("event")
+
+    def getCalendarService(self) -> CalendarService:
+        return self.get("calendar")
+
+    def getEventIcsService(self) -> "EventIcsService":
+        return self.get("eventIcs")
+
+    def getFreeBusyService(self) -> "FreeBusyService":
+        return self.get("freeBusy")
+
+    def getSettingService(self) -> SettingService:
+        return self.get("setting")
+
+    def getProfiler(self) -> Profiler:
+        return self.get("profiler")
+
+    def createEventRepository(
+        self, eventsPath: str, eventsStorage: str = None
+    ) -> EventRepository:
+        """
+        Create a repository of another events file,
+        its storage is found from the file extension if not given.
+        """
+        if eventsStorage is None:
+            extension = os.path.splitext(eventsPath)[1][1:]
+
+            for storage, storageExtension in SettingService.EVENTS_STORAGES.items():
+                if extension == storageExtension:
+                    eventsStorage = storage
+
+        if "sqlite" == eventsStorage:
+            from comnuoc.calendar.infrastructure.event.sqlite_event_repository import (
+                SqliteEventRepository,
+            )
+
+            return SqliteEventRepository(
+                idGenerator=self.get("eventIdGenerator"),
+                idNormalizer=self.get("eventIdNormalizer"),
+                normalizer=self.get("eventNormalizer"),
+                recurrenceChecker=self.get("eventRecurrenceChecker"),
+                filePath=eventsPath,
+            )
+        elif "binary" == eventsStorage:
+            from comnuoc.calendar.infrastructure.event.binary_event_repository import (
+                BinaryEventRepository,
+            )
+
+            return BinaryEventRepository(
+                idGenerator=self.get("eventIdGenerator"),
+                idNormalizer=self.get("eventIdNormalizer"),
+                normalizer=self.get("eventNormalizer"),
+                recurrenceChecker=self.get("eventRecurrenceChecker"),
+                filePath=eventsPath,
+            )
+        elif "log" == eventsStorage:
+            from comnuoc.calendar.infrastructure.event.log_event_repository import (
+                LogEventRepository,
+            )
+
+            return LogEventRepository(
+                idGenerator=self.get("eventIdGenerator"),
+                idNormalizer=self.get("eventIdNormalizer"),
+                normalizer=self.get("eventNormalizer"),
+                recurrenceChecker=self.get("eventRecurrenceChecker"),
+                filePath=eventsPath,
+                compactionRatio=self.get("setting").getLogCompactionRatio(),
+            )
+        elif "csv" == eventsStorage:
+            from comnuoc.calendar.infrastructure.event.event_repository import (
+                CsvEventRepository,
+            )
+
+            # write file if not exist
+            if not os.path.isfile(eventsPath):
+                with open(eventsPath, "w") as fp:
+                    pass
+
+            return CsvEventRepository(
+                idGenerator=self.get("eventIdGenerator"),
+                normalizer=self.get("eventNormalizer"),
+                recurrenceChecker=self.get("eventRecurrenceChecker"),
+                filePath=eventsPath,
+                profiler=self.get("profiler"),
+            )
+
+        raise ValueError(f'Events storage "{eventsStorage}" is not supported.')
 
-        settingRepository = FileSettingRepository(settingsPath)
+    def createEventTitleIndex(self, eventsPath: str) -> EventTitleIndex:
+        """
+        Create the title index of an events file, saved next to the file.
+        """
+        from comnuoc.calendar.infrastructure.event.event_index import (
+            EventTitleTrigramIndex,
+        )
+
+        return EventTitleTrigramIndex(
+            filePath=eventsPath + ".titles", storeFilePath=eventsPath
+        )
+
+    def createFreeBusyService(self, eventsPaths: list[str]) -> "FreeBusyService":
+        """
+        Create a service of the busy blocks of the events and of the events files.
+        """
+        from comnuoc.calendar.application.calendar.free_busy_service import (
+            FreeBusyService,
+        )
 
-        defaultEventsPath = os.path.join(dirName, "data", "events.csv")
-        eventsPath = settingRepository.getEventsFilePath(defaultEventsPath)
+        repositories = [self.get("eventRepository")]
 
-        # write file if not exist
-        if not os.path.isfile(eventsPath):
-            with open(eventsPath, "w") as fp:
-                pass
+        for eventsPath in eventsPaths:
+            repositories.append(self.createEventRepository(eventsPath))
 
-        calendarUtil = CalendarUtil(
-            iso8601=settingRepository.getIso8601(),
-            firstWeekDay=settingRepository.getFirstWeekDay(),
+        return FreeBusyService(
+            settings=self.get("settingRepository"),
+            repositories=repositories,
+            occurrenceStream=self.get("eventOccurrenceStream"),
+            profiler=self.get("profiler"),
         )
-        eventIdNormalizer = EventIdUuidNormalizer()
-        eventIntervalNormalizer = EventIntervalRruleNormalizer()
-        eventNormalizer = EventNormalizer(
-            idNormalizer=eventIdNormalizer, intervalNormalizer=eventIntervalNormalizer
+
+    def __createSettingRepository(self) -> FileSettingRepository:
+        return FileSettingRepository(self._settingsPath)
+
+    def __createCalendarUtil(self) -> CalendarUtil:
+        settingSnapshot = self.get("settingRepository").getSnapshot()
+
+        return CalendarUtil(
+            iso8601=settingSnapshot.getIso8601(),
+            firstWeekDay=settingSnapshot.getFirstWeekDay(),
         )
-        eventIdGenerator = EventIdUuidGenerator()
-        eventRecurrenceChecker = EventRecurrenceRruleChecker(
-            calendarUtil.getFirstWeekDay()
+
+    def __createSettingService(self) -> SettingService:
+        return SettingService(
+            settings=self.get("settingRepository"),
+            calendarUtil=self.get("calendarUtil"),
+            defaultEventsDir=os.path.join(self._dirName, "data"),
+            timeZoneNames=self.get("timeZoneNameRepository"),
         )
-        eventRepository = CsvEventRepository(
-            idGenerator=eventIdGenerator,
-            normalizer=eventNormalizer,
-            recurrenceChecker=eventRecurrenceChecker,
-            filePath=eventsPath,
+
+    def __createTimeZoneNameRepository(self) -> "TimeZoneNameRepository":
+        from comnuoc.calendar.infrastructure.util.time_zone_names import (
+            TimeZoneNameRepository,
         )
-        eventDtoTransformer = EventDtoTransformer(
-            settings=settingRepository,
-            idNormalizer=eventIdNormalizer,
-            intervalNormalizer=eventIntervalNormalizer,
-            intervalAssembler=EventRecurrenceAssembler(),
+
+        return TimeZoneNameRepository()
+
+    def __createEventNormalizer(self) -> EventNormalizer:
+        return EventNormalizer(
+            idNormalizer=self.get("eventIdNormalizer"),
+            intervalNormalizer=self.get("eventIntervalNormalizer"),
+            profiler=self.get("profiler"),
+        )
+
+    def __createEventIdGenerator(self) -> EventIdGenerator:
+        from comnuoc.calendar.infrastructure.event.event_repository import (
+            EventIdUuidGenerator,
+        )
+
+        return EventIdUuidGenerator()
+
+    def __createRecurrenceChecker(self) -> EventRecurrenceChecker:
+        from comnuoc.calendar.infrastructure.event.event_repository import (
+            EventRecurrenceRruleChecker,
         )
-        self._services["event"] = EventService(
-            settings=settingRepository,
-            idNormalizer=eventIdNormalizer,
-            repository=eventRepository,
-            dtoTransformer=eventDtoTransformer,
+
+        return EventRecurrenceRruleChecker(
+            self.get("calendarUtil").getFirstWeekDay(), profiler=self.get("profiler")
         )
-        self._services["calendar"] = CalendarService(
-            settings=settingRepository,
-            calendarUtil=calendarUtil,
-            eventRepository=eventRepository,
+
+    def __createEventRepository(self) -> EventRepository:
+        settingService = self.get("setting")
+
+        return self.createEventRepository(
+            settingService.getEventsFilePath(), settingService.getEventsStorage()
         )
-        self._services["setting"] = SettingService(
-            settings=settingRepository,
-            calendarUtil=calendarUtil,
-            defaultEventsPath=defaultEventsPath,
+
+    def __createEventTitleIndex(self) -> EventTitleIndex:
+        return self.createEventTitleIndex(self.get("setting").getEventsFilePath())
+
+    def __createEventOccurrenceStream(self) -> EventOccurrenceStream:
+        return EventOccurrenceStream(self.get("eventRecurrenceChecker"))
+
+    def __createEventDtoTransformer(self) -> EventDtoTransformer:
+        return EventDtoTransformer(
+            settings=self.get("settingRepository"),
+            idNormalizer=self.get("eventIdNormalizer"),
+            intervalNormalizer=self.get("eventIntervalNormalizer"),
+            intervalAssembler=EventRecurrenceAssembler(),
         )
 
-    def getEventService(self) -> EventService:
-        return self._services["event"]
+    def __createEventService(self) -> EventService:
+        return EventService(
+            settings=self.get("settingRepository"),
+            idNormalizer=self.get("eventIdNormalizer"),
+            repository=self.get("eventRepository"),
+            dtoTransformer=self.get("eventDtoTransformer"),
+            occurrenceStream=self.get("eventOccurrenceStream"),
+            titleIndex=self.get("eventTitleIndex"),
+            profiler=self.get("profiler"),
+        )
 
-    def getCalendarService(self) -> CalendarService:
-        return self._services["calendar"]
+    def __createCalendarService(self) -> CalendarService:
+        return CalendarService(
+            settings=self.get("settingRepository"),
+            calendarUtil=self.get("calendarUtil"),
+            eventRepository=self.get("eventRepository"),
+            profiler=self.get("profiler"),
+        )
 
-    def getSettingService(self) -> SettingService:
-        return self._services["setting"]
+    def __createEventIcsService(self) -> "EventIcsService":
+        from comnuoc.calendar.application.event.event_ics_service import (
+            EventIcsService,
+        )
+        from comnuoc.calendar.infrastructure.event.ics_serializer import (
+            IcsEventReader,
+            IcsEventWriter,
+        )
+
+        return EventIcsService(
+            settings=self.get("settingRepository"),
+            repository=self.get("eventRepository"),
+            reader=IcsEventReader(
+                intervalNormalizer=self.get("eventIntervalNormalizer"),
+                idGenerator=self.get("eventIdGenerator"),
+            ),
+            writer=IcsEventWriter(
+                intervalNormalizer=self.get("eventIntervalNormalizer"),
+            ),
+            profiler=self.get("profiler"),
+        )
@@ -1,42 +1,85 @@
 import datetime
 import os
-import tarfile
 from typing import Union
 
-from dateutil import zoneinfo
-
 from comnuoc.calendar.domain.util.calendar import CalendarUtil
 
 from comnuoc.calendar.infrastructure.util.setting_repository import (
     FileSettingRepository,
 )
+from comnuoc.calendar.infrastructure.util.time_zone_names import (
+    TimeZoneNameRepository,
+)
 
 
 class SettingService(object):
+    # storage name => file extension
+    EVENTS_STORAGES = {"csv": "csv", "log": "log", "sqlite": "sqlite", "binary": "bin"}
+
     def __init__(
         self,
         settings: FileSettingRepository,
         calendarUtil: CalendarUtil,
-        defaultEventsPath: str,
+        defaultEventsDir: str,
+        timeZoneNames: TimeZoneNameRepository,
     ) -> None:
         self._settings = settings
         self._calendarUtil = calendarUtil
-        self._defaultEventsPath = defaultEventsPath
+        self._defaultEventsDir = defaultEventsDir
+        self._timeZoneNames = timeZoneNames
 
     def getTimeZone(self) -> Union[str, None]:
-        return self._settings.getTimeZone()
+        return self._settings.getSnapshot().getTimeZone()
 
     def getIso8601(self) -> bool:
-        return self._settings.getIso8601()
+        return self._settings.getSnapshot().getIso8601()
 
     def getFirstWeekDay(self) -> int:
         return self._calendarUtil.getFirstWeekDay()
 
+    def getEventsStorage(self) -> str:
+        return self._settings.getEventsStorage()
+
     def getEventsFilePath(self) -> str:
-        return self._settings.getEventsFilePath(self._defaultEventsPath)
+        return self._settings.getEventsFilePath(self.getDefaultEventsFilePath())
+
+    def getLogCompactionRatio(self) -> float:
+        """
+        Ratio of dead records above which the events log is compacted.
+        """
+        return self._settings.getLogCompactionRatio()
+
+    def getDefaultEventsFilePath(self, storage: str = None) -> str:
+        """
+        Return the default events file of the storage (the current one by default).
+        """
+        if storage is None:
+            storage = self.getEventsStorage()
+
+        extension = self.EVENTS_STORAGES.get(storage, storage)
+
+        return os.path.join(self._defaultEventsDir, f"events.{extension}")
+
+    def isEventsFilePathValid(self, path: str, storage: str) -> bool:
+        """
+        Whether the extension of the events file is the one of the storage,
+        so that a storage is not pointed at a file of another storage.
+        """
+        extension = os.path.splitext(path)[1][1:]
+
+        return extension.lower() == self.EVENTS_STORAGES.get(storage, storage)
+
+    def findTimeZones(self, prefix: str = "", limit: int = None) -> list[str]:
+        return self._timeZoneNames.findNames(prefix, limit)
+
+    def isTimeZoneValid(self, timeZone: Union[str, None]) -> bool:
+        if timeZone is None:
+            return True
+
+        return self._timeZoneNames.isValid(timeZone)
 
     def setTimeZone(self, timeZone: Union[str, None]) -> None:
-        if not self.__isTimeZoneValid(timeZone):
+        if not self.isTimeZoneValid(timeZone):
             raise ValueError(f'Time zone "{timeZone}" is not valid.')
 
         self._settings.setTimeZone(timeZone)
@@ -47,6 +90,12 @@ class SettingService(object):
     def setFirstWeekDay(self, firstWeekDay: int) -> None:
         self._settings.setFirstWeekDay(firstWeekDay)
 
+    def setEventsStorage(self, storage: str) -> None:
+        if storage not in self.EVENTS_STORAGES:
+            raise ValueError(f'Events storage "{storage}" is not valid.')
+
+        self._settings.setEventsStorage(storage)
+
     def setEventsFilePath(self, path: str) -> None:
         dirname = os.path.dirname(path)
 
@@ -59,7 +108,7 @@ class SettingService(object):
         self._settings.setEventsFilePath(path)
 
     def getNow(self) -> dict[str, int]:
-        date = datetime.datetime.now(self._settings.getTzInfo())
+        date = datetime.datetime.now(self._settings.getSnapshot().getTzInfo())
 
         return self.__createDateInfoResponse(date)
 
@@ -81,7 +130,7 @@ class SettingService(object):
             minute=minute,
             second=second,
             microsecond=microsecond,
-            tzinfo=self._settings.getTzInfo(),
+            tzinfo=self._settings.getSnapshot().getTzInfo(),
         )
 
         return self.__createDateInfoResponse(date)
@@ -97,15 +146,3 @@ class SettingService(object):
             "microsecond": date.microsecond,
             "week": self._calendarUtil.calculateWeekNumber(date.date()),
         }
-
-    def __isTimeZoneValid(self, timeZone: Union[str, None]) -> bool:
-        if timeZone is None:
-            return True
-
-        ziPath = os.path.abspath(os.path.dirname(zoneinfo.__file__))
-        zonesFile = tarfile.TarFile.open(
-            os.path.join(ziPath, "dateutil-zoneinfo.tar.gz")
-        )
-        zoneNames = zonesFile.getnames()
-
-        return timeZone in zoneNames
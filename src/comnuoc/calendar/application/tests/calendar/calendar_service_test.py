@@ -0,0 +1,48 @@
+import datetime
+import unittest
+
+from comnuoc.calendar.application.event.event_dto import EventDto
+from comnuoc.calendar.application.tests.service_container_test_mixin import (
+    ServiceContainerTestMixin,
+)
+
+
+class CalendarServiceTest(ServiceContainerTestMixin, unittest.TestCase):
+    def testYearDatesAndRangeOccupancy(self) -> None:
+        dto = EventDto()
+        dto.title = "Monthly"
+        dto.dateYear, dto.dateMonth, dto.dateDay = 2024, 3, 5
+        dto.startDateHour, dto.startDateMinute = 9, 0
+        dto.endDateHour, dto.endDateMinute = 10, 0
+        dto.isRecurrent = True
+        dto.recurrenceIntervalFreq = "MONTHLY"
+        self._container.getEventService().insertEvent(dto)
+        calendarService = self._container.getCalendarService()
+
+        yearDates = calendarService.getYearDates(2024)
+        occupiedDates = sorted(
+            (date[1], date[2])
+            for month, weekDates in yearDates
+            for weekNumber, dates in weekDates
+            for date in dates
+            if date[3] and date[1] == month
+        )
+
+        self.assertEqual([month for month, weekDates in yearDates], list(range(1, 13)))
+        self.assertEqual(yearDates[4][1], calendarService.getMonthDates(2024, 5))
+        self.assertEqual(occupiedDates, [(month, 5) for month in range(3, 13)])
+
+        occupancy = calendarService.getRangeOccupancy(
+            datetime.date(2024, 3, 4), datetime.date(2024, 4, 5)
+        )
+
+        self.assertEqual(len(occupancy), 33)
+        self.assertEqual(
+            [date.day for date, hasEvent in occupancy.items() if hasEvent], [5, 5]
+        )
+        self.assertEqual(
+            calendarService.getRangeOccupancy(
+                datetime.date(2024, 3, 5), datetime.date(2024, 3, 4)
+            ),
+            {},
+        )
@@ -0,0 +1,151 @@
+import datetime
+import os
+import unittest
+
+from dateutil import rrule
+
+from comnuoc.calendar.application.event.event_dto import EventDto
+from comnuoc.calendar.application.event.event_service import EventService
+from comnuoc.calendar.application.tests.service_container_test_mixin import (
+    ServiceContainerTestMixin,
+)
+
+from comnuoc.calendar.domain.event.event import *
+
+
+class FreeBusyServiceTest(ServiceContainerTestMixin, unittest.TestCase):
+    def testFreeBusyOfEventsFiles(self) -> None:
+        eventService = self._container.getEventService()
+        otherPath = os.path.join(self._dir.name, "other.sqlite")
+        otherRepository = self._container.createEventRepository(otherPath)
+        otherEventService = EventService(
+            settings=self._container.get("settingRepository"),
+            idNormalizer=self._container.get("eventIdNormalizer"),
+            repository=otherRepository,
+            dtoTransformer=self._container.get("eventDtoTransformer"),
+            occurrenceStream=self._container.get("eventOccurrenceStream"),
+            titleIndex=self._container.createEventTitleIndex(otherPath),
+        )
+
+        for service, title, day, startHour, endHour, freq in [
+            (eventService, "Stand-up", 4, 9, 10, "DAILY"),
+            (eventService, "Lunch", 4, 12, 13, None),
+            (otherEventService, "Review", 4, 10, 11, None),
+            (otherEventService, "Workshop", 5, 10, 17, None),
+            (otherEventService, "Evening", 5, 21, 23, None),
+        ]:
+            dto = EventDto()
+            dto.title = title
+            dto.dateYear, dto.dateMonth, dto.dateDay = 2024, 3, day
+            dto.startDateHour, dto.startDateMinute = startHour, 0
+            dto.endDateHour, dto.endDateMinute = endHour, 0
+            dto.isRecurrent = freq is not None
+            dto.recurrenceIntervalFreq = freq
+            service.insertEvent(dto)
+
+        freeBusyService = self._container.createFreeBusyService([otherPath])
+        startDate = datetime.datetime(2024, 3, 4)
+
+        self.assertEqual(
+            [
+                (blockStartDate.day, blockStartDate.hour, blockEndDate.hour)
+                for blockStartDate, blockEndDate in freeBusyService.getBusyBlocks(
+                    datetime.datetime(2024, 3, 4, 9, 30),
+                    datetime.datetime(2024, 3, 5, 22),
+                )
+            ],
+            [(4, 9, 11), (4, 12, 13), (5, 9, 17), (5, 21, 22)],
+        )
+
+        duration = datetime.timedelta(minutes=45)
+        slots = freeBusyService.iterFreeSlots(
+            startDate,
+            datetime.datetime(2024, 3, 7),
+            duration,
+            datetime.time(9),
+            datetime.time(18),
+        )
+
+        self.assertEqual(
+            [
+                (slotStartDate.day, slotStartDate.hour, slotEndDate.hour)
+                for slotStartDate, slotEndDate in slots
+            ],
+            [(4, 11, 12), (4, 13, 18), (5, 17, 18), (6, 10, 18)],
+        )
+
+        slot = freeBusyService.findFirstAvailableSlot(
+            datetime.datetime(2024, 3, 5, 8), datetime.datetime(2024, 3, 7), duration
+        )
+
+        self.assertEqual(slot[0].day, 5)
+        self.assertEqual((slot[0].hour, slot[1].hour, slot[1].minute), (8, 8, 45))
+        self.assertIsNone(
+            freeBusyService.findFirstAvailableSlot(
+                datetime.datetime(2024, 3, 5, 10),
+                datetime.datetime(2024, 3, 5, 17),
+                duration,
+            )
+        )
+        self.assertEqual(
+            len(
+                self._container.getFreeBusyService().getBusyBlocks(
+                    startDate, datetime.datetime(2024, 3, 6)
+                )
+            ),
+            3,
+        )
+
+    def testEventsStartedBeforeRangeAreBusy(self) -> None:
+        repository = self._container.get("eventRepository")
+        tzInfo = self._container.get("settingRepository").getSnapshot().getTzInfo()
+
+        for title, startDate, duration, rule in [
+            ("Trip", datetime.datetime(2024, 3, 1, 9), 3 * 24 + 1, None),
+            ("Weekend", datetime.datetime(2024, 2, 24, 8), 48, "FREQ=WEEKLY"),
+        ]:
+            startDate = startDate.replace(tzinfo=tzInfo)
+            interval = None
+
+            if rule is not None:
+                interval = EventInterval(rrule.rrulestr(rule, dtstart=startDate))
+
+            repository.insert(
+                Event(
+                    id=repository.generateId(),
+                    title=EventTitle(title),
+                    dateTimeRange=EventDateTimeRange(
+                        startDate, startDate + datetime.timedelta(hours=duration)
+                    ),
+                    isRecurrent=interval is not None,
+                    recurrenceInterval=interval,
+                )
+            )
+
+        freeBusyService = self._container.getFreeBusyService()
+
+        self.assertEqual(
+            [
+                (blockStartDate.day, blockStartDate.hour, blockEndDate.hour)
+                for blockStartDate, blockEndDate in freeBusyService.getBusyBlocks(
+                    datetime.datetime(2024, 3, 4), datetime.datetime(2024, 3, 4, 12)
+                )
+            ],
+            [(4, 0, 10)],
+        )
+        self.assertEqual(
+            freeBusyService.findFirstAvailableSlot(
+                datetime.datetime(2024, 3, 11),
+                datetime.datetime(2024, 3, 12),
+                datetime.timedelta(hours=1),
+            )[0].hour,
+            8,
+        )
+
+        with self.assertRaises(ValueError):
+            freeBusyService.iterFreeSlots(
+                datetime.datetime(2024, 3, 4),
+                datetime.datetime(2024, 3, 5),
+                dayStartTime=datetime.time(18),
+                dayEndTime=datetime.time(9),
+            )
@@ -0,0 +1,198 @@
+import datetime
+import os
+import unittest
+
+from comnuoc.calendar.application.service_container import ServiceContainer
+from comnuoc.calendar.application.tests.service_container_test_mixin import (
+    ServiceContainerTestMixin,
+)
+
+
+class EventIcsServiceTest(ServiceContainerTestMixin, unittest.TestCase):
+    def testImportAndExportEvents(self) -> None:
+        icsPath = os.path.join(self._dir.name, "events.ics")
+
+        with open(icsPath, "w", newline="") as file:
+            file.write(
+                "BEGIN:VCALENDAR\r\n"
+                + "".join(
+                    "BEGIN:VEVENT\r\n"
+                    f"UID:event-{day}@example.com\r\n"
+                    f"DTSTART:202403{day:02d}T090000Z\r\n"
+                    f"DTEND:202403{day:02d}T100000Z\r\n"
+                    f"SUMMARY:Event {day}\r\n"
+                    "END:VEVENT\r\n"
+                    for day in range(1, 6)
+                )
+                + "END:VCALENDAR\r\n"
+            )
+
+        icsService = self._container.getEventIcsService()
+        eventService = self._container.getEventService()
+
+        self.assertEqual(icsService.importFile(icsPath, batchSize=2), 5)
+        # events are updated when imported again
+        self.assertEqual(icsService.importFile(icsPath, batchSize=3), 5)
+        self.assertEqual(
+            [dto.title for dto in eventService.getEventsByDate(2024, 3, 4)],
+            ["Event 4"],
+        )
+
+        exportPath = os.path.join(self._dir.name, "export.ics")
+        icsService.exportFile(exportPath)
+
+        with open(exportPath, newline="") as file:
+            self.assertEqual(file.read().count("BEGIN:VEVENT\r\n"), 5)
+
+        lines = list(
+            icsService.exportEvents(
+                datetime.date(2024, 3, 2), datetime.date(2024, 3, 3)
+            )
+        )
+
+        self.assertEqual(
+            sorted(line for line in lines if line.startswith("SUMMARY")),
+            ["SUMMARY:Event 2\r\n", "SUMMARY:Event 3\r\n"],
+        )
+
+    def testUntilIsInTimeZoneOfSettings(self) -> None:
+        # (time zone, UNTIL, whether the occurrence of Mar 29 is kept)
+        for timeZone, until, isLastKept in [
+            ("Europe/Paris", "20240329T080000Z", True),
+            ("America/New_York", "20240329T120000Z", False),
+        ]:
+            with open(os.path.join(self._dir.name, "settings.ini"), "w") as file:
+                file.write(
+                    "[comnuoc.calendar]\n"
+                    f"eventsFilePath = {self._dir.name}/{timeZone[:6]}.csv\n"
+                    f"timeZone = {timeZone}\n"
+                )
+
+            self._container = ServiceContainer(
+                os.path.join(self._dir.name, "settings.ini")
+            )
+            icsService = self._container.getEventIcsService()
+            eventService = self._container.getEventService()
+            icsService.importEvents(
+                [
+                    "BEGIN:VEVENT",
+                    "UID:weekly@example.com",
+                    f"DTSTART;TZID={timeZone}:20240301T090000",
+                    "DURATION:PT1H",
+                    f"RRULE:FREQ=WEEKLY;BYDAY=FR;UNTIL={until}",
+                    "END:VEVENT",
+                ]
+            )
+
+            self.assertEqual(len(eventService.getEventsByDate(2024, 3, 22)), 1)
+            self.assertEqual(
+                len(eventService.getEventsByDate(2024, 3, 29)), int(isLastKept)
+            )
+            self.assertEqual(eventService.getEventsByDate(2024, 4, 5), [])
+            # UNTIL is exported as it was imported
+            self.assertIn(
+                f"RRULE:FREQ=WEEKLY;UNTIL={until};BYDAY=FR\r\n",
+                list(icsService.exportEvents()),
+            )
+
+    def testRecurringEventsAreExportedInWallTime(self) -> None:
+        settingsPath = os.path.join(self._dir.name, "settings.ini")
+
+        with open(settingsPath, "w") as file:
+            file.write(
+                "[comnuoc.calendar]\n"
+                f"eventsFilePath = {self._dir.name}/paris.csv\n"
+                "timeZone = Europe/Paris\n"
+            )
+
+        self._container = ServiceContainer(settingsPath)
+        icsService = self._container.getEventIcsService()
+        icsService.importEvents(
+            [
+                "BEGIN:VEVENT",
+                "UID:weekly@example.com",
+                "DTSTART;TZID=Europe/Paris:20240301T090000",
+                "DURATION:PT1H",
+                "RRULE:FREQ=WEEKLY;COUNT=6",
+                "END:VEVENT",
+                "BEGIN:VEVENT",
+                "UID:once@example.com",
+                "DTSTART:20240405T070000Z",
+                "END:VEVENT",
+            ]
+        )
+        lines = list(icsService.exportEvents())
+
+        # the occurrences after the DST change stay at 09:00 in Paris
+        self.assertIn("DTSTART;TZID=Europe/Paris:20240301T090000\r\n", lines)
+        self.assertIn("DTEND;TZID=Europe/Paris:20240301T100000\r\n", lines)
+        self.assertIn("RRULE:FREQ=WEEKLY;COUNT=6\r\n", lines)
+        # one-time events are in UTC
+        self.assertIn("DTSTART:20240405T070000Z\r\n", lines)
+
+        # the exported events are read back with the same occurrences
+        with open(settingsPath, "w") as file:
+            file.write(
+                "[comnuoc.calendar]\n"
+                f"eventsFilePath = {self._dir.name}/new-york.csv\n"
+                "timeZone = America/New_York\n"
+            )
+
+        self._container = ServiceContainer(settingsPath)
+        self._container.getEventIcsService().importEvents(lines)
+        occurrences = self._container.getEventService().iterOccurrences(
+            datetime.datetime(2024, 4, 5), datetime.datetime(2024, 4, 6)
+        )
+
+        self.assertEqual(
+            sorted(startDate.isoformat() for startDate, endDate, dto in occurrences),
+            ["2024-04-05T03:00:00-04:00", "2024-04-05T03:00:00-04:00"],
+        )
+
+    def testEventsWithSameUidAreImportedOnce(self) -> None:
+        for storage in ["csv", "log", "sqlite", "binary"]:
+            with open(os.path.join(self._dir.name, "settings.ini"), "w") as file:
+                file.write(
+                    "[comnuoc.calendar]\n"
+                    f"eventsFilePath = {self._dir.name}/same-uid.{storage}\n"
+                    f"eventsStorage = {storage}\n"
+                )
+
+            self._container = ServiceContainer(
+                os.path.join(self._dir.name, "settings.ini")
+            )
+            icsService = self._container.getEventIcsService()
+
+            self.assertEqual(
+                icsService.importEvents(
+                    [
+                        "BEGIN:VEVENT",
+                        "UID:event@example.com",
+                        "DTSTART:20240301T090000Z",
+                        "SUMMARY:One time",
+                        "END:VEVENT",
+                        "BEGIN:VEVENT",
+                        "UID:other@example.com",
+                        "DTSTART:20240302T090000Z",
+                        "END:VEVENT",
+                        "BEGIN:VEVENT",
+                        "UID:event@example.com",
+                        "DTSTART:20240301T090000Z",
+                        "SUMMARY:Daily",
+                        "RRULE:FREQ=DAILY",
+                        "END:VEVENT",
+                    ]
+                ),
+                2,
+            )
+
+            events = list(self._container.get("eventRepository").findAll())
+
+            self.assertEqual(len(events), 2, storage)
+            self.assertEqual(
+                sorted(str(event.getTitle()) for event in events),
+                ["Daily", "Untitled"],
+            )
+            self.assertEqual(
+                len(self._container.getEventService().getEventsByDate(2024, 3, 5)), 1
+            )
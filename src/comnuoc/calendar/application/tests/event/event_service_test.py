@@ -0,0 +1,332 @@
+import datetime
+import os
+import unittest
+
+from comnuoc.calendar.application.event.event_dto import EventDto
+from comnuoc.calendar.application.service_container import ServiceContainer
+from comnuoc.calendar.application.tests.service_container_test_mixin import (
+    ServiceContainerTestMixin,
+)
+
+from comnuoc.calendar.domain.event.event_repository import DictEventRepository
+from comnuoc.calendar.infrastructure.event.event_repository import (
+    EventIdUuidGenerator,
+    EventRecurrenceRruleChecker,
+)
+from comnuoc.calendar.infrastructure.event.event_serializer import (
+    EventIdUuidNormalizer,
+)
+
+
+class EventServiceTest(ServiceContainerTestMixin, unittest.TestCase):
+    def testEventWithUntilCanBeRead(self) -> None:
+        eventService = self._container.getEventService()
+        dto = EventDto()
+        dto.title = "Weekly"
+        dto.dateYear, dto.dateMonth, dto.dateDay = 2024, 3, 5
+        dto.startDateHour, dto.startDateMinute = 9, 0
+        dto.endDateHour, dto.endDateMinute = 10, 0
+        dto.isRecurrent = True
+        dto.recurrenceIntervalFreq = "WEEKLY"
+        dto = eventService.insertEvent(dto)
+
+        # as stored by other clients, UNTIL is written without time zone
+        with open(self._eventsPath) as file:
+            content = file.read()
+
+        with open(self._eventsPath, "w") as file:
+            file.write(
+                content.replace("FREQ=WEEKLY", "FREQ=WEEKLY;UNTIL=20240320T090000")
+            )
+
+        self._container = ServiceContainer(os.path.join(self._dir.name, "settings.ini"))
+        eventService = self._container.getEventService()
+
+        self.assertEqual(
+            [event.id for event in eventService.getEventsByDate(2024, 3, 19)], [dto.id]
+        )
+        self.assertEqual(eventService.getEventsByDate(2024, 3, 26), [])
+
+    def testInsertEvents(self) -> None:
+        eventService = self._container.getEventService()
+        dtos = []
+
+        for day in range(1, 6):
+            dto = EventDto()
+            dto.title = f"Event {day}"
+            dto.dateYear, dto.dateMonth, dto.dateDay = 2024, 3, day
+            dto.startDateHour, dto.startDateMinute = 9, 0
+            dto.endDateHour, dto.endDateMinute = 10, 0
+            dto.isRecurrent = False
+            dtos.append(dto)
+
+        ids = eventService.insertEvents(iter(dtos), batchSize=2)
+
+        self.assertEqual(len(set(ids)), 5)
+        self.assertEqual(eventService.getEvent(ids[3]).title, "Event 4")
+        self.assertEqual(
+            [dto.id for dto in eventService.getEventsByDate(2024, 3, 5)], [ids[4]]
+        )
+
+    def testUpdateAndDeleteEvents(self) -> None:
+        eventService = self._container.getEventService()
+        dtos = []
+
+        for day in range(1, 4):
+            dto = EventDto()
+            dto.title = f"Event {day}"
+            dto.dateYear, dto.dateMonth, dto.dateDay = 2024, 3, day
+            dto.startDateHour, dto.startDateMinute = 9, 0
+            dto.endDateHour, dto.endDateMinute = 10, 0
+            dto.isRecurrent = False
+            dtos.append(eventService.insertEvent(dto))
+
+        for dto in dtos:
+            dto.title = f"Updated {dto.title}"
+
+        eventService.updateEvents(dtos)
+        eventService.deleteEvents([dtos[0].id])
+
+        self.assertIsNone(eventService.getEvent(dtos[0].id))
+        self.assertEqual(eventService.getEvent(dtos[1].id).title, "Updated Event 2")
+
+        with self.assertRaises(KeyError):
+            eventService.deleteEvents([dtos[1].id, dtos[0].id])
+
+        self.assertEqual(eventService.getEvent(dtos[1].id).title, "Updated Event 2")
+
+    def testIterOccurrences(self) -> None:
+        eventService = self._container.getEventService()
+        titles = {}
+
+        for title, day, hour, freq in [
+            ("Daily", 1, 12, "DAILY"),
+            ("One time", 3, 10, None),
+            ("Weekly", 2, 9, "WEEKLY"),
+            ("Later", 9, 9, None),
+        ]:
+            dto = EventDto()
+            dto.title = title
+            dto.dateYear, dto.dateMonth, dto.dateDay = 2024, 3, day
+            dto.startDateHour, dto.startDateMinute = hour, 0
+            dto.endDateHour, dto.endDateMinute = hour + 1, 30
+            dto.isRecurrent = freq is not None
+            dto.recurrenceIntervalFreq = freq
+            titles[eventService.insertEvent(dto).id] = title
+
+        startDate = datetime.datetime(2024, 3, 2)
+        occurrences = list(
+            eventService.iterOccurrences(startDate, datetime.datetime(2024, 3, 4))
+        )
+
+        self.assertEqual(
+            [(date.day, date.hour, dto.title) for date, endDate, dto in occurrences],
+            [
+                (2, 9, "Weekly"),
+                (2, 12, "Daily"),
+                (3, 10, "One time"),
+                (3, 12, "Daily"),
+            ],
+        )
+        self.assertEqual(
+            occurrences[0][1] - occurrences[0][0],
+            datetime.timedelta(hours=1, minutes=30),
+        )
+        self.assertIs(
+            occurrences[0][0].tzinfo,
+            self._container.get("settingRepository").getSnapshot().getTzInfo(),
+        )
+
+        # occurrences are merged across windows of the range
+        endDate = datetime.datetime(2024, 6, 1)
+        occurrences = list(eventService.iterOccurrences(startDate, endDate))
+        startDates = [date for date, endDate, dto in occurrences]
+
+        self.assertEqual(len(occurrences), 91 + 13 + 2)
+        self.assertEqual(startDates, sorted(startDates))
+        self.assertEqual(
+            [
+                (date, dto.id)
+                for date, endDate, dto in eventService.iterOccurrences(
+                    startDate, endDate, limit=3, offset=60
+                )
+            ],
+            [(date, dto.id) for date, endDate, dto in occurrences[60:63]],
+        )
+
+    def testEventConflicts(self) -> None:
+        eventService = self._container.getEventService()
+
+        def createDto(
+            title: str, day: int, startHour: int, endHour: int, freq: str = None
+        ) -> EventDto:
+            dto = EventDto()
+            dto.title = title
+            dto.dateYear, dto.dateMonth, dto.dateDay = 2024, 3, day
+            dto.startDateHour, dto.startDateMinute = startHour, 30
+            dto.endDateHour, dto.endDateMinute = endHour, 30
+            dto.isRecurrent = freq is not None
+            dto.recurrenceIntervalFreq = freq
+
+            return dto
+
+        meeting = eventService.insertEvent(createDto("Meeting", 5, 9, 10))
+        eventService.insertEvent(createDto("Weekly", 5, 14, 15, "WEEKLY"))
+        eventService.insertEvent(createDto("Overnight", 5, 22, 23))
+
+        self.assertEqual(
+            [
+                dto.title
+                for dto in eventService.findConflicts(createDto("New", 5, 8, 10))
+            ],
+            ["Meeting"],
+        )
+        self.assertEqual(eventService.findConflicts(createDto("New", 5, 10, 11)), [])
+        # the next occurrences of both events are checked
+        self.assertEqual(
+            [
+                dto.title
+                for dto in eventService.findConflicts(
+                    createDto("New", 4, 13, 15, "DAILY")
+                )
+            ],
+            ["Weekly"],
+        )
+
+        # events in the span of the occurrences but between them do not conflict
+        nextYear = datetime.date.today().year + 1
+        dto = createDto("Next year", 5, 12, 13)
+        dto.dateYear = nextYear
+        eventService.insertEvent(dto)
+        dto = createDto("New", 1, 10, 11, "DAILY")
+        dto.dateYear = nextYear
+
+        self.assertEqual(eventService.findConflicts(dto), [])
+
+        dto.startDateHour, dto.endDateHour = 12, 13
+
+        self.assertEqual(
+            [dto.title for dto in eventService.findConflicts(dto)], ["Next year"]
+        )
+
+        # the event does not conflict with itself
+        meeting.title = "Updated meeting"
+        eventService.updateEvent(meeting, allowConflicts=False)
+        eventService.insertEvent(createDto("Overlapping", 5, 9, 11))
+
+        with self.assertRaises(ValueError):
+            eventService.updateEvent(meeting, allowConflicts=False)
+
+        with self.assertRaises(ValueError):
+            eventService.insertEvent(createDto("Late", 5, 20, 23), allowConflicts=False)
+
+        self.assertEqual(
+            sorted(dto.title for dto in eventService.getEventsByDate(2024, 3, 5)),
+            ["Overlapping", "Overnight", "Updated meeting", "Weekly"],
+        )
+
+    def testSearchEvents(self) -> None:
+        eventService = self._container.getEventService()
+        titleIndex = self._container.get("eventTitleIndex")
+        ids = {}
+
+        def createDto(title: str, day: int, freq: str = None) -> EventDto:
+            dto = EventDto()
+            dto.title = title
+            dto.dateYear, dto.dateMonth, dto.dateDay = 2024, 3, day
+            dto.startDateHour, dto.startDateMinute = 9, 0
+            dto.endDateHour, dto.endDateMinute = 10, 0
+            dto.isRecurrent = freq is not None
+            dto.recurrenceIntervalFreq = freq
+
+            return dto
+
+        for title, day, freq in [
+            ("Team meeting", 5, None),
+            ("Dentist", 6, None),
+            ("Weekly team sync", 4, "WEEKLY"),
+        ]:
+            ids[title] = eventService.insertEvent(createDto(title, day, freq)).id
+
+        def searchTitles(query: str, *args, **kwargs) -> list[str]:
+            return [
+                dto.title for dto in eventService.searchEvents(query, *args, **kwargs)
+            ]
+
+        self.assertEqual(searchTitles("team"), ["Team meeting", "Weekly team sync"])
+        self.assertTrue(os.path.isfile(self._eventsPath + ".titles"))
+        self.assertEqual(searchTitles("TEAM", limit=1), ["Team meeting"])
+        self.assertEqual(searchTitles("dentsit"), [])
+        self.assertEqual(searchTitles("meting"), ["Team meeting"])
+        self.assertEqual(
+            searchTitles(
+                "team", datetime.datetime(2024, 3, 11), datetime.datetime(2024, 3, 12)
+            ),
+            ["Weekly team sync"],
+        )
+
+        # writes through the service keep the index fresh
+        lunch = eventService.insertEvent(createDto("Team lunch", 7))
+        dentist = eventService.getEvent(ids["Dentist"])
+        dentist.title = "Dentist appointment"
+        eventService.updateEvent(dentist)
+
+        self.assertTrue(titleIndex.isFresh(titleIndex.getStoreSignature()))
+        self.assertEqual(searchTitles("lunch"), ["Team lunch"])
+        self.assertEqual(searchTitles("appointment"), ["Dentist appointment"])
+
+        eventService.deleteEvent(lunch.id)
+
+        self.assertTrue(titleIndex.isFresh(titleIndex.getStoreSignature()))
+        self.assertEqual(searchTitles("lunch"), [])
+
+        # other writes make it stale, it is rebuilt on the next search
+        repository = self._container.get("eventRepository")
+        repository.insert(
+            self._container.get("eventDtoTransformer").createEventFromDto(
+                createDto("Lunch with Anna", 8), repository.generateId()
+            )
+        )
+
+        self.assertEqual(searchTitles("lunch"), ["Lunch with Anna"])
+
+    def testSearchEventsInMemory(self) -> None:
+        container = ServiceContainer(
+            os.path.join(self._dir.name, "settings.ini"), profile=True
+        )
+        repository = DictEventRepository(
+            idNormalizer=EventIdUuidNormalizer(),
+            idGenerator=EventIdUuidGenerator(),
+            recurrenceChecker=EventRecurrenceRruleChecker(),
+        )
+        memoryPath = os.path.join(self._dir.name, "memory")
+        container.setProvider("eventRepository", lambda: repository)
+        container.setProvider(
+            "eventTitleIndex", lambda: container.createEventTitleIndex(memoryPath)
+        )
+        eventService = container.getEventService()
+        dto = EventDto()
+        dto.title = "Team meeting"
+        dto.dateYear, dto.dateMonth, dto.dateDay = 2024, 3, 5
+        dto.startDateHour, dto.startDateMinute = 9, 0
+        dto.endDateHour, dto.endDateMinute = 10, 0
+        eventService.insertEvent(dto)
+
+        def searchTitles(query: str) -> list[str]:
+            return [dto.title for dto in eventService.searchEvents(query)]
+
+        self.assertEqual(searchTitles("team"), ["Team meeting"])
+
+        # the index is kept in memory and updated by the writes
+        dto.title = "Dentist"
+        eventService.insertEvent(dto)
+
+        self.assertEqual(searchTitles("dentist"), ["Dentist"])
+        self.assertEqual(searchTitles("meeting"), ["Team meeting"])
+        self.assertFalse(os.path.exists(memoryPath + ".titles"))
+        self.assertEqual(
+            container.get("profiler").getStats()["counters"][
+                "EventService.titleIndexBuilds"
+            ],
+            1,
+        )
@@ -0,0 +1,62 @@
+import os
+import unittest
+
+from comnuoc.calendar.application.tests.service_container_test_mixin import (
+    ServiceContainerTestMixin,
+)
+
+from comnuoc.calendar.domain.event.event_repository import DictEventRepository
+from comnuoc.calendar.infrastructure.event.event_repository import (
+    EventIdUuidGenerator,
+    EventRecurrenceRruleChecker,
+)
+from comnuoc.calendar.infrastructure.event.event_serializer import (
+    EventIdUuidNormalizer,
+)
+
+
+class ServiceContainerTest(ServiceContainerTestMixin, unittest.TestCase):
+    def testServicesAreBuiltOnFirstUse(self) -> None:
+        settingService = self._container.getSettingService()
+
+        self.assertIs(self._container.getSettingService(), settingService)
+        self.assertFalse(self._container.has("eventRepository"))
+        self.assertFalse(os.path.exists(self._eventsPath))
+
+        self._container.getEventService()
+
+        self.assertTrue(self._container.has("eventRepository"))
+        self.assertTrue(os.path.isfile(self._eventsPath))
+        self.assertEqual(
+            list(self._container.getConstructionTimes())[:4],
+            ["settingRepository", "calendarUtil", "timeZoneNameRepository", "setting"],
+        )
+        self.assertTrue(
+            all(time >= 0 for time in self._container.getConstructionTimes().values())
+        )
+
+    def testLogRepositoryCompactionRatioIsRead(self) -> None:
+        settings = self._container.get("settingRepository")
+        settings.setLogCompactionRatio(0.25)
+        repository = self._container.createEventRepository(
+            os.path.join(self._dir.name, "events.log")
+        )
+
+        self.assertEqual(repository.getCompactionRatio(), 0.25)
+
+    def testProviderCanBeOverridden(self) -> None:
+        repository = DictEventRepository(
+            idNormalizer=EventIdUuidNormalizer(),
+            idGenerator=EventIdUuidGenerator(),
+            recurrenceChecker=EventRecurrenceRruleChecker(),
+        )
+        self._container.setProvider("eventRepository", lambda: repository)
+
+        self.assertEqual(
+            self._container.getEventService().getEventsByDate(2024, 3, 5), []
+        )
+        self.assertIs(self._container.get("eventRepository"), repository)
+        self.assertFalse(os.path.exists(self._eventsPath))
+
+        with self.assertRaises(ValueError):
+            self._container.get("unknown")
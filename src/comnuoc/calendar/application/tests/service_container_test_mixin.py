@@ -0,0 +1,22 @@
+import os
+import tempfile
+
+from comnuoc.calendar.application.service_container import ServiceContainer
+
+
+class ServiceContainerTestMixin(object):
+    """
+    Container over a temporary settings file and events file (CSV).
+    """
+
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self._eventsPath = os.path.join(self._dir.name, "events.csv")
+
+        with open(os.path.join(self._dir.name, "settings.ini"), "w") as file:
+            file.write(f"[comnuoc.calendar]\neventsFilePath = {self._eventsPath}\n")
+
+        self._container = ServiceContainer(os.path.join(self._dir.name, "settings.ini"))
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
@@ -0,0 +1,69 @@
+from abc import ABC, abstractmethod
+from collections.abc import Hashable, Iterable, Iterator
+from typing import Union
+
+
+class EventTitleIndex(ABC):
+    """
+    Full-text index of the event titles of a store.
+    The index is bound to the signature of the store, which is None
+    if the store has none (e.g. it is kept in memory): the index is then
+    kept in memory only and is fresh as long as writes update it.
+    """
+
+    Signature = Hashable
+    EventId = str
+    Score = float
+
+    @abstractmethod
+    def build(
+        self,
+        signature: Union[Signature, None],
+        titles: Iterable[tuple[EventId, str]],
+    ) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def setSignature(self, signature: Union[Signature, None]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def getStoreSignature(self) -> Union[Signature, None]:
+        """
+        Return the current signature of the store.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def isFresh(self, signature: Union[Signature, None]) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def add(self, id: EventId, title: str) -> None:
+        """
+        Add the title of the event, its previous title is replaced.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove(self, id: EventId) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def search(self, query: str) -> Iterator[tuple[EventId, Score]]:
+        """
+        Yield the IDs of the events whose title matches the query
+        with their scores, the best ones first.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def load(self, signature: Union[Signature, None]) -> bool:
+        """
+        Load the saved index, return False if it is missing or stale.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self) -> None:
+        raise NotImplementedError
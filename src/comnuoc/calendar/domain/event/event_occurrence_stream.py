@@ -0,0 +1,129 @@
+import datetime
+import heapq
+from collections.abc import Iterable, Iterator
+
+from comnuoc.calendar.domain.event.event import Event
+from comnuoc.calendar.domain.event.event_repository import (
+    EventRecurrenceChecker,
+    EventRepository,
+)
+from comnuoc.calendar.domain.util.datetime_range import DateTimeRange
+
+
+class EventOccurrenceStream(object):
+    """
+    Occurrences of the events of one or more repositories in chronological order.
+    The range is scanned by windows: the start dates of the events of a window
+    are merged through a heap, one by one, so that the first occurrences
+    are found without expanding the whole range.
+    """
+
+    OccurrenceStartDate = OccurrenceEndDate = datetime.datetime
+    Occurrence = tuple[OccurrenceStartDate, OccurrenceEndDate, Event]
+
+    def __init__(
+        self,
+        recurrenceChecker: EventRecurrenceChecker,
+        window: datetime.timedelta = datetime.timedelta(days=31),
+    ) -> None:
+        self._recurrenceChecker = recurrenceChecker
+        self._window = window
+
+    def iterate(
+        self,
+        repositories: Iterable[EventRepository],
+        startDate: datetime.datetime,
+        endDate: datetime.datetime,
+    ) -> Iterator[Occurrence]:
+        """
+        Yield the occurrences which start between the dates (end date excluded),
+        their dates are in the time zone of the start date.
+        """
+        repositories = list(repositories)
+        tzInfo = startDate.tzinfo
+        windowStartDate = startDate
+
+        while windowStartDate < endDate:
+            windowEndDate = min(windowStartDate + self._window, endDate)
+            windowRange = DateTimeRange(windowStartDate, windowEndDate, True, False)
+
+            yield from self.__merge(repositories, windowRange, tzInfo)
+
+            windowStartDate = windowEndDate.astimezone(tzInfo)
+
+    def iterateEvent(
+        self,
+        event: Event,
+        startDate: datetime.datetime,
+        endDate: datetime.datetime = None,
+    ) -> Iterator[Occurrence]:
+        """
+        Yield the occurrences of the event which start between the dates
+        (end date excluded, if any), their dates are in the time zone of the start date.
+        """
+        dateTimeRange = event.getDateTimeRange()
+        duration = dateTimeRange.getRealEndDate() - dateTimeRange.getRealStartDate()
+
+        for occurrenceStartDate in self.__iterStartDates(
+            event, DateTimeRange(startDate, endDate, True, False)
+        ):
+            yield (
+                occurrenceStartDate.astimezone(startDate.tzinfo),
+                (occurrenceStartDate + duration).astimezone(startDate.tzinfo),
+                event,
+            )
+
+    def __merge(
+        self,
+        repositories: list[EventRepository],
+        windowRange: DateTimeRange,
+        tzInfo: datetime.tzinfo,
+    ) -> Iterator[Occurrence]:
+        """
+        K-way merge of the start dates of the events in the window.
+        """
+        # (occurrence start date, index of the event, event, next start dates)
+        heap = []
+
+        for repository in repositories:
+            events = repository.findByStartDate(windowRange)
+
+            try:
+                for event in events:
+                    startDates = self.__iterStartDates(event, windowRange)
+                    occurrenceStartDate = next(startDates, None)
+
+                    if occurrenceStartDate is not None:
+                        heap.append((occurrenceStartDate, len(heap), event, startDates))
+            finally:
+                events.close()  # as https://peps.python.org/pep-0533/
+
+        heapq.heapify(heap)
+
+        while len(heap) > 0:
+            occurrenceStartDate, index, event, startDates = heap[0]
+            dateTimeRange = event.getDateTimeRange()
+            duration = dateTimeRange.getRealEndDate() - dateTimeRange.getRealStartDate()
+
+            yield (
+                occurrenceStartDate.astimezone(tzInfo),
+                (occurrenceStartDate + duration).astimezone(tzInfo),
+                event,
+            )
+
+            nextStartDate = next(startDates, None)
+
+            if nextStartDate is None:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (nextStartDate, index, event, startDates))
+
+    def __iterStartDates(
+        self, event: Event, startDateRange: DateTimeRange
+    ) -> Iterator[datetime.datetime]:
+        if event.isRecurrent():
+            yield from self._recurrenceChecker.iterStartDatesInRange(
+                event, startDateRange
+            )
+        elif startDateRange.includes(event.getDateTimeRange().getRealStartDate()):
+            yield event.getDateTimeRange().getRealStartDate()
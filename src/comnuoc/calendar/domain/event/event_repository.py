@@ -1,10 +1,13 @@
+import contextlib
+import datetime
 from abc import ABC, abstractmethod
-from collections.abc import Iterable
+from collections.abc import Hashable, Iterable, Iterator
 from typing import Union
 
 from comnuoc.calendar.domain.event.event import Event, EventId
 from comnuoc.calendar.domain.event.event_serializer import EventIdNormalizer
 from comnuoc.calendar.domain.util.datetime_range import DateTimeRange
+from comnuoc.calendar.domain.util.interval_tree import IntervalTree
 
 
 class EventRepository(ABC):
@@ -16,14 +19,45 @@ class EventRepository(ABC):
     def findByStartDate(self, startDateRange: DateTimeRange) -> Iterable[Event]:
         raise NotImplementedError
 
+    @abstractmethod
+    def findAll(self) -> Iterable[Event]:
+        """
+        Iterate all events, without loading all of them at once if possible.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def findOverlapping(self, dateTimeRange: DateTimeRange) -> Iterable[Event]:
+        """
+        Iterate the events (recurring events by any of their occurrences)
+        which occupy a date of the range. An event occupies the dates
+        from its start date to its end date excluded.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def hasEventInRange(self, startDateRange: DateTimeRange) -> bool:
         raise NotImplementedError
 
+    @abstractmethod
+    def findOccupiedDates(self, startDateRange: DateTimeRange) -> set[datetime.date]:
+        """
+        Return the dates (in the time zone of the range) on which
+        an event (or an occurrence of a recurring event) starts.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def insert(self, event: Event) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    def insertMany(self, events: Iterable[Event]) -> None:
+        """
+        Insert the events in one batch (e.g. one write).
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def update(self, event: Event) -> None:
         raise NotImplementedError
@@ -32,22 +66,237 @@ class EventRepository(ABC):
     def delete(self, event: Event) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    def transaction(self) -> contextlib.AbstractContextManager[None]:
+        """
+        Return a context (unit of work) whose inserts, updates and deletes are
+        applied together when it exits, or discarded if it raises.
+        Changes may not be visible to reads before the context exits.
+        Nested contexts join the outer one.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def generateId(self) -> EventId:
         raise NotImplementedError
 
+    @abstractmethod
+    def generateIds(self, count: int) -> list[EventId]:
+        raise NotImplementedError
+
 
 class EventIdGenerator(ABC):
     @abstractmethod
     def generate(self) -> EventId:
         raise NotImplementedError
 
+    def generateMany(self, count: int) -> list[EventId]:
+        return [self.generate() for i in range(count)]
+
 
 class EventRecurrenceChecker(ABC):
     @abstractmethod
     def isStartDateInRange(self, event: Event, startDateRange: DateTimeRange) -> bool:
         raise NotImplementedError
 
+    @abstractmethod
+    def findStartDatesInRange(
+        self, event: Event, startDateRange: DateTimeRange
+    ) -> list[datetime.datetime]:
+        raise NotImplementedError
+
+    def iterStartDatesInRange(
+        self, event: Event, startDateRange: DateTimeRange
+    ) -> Iterator[datetime.datetime]:
+        """
+        Yield the start dates of the occurrences in the range in chronological order,
+        implementations may expand them one by one.
+        """
+        yield from self.findStartDatesInRange(event, startDateRange)
+
+    @abstractmethod
+    def findOccurrenceBounds(self, event: Event) -> DateTimeRange:
+        """
+        Return a range which includes every occurrence of the event,
+        the end date is None if the occurrences never end.
+        """
+        raise NotImplementedError
+
+
+class EventIntervalIndex(object):
+    """
+    In-memory interval tree of the dates occupied by the events of a repository,
+    keyed by whatever locates an event in the repository (e.g. its ID or row offset).
+    An event occupies the dates from its start date to its end date excluded,
+    so that back-to-back events do not overlap.
+    A recurring event occupies the bounds of its occurrences, its keys are only
+    candidates which are checked by overlaps().
+    The index is bound to a signature of the repository (e.g. of its file),
+    it is rebuilt as a whole when it is stale. Writes made through the repository
+    update it in place (with the signature after the write): changed events are
+    kept out of the tree and scanned, until they are too many and the tree
+    is rebuilt from the intervals, without reading the events again.
+    """
+
+    Key = Hashable
+
+    MIN_DATE = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+    MAX_DATE = datetime.datetime.max.replace(tzinfo=datetime.timezone.utc)
+    # the tree is rebuilt when the changed events are more than this number
+    # or than a 16th of the events
+    MIN_REBUILD_CHANGES = 64
+
+    def __init__(self, recurrenceChecker: EventRecurrenceChecker) -> None:
+        self._recurrenceChecker = recurrenceChecker
+        self.reset(None)
+
+    def reset(self, signature: object) -> None:
+        self._signature = signature
+        self._tree = IntervalTree([])
+        # key => (first date, last date) occupied by the event
+        self._intervals: dict[Hashable, tuple[datetime.datetime, datetime.datetime]] = (
+            {}
+        )
+        # keys whose interval is not (or no longer) the one in the tree
+        self._changedKeys: set[Hashable] = set()
+
+    def build(self, signature: object, events: Iterable[tuple[Key, Event]]) -> None:
+        self.reset(signature)
+
+        for key, event in events:
+            self._intervals[key] = self.__getInterval(event)
+
+        self.__rebuildTree()
+
+    def setSignature(self, signature: object) -> None:
+        self._signature = signature
+
+    def isFresh(self, signature: object) -> bool:
+        return self._signature is not None and self._signature == signature
+
+    def add(self, key: Key, event: Event) -> None:
+        """
+        Add the event, or replace the event of the key.
+        """
+        self._intervals[key] = self.__getInterval(event)
+        self.__change(key)
+
+    def remove(self, key: Key) -> None:
+        if self._intervals.pop(key, None) is not None:
+            self.__change(key)
+
+    def findKeys(self, dateTimeRange: DateTimeRange) -> list[Key]:
+        """
+        Return the keys of the events which may overlap the range, ordered by start.
+        """
+        startDate = dateTimeRange.getRealStartDate()
+        endDate = dateTimeRange.getRealEndDate()
+
+        if startDate is None:
+            startDate = self.MIN_DATE
+
+        if endDate is None:
+            endDate = self.MAX_DATE
+
+        keys = self._tree.findOverlapping(startDate, endDate)
+
+        if 0 == len(self._changedKeys):
+            return keys
+
+        keys = [key for key in keys if key not in self._changedKeys]
+
+        for key in self._changedKeys:
+            interval = self._intervals.get(key)
+
+            if interval is not None and interval[0] <= endDate:
+                if interval[1] >= startDate:
+                    keys.append(key)
+
+        return sorted(keys, key=lambda key: self._intervals[key][0])
+
+    def overlaps(self, event: Event, dateTimeRange: DateTimeRange) -> bool:
+        """
+        Return whether the event (or an occurrence of the recurring event)
+        overlaps the range.
+        """
+        startDate, endDate = self.getOccupiedDates(event)
+        rangeStartDate = dateTimeRange.getRealStartDate()
+        rangeEndDate = dateTimeRange.getRealEndDate()
+
+        if not event.isRecurrent():
+            return (rangeEndDate is None or startDate <= rangeEndDate) and (
+                rangeStartDate is None or endDate >= rangeStartDate
+            )
+
+        # occurrences which start up to a duration before the range may end in it
+        if rangeStartDate is None:
+            firstDate = startDate
+        else:
+            firstDate = rangeStartDate - (endDate - startDate)
+
+        if rangeEndDate is None:
+            startDates = self._recurrenceChecker.iterStartDatesInRange(
+                event, DateTimeRange(firstDate, None)
+            )
+            hasOccurrence = next(startDates, None) is not None
+            startDates.close()
+
+            return hasOccurrence
+
+        if rangeEndDate < firstDate:
+            return False
+
+        return self._recurrenceChecker.isStartDateInRange(
+            event, DateTimeRange(firstDate, rangeEndDate)
+        )
+
+    def getOccupiedDates(
+        self, event: Event
+    ) -> tuple[datetime.datetime, datetime.datetime]:
+        """
+        Return the first and last dates (both included) occupied by the event,
+        or by the first occurrence of the recurring event.
+        """
+        dateTimeRange = event.getDateTimeRange()
+        startDate = dateTimeRange.getRealStartDate()
+        endDate = dateTimeRange.getRealEndDate() - datetime.timedelta(microseconds=1)
+
+        return (startDate, max(startDate, endDate))
+
+    def __getInterval(
+        self, event: Event
+    ) -> tuple[datetime.datetime, datetime.datetime]:
+        """
+        Return the first and last dates occupied by the event
+        (by all occurrences of the recurring event).
+        """
+        startDate, endDate = self.getOccupiedDates(event)
+
+        if not event.isRecurrent():
+            return (startDate, endDate)
+
+        lastDate = self._recurrenceChecker.findOccurrenceBounds(event).getRealEndDate()
+
+        if lastDate is None:
+            return (startDate, self.MAX_DATE)
+
+        return (startDate, lastDate + (endDate - startDate))
+
+    def __change(self, key: Key) -> None:
+        self._changedKeys.add(key)
+
+        if len(self._changedKeys) > max(
+            self.MIN_REBUILD_CHANGES, len(self._intervals) // 16
+        ):
+            self.__rebuildTree()
+
+    def __rebuildTree(self) -> None:
+        self._tree = IntervalTree(
+            (startDate, endDate, key)
+            for key, (startDate, endDate) in self._intervals.items()
+        )
+        self._changedKeys = set()
+
 
 class DictEventRepository(EventRepository):
     def __init__(
@@ -57,9 +306,14 @@ class DictEventRepository(EventRepository):
         recurrenceChecker: EventRecurrenceChecker,
     ) -> None:
         self._events: dict[str, Event] = {}
+        self._occurrenceBounds: dict[str, DateTimeRange] = {}
         self._idNormalizer = idNormalizer
         self._idGenerator = idGenerator
         self._recurrenceChecker = recurrenceChecker
+        self._isInTransaction = False
+        self._intervalIndex = EventIntervalIndex(recurrenceChecker)
+        # incremented by each change, the interval index is bound to it
+        self._version = 0
 
     def find(self, id: EventId) -> Union[Event, None]:
         normalizedId = self.__normalizeId(id)
@@ -76,10 +330,24 @@ class DictEventRepository(EventRepository):
             if not event.isRecurrent():
                 if startDateRange.includes(event.getDateTimeRange().getStartDate()):
                     yield event
-            else:
+            elif self._occurrenceBounds[id].overlaps(startDateRange):
                 if self._recurrenceChecker.isStartDateInRange(event, startDateRange):
                     yield event
 
+    def findAll(self) -> Iterable[Event]:
+        for event in list(self._events.values()):
+            yield event
+
+    def findOverlapping(self, dateTimeRange: DateTimeRange) -> Iterable[Event]:
+        if not self._intervalIndex.isFresh(self._version):
+            self._intervalIndex.build(self._version, list(self._events.items()))
+
+        for id in self._intervalIndex.findKeys(dateTimeRange):
+            event = self._events[id]
+
+            if self._intervalIndex.overlaps(event, dateTimeRange):
+                yield event
+
     def hasEventInRange(self, startDateRange: DateTimeRange) -> bool:
         for id in self._events:
             event = self._events[id]
@@ -87,16 +355,48 @@ class DictEventRepository(EventRepository):
             if not event.isRecurrent():
                 if startDateRange.includes(event.getDateTimeRange().getStartDate()):
                     return True
-            else:
+            elif self._occurrenceBounds[id].overlaps(startDateRange):
                 if self._recurrenceChecker.isStartDateInRange(event, startDateRange):
                     return True
 
         return False
 
+    def findOccupiedDates(self, startDateRange: DateTimeRange) -> set[datetime.date]:
+        tzInfo = startDateRange.getRealStartDate().tzinfo
+        dates = set()
+
+        for id in self._events:
+            event = self._events[id]
+
+            if not event.isRecurrent():
+                startDate = event.getDateTimeRange().getStartDate()
+
+                if startDateRange.includes(startDate):
+                    dates.add(startDate.astimezone(tzInfo).date())
+            elif self._occurrenceBounds[id].overlaps(startDateRange):
+                for startDate in self._recurrenceChecker.findStartDatesInRange(
+                    event, startDateRange
+                ):
+                    dates.add(startDate.astimezone(tzInfo).date())
+
+        return dates
+
     def insert(self, event: Event) -> None:
         normalizedId = self.__normalizeId(event.getId())
 
         self._events[normalizedId] = event
+        self.__changeIntervalIndex(normalizedId, event)
+
+        if event.isRecurrent():
+            self._occurrenceBounds[normalizedId] = (
+                self._recurrenceChecker.findOccurrenceBounds(event)
+            )
+        else:
+            self._occurrenceBounds.pop(normalizedId, None)
+
+    def insertMany(self, events: Iterable[Event]) -> None:
+        for event in events:
+            self.insert(event)
 
     def update(self, event: Event) -> None:
         self.insert(event)
@@ -106,9 +406,56 @@ class DictEventRepository(EventRepository):
 
         if normalizedId in self._events:
             del self._events[normalizedId]
+            self._occurrenceBounds.pop(normalizedId, None)
+            self.__changeIntervalIndex(normalizedId, None)
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Changes are applied immediately and reverted if the context raises.
+        """
+        if self._isInTransaction:
+            yield
+
+            return
+
+        events = dict(self._events)
+        occurrenceBounds = dict(self._occurrenceBounds)
+        self._isInTransaction = True
+
+        try:
+            yield
+        except BaseException:
+            self._events = events
+            self._occurrenceBounds = occurrenceBounds
+            self._version += 1
+
+            raise
+        finally:
+            self._isInTransaction = False
 
     def generateId(self) -> EventId:
         return self._idGenerator.generate()
 
+    def generateIds(self, count: int) -> list[EventId]:
+        return self._idGenerator.generateMany(count)
+
     def __normalizeId(self, id: EventId) -> str:
         return self._idNormalizer.normalize(id)
+
+    def __changeIntervalIndex(self, id: str, event: Union[Event, None]) -> None:
+        """
+        Bump the version, the interval index is updated in place if it is fresh.
+        """
+        isIndexFresh = self._intervalIndex.isFresh(self._version)
+        self._version += 1
+
+        if not isIndexFresh:
+            return
+
+        if event is None:
+            self._intervalIndex.remove(id)
+        else:
+            self._intervalIndex.add(id, event)
+
+        self._intervalIndex.setSignature(self._version)
@@ -3,6 +3,7 @@ from abc import ABC, abstractmethod
 from typing import Union
 
 from comnuoc.calendar.domain.event.event import *
+from comnuoc.calendar.domain.util.profiler import Profiler
 
 
 class EventIdNormalizer(ABC):
@@ -32,13 +33,20 @@ class EventNormalizer(object):
         intervalNormalizer: EventIntervalNormalizer,
         trueValue: str = "1",
         falseValue: str = "0",
+        profiler: Profiler = None,
     ) -> None:
+        if profiler is None:
+            profiler = Profiler()
+
         self._idNormalizer = idNormalizer
         self._intervalNormalizer = intervalNormalizer
         self._trueValue = trueValue
         self._falseValue = falseValue
+        self._profiler = profiler
 
     def normalize(self, event: Event) -> list[str]:
+        self._profiler.count("EventNormalizer.normalize")
+
         return [
             self._idNormalizer.normalize(event.getId()),
             str(event.getTitle()),
@@ -49,6 +57,8 @@ class EventNormalizer(object):
         ]
 
     def denormalize(self, data: list[str]) -> Event:
+        self._profiler.count("EventNormalizer.denormalize")
+
         return Event(
             id=self._idNormalizer.denormalize(data[0]),
             title=EventTitle(data[1]),
@@ -59,6 +69,9 @@ class EventNormalizer(object):
             recurrenceInterval=self._intervalNormalizer.denormalize(data[5]),
         )
 
+    def normalizeId(self, id: EventId) -> str:
+        return self._idNormalizer.normalize(id)
+
     def normalizeDateTime(self, date: datetime.datetime) -> str:
         return date.astimezone(datetime.timezone.utc).isoformat()
 
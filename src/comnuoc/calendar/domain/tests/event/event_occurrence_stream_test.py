@@ -0,0 +1,87 @@
+import datetime
+import unittest
+
+from dateutil import rrule
+
+from comnuoc.calendar.domain.event.event import *
+from comnuoc.calendar.domain.event.event_occurrence_stream import (
+    EventOccurrenceStream,
+)
+from comnuoc.calendar.domain.event.event_repository import DictEventRepository
+
+from comnuoc.calendar.infrastructure.event.event_repository import (
+    EventIdUuidGenerator,
+    EventRecurrenceRruleChecker,
+)
+from comnuoc.calendar.infrastructure.event.event_serializer import (
+    EventIdUuidNormalizer,
+)
+
+
+class EventOccurrenceStreamTest(unittest.TestCase):
+    def testOccurrencesOfRepositoriesAreMerged(self) -> None:
+        checker = EventRecurrenceRruleChecker()
+        repositories = [
+            DictEventRepository(
+                idNormalizer=EventIdUuidNormalizer(),
+                idGenerator=EventIdUuidGenerator(),
+                recurrenceChecker=checker,
+            )
+            for i in range(2)
+        ]
+        repositories[0].insert(
+            self.__createEvent("Daily", datetime.datetime(2024, 3, 1, 12), "FREQ=DAILY")
+        )
+        repositories[0].insert(
+            self.__createEvent("One time", datetime.datetime(2024, 3, 4, 10))
+        )
+        repositories[1].insert(
+            self.__createEvent(
+                "Weekly", datetime.datetime(2024, 2, 27, 9), "FREQ=WEEKLY"
+            )
+        )
+        stream = EventOccurrenceStream(checker, datetime.timedelta(days=2))
+        tzInfo = datetime.timezone(datetime.timedelta(hours=2))
+        occurrences = list(
+            stream.iterate(
+                repositories,
+                datetime.datetime(2024, 3, 4, tzinfo=tzInfo),
+                datetime.datetime(2024, 3, 7, tzinfo=tzInfo),
+            )
+        )
+
+        self.assertEqual(
+            [
+                (startDate.day, startDate.hour, str(event.getTitle()))
+                for startDate, endDate, event in occurrences
+            ],
+            [
+                (4, 12, "One time"),
+                (4, 14, "Daily"),
+                (5, 11, "Weekly"),
+                (5, 14, "Daily"),
+                (6, 14, "Daily"),
+            ],
+        )
+        self.assertEqual(
+            occurrences[2][1], datetime.datetime(2024, 3, 5, 12, tzinfo=tzInfo)
+        )
+
+    def __createEvent(
+        self, title: str, startDate: datetime.datetime, rule: str = None
+    ) -> Event:
+        startDate = startDate.replace(tzinfo=datetime.timezone.utc)
+        interval = None
+
+        if rule is not None:
+            interval = EventInterval(rrule.rrulestr(rule, dtstart=startDate))
+
+        return Event(
+            id=EventIdUuidGenerator().generate(),
+            title=EventTitle(title),
+            dateTimeRange=EventDateTimeRange(
+                startDate, startDate + datetime.timedelta(hours=1)
+            ),
+            isRecurrent=interval is not None,
+            recurrenceInterval=interval,
+        )
@@ -0,0 +1,23 @@
+import unittest
+
+from comnuoc.calendar.domain.event.event_repository import DictEventRepository
+
+from comnuoc.calendar.infrastructure.event.event_repository import (
+    EventIdUuidGenerator,
+    EventRecurrenceRruleChecker,
+)
+from comnuoc.calendar.infrastructure.event.event_serializer import (
+    EventIdUuidNormalizer,
+)
+from comnuoc.calendar.infrastructure.tests.event.event_repository_test import (
+    EventRepositoryTestMixin,
+)
+
+
+class DictEventRepositoryTest(EventRepositoryTestMixin, unittest.TestCase):
+    def _createRepository(self) -> DictEventRepository:
+        return DictEventRepository(
+            idNormalizer=EventIdUuidNormalizer(),
+            idGenerator=EventIdUuidGenerator(),
+            recurrenceChecker=EventRecurrenceRruleChecker(),
+        )
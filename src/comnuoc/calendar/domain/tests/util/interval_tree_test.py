@@ -0,0 +1,41 @@
+import random
+import unittest
+
+from comnuoc.calendar.domain.util.interval_tree import IntervalTree
+
+
+class IntervalTreeTest(unittest.TestCase):
+    def testFindOverlapping(self) -> None:
+        tree = IntervalTree(
+            [(5, 8, "b"), (1, 3, "a"), (9, 9, "c"), (2, 20, "long"), (12, 15, "d")]
+        )
+
+        self.assertEqual(len(tree), 5)
+        self.assertEqual(tree.findOverlapping(3, 4), ["a", "long"])
+        self.assertEqual(tree.findOverlapping(9, 11), ["long", "c"])
+        self.assertEqual(tree.findOverlapping(21, 30), [])
+        self.assertEqual(tree.findOverlapping(0, 0), [])
+        self.assertEqual(IntervalTree([]).findOverlapping(0, 10), [])
+
+    def testSameResultsAsScan(self) -> None:
+        randomizer = random.Random(7)
+        intervals = []
+
+        for value in range(200):
+            start = randomizer.randint(0, 1000)
+            intervals.append((start, start + randomizer.randint(0, 50), value))
+
+        tree = IntervalTree(intervals)
+
+        for i in range(100):
+            start = randomizer.randint(0, 1000)
+            end = start + randomizer.randint(0, 30)
+            expected = [
+                value
+                for intervalStart, intervalEnd, value in sorted(
+                    intervals, key=lambda interval: interval[0]
+                )
+                if intervalStart <= end and intervalEnd >= start
+            ]
+
+            self.assertEqual(tree.findOverlapping(start, end), expected)
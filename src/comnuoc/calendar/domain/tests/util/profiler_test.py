@@ -0,0 +1,38 @@
+import unittest
+
+from comnuoc.calendar.domain.util.profiler import Profiler
+
+
+class ProfilerTest(unittest.TestCase):
+    def testNothingIsRecordedWhenDisabled(self) -> None:
+        profiler = Profiler()
+        profiler.count("rows")
+
+        with profiler.measure("call"):
+            pass
+
+        self.assertEqual(profiler.getStats(), {"counters": {}, "timers": {}})
+
+    def testCountersAndTimers(self) -> None:
+        profiler = Profiler(True)
+        profiler.count("rows", 3)
+        profiler.count("rows")
+
+        for i in range(2):
+            with profiler.measure("call"):
+                pass
+
+        with self.assertRaises(KeyError):
+            with profiler.measure("failed call"):
+                raise KeyError("failed")
+
+        stats = profiler.getStats()
+
+        self.assertEqual(stats["counters"], {"rows": 4})
+        self.assertEqual(stats["timers"]["call"]["calls"], 2)
+        self.assertEqual(stats["timers"]["failed call"]["calls"], 1)
+        self.assertGreaterEqual(stats["timers"]["call"]["seconds"], 0)
+
+        profiler.reset()
+
+        self.assertEqual(profiler.getStats(), {"counters": {}, "timers": {}})
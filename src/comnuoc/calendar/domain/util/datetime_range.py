@@ -63,6 +63,22 @@ class DateTimeRange(object):
 
         return True
 
+    def overlaps(self, other: "DateTimeRange") -> bool:
+        startDate = self.getRealStartDate()
+        endDate = self.getRealEndDate()
+        otherStartDate = other.getRealStartDate()
+        otherEndDate = other.getRealEndDate()
+
+        if startDate is not None and otherEndDate is not None:
+            if otherEndDate < startDate:
+                return False
+
+        if endDate is not None and otherStartDate is not None:
+            if otherStartDate > endDate:
+                return False
+
+        return True
+
     def __isValidRange(self) -> bool:
         realStartDate = self.getRealStartDate()
         realEndDate = self.getRealEndDate()
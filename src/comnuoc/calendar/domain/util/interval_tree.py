@@ -0,0 +1,74 @@
+from collections.abc import Iterable
+from typing import Any
+
+
+class IntervalTree(object):
+    """
+    Static tree of closed intervals (any comparable bounds).
+    Intervals are sorted by their start and form an implicit balanced binary
+    search tree (the middle of each slice is the root of the slice),
+    each node keeps the max end of its subtree, so that a query skips the
+    subtrees which end before the queried start and the right subtrees
+    which start after the queried end.
+    """
+
+    Start = End = Value = Any
+    Interval = tuple[Start, End, Value]
+
+    def __init__(self, intervals: Iterable[Interval]) -> None:
+        intervals = sorted(intervals, key=lambda interval: interval[0])
+        self._starts = [start for start, end, value in intervals]
+        self._ends = [end for start, end, value in intervals]
+        self._values = [value for start, end, value in intervals]
+        self._maxEnds = list(self._ends)
+
+        if len(intervals) > 0:
+            self.__computeMaxEnds(0, len(intervals))
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def findOverlapping(self, start: Start, end: End) -> list[Value]:
+        """
+        Return the values of the intervals which overlap the closed interval,
+        ordered by their start.
+        """
+        indexes = []
+        # slices [low, high) of the sorted intervals
+        slices = [(0, len(self._values))]
+
+        while len(slices) > 0:
+            low, high = slices.pop()
+
+            if low >= high:
+                continue
+
+            middle = (low + high) // 2
+
+            if self._maxEnds[middle] < start:
+                continue
+
+            slices.append((low, middle))
+
+            if self._starts[middle] <= end:
+                if self._ends[middle] >= start:
+                    indexes.append(middle)
+
+                slices.append((middle + 1, high))
+
+        return [self._values[index] for index in sorted(indexes)]
+
+    def __computeMaxEnds(self, low: int, high: int) -> End:
+        middle = (low + high) // 2
+
+        if low < middle:
+            self._maxEnds[middle] = max(
+                self._maxEnds[middle], self.__computeMaxEnds(low, middle)
+            )
+
+        if middle + 1 < high:
+            self._maxEnds[middle] = max(
+                self._maxEnds[middle], self.__computeMaxEnds(middle + 1, high)
+            )
+
+        return self._maxEnds[middle]
@@ -0,0 +1,56 @@
+import contextlib
+import time
+from collections.abc import Iterator
+
+
+class Profiler(object):
+    """
+    Opt-in counters (e.g. rows read, cache hits) and timers (e.g. service calls)
+    of the hot paths. Nothing is recorded while it is disabled.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self._enabled = enabled
+        self.reset()
+
+    def isEnabled(self) -> bool:
+        return self._enabled
+
+    def setEnabled(self, enabled: bool) -> None:
+        self._enabled = enabled
+
+    def reset(self) -> None:
+        self._counters: dict[str, int] = {}
+        # name => [calls, seconds]
+        self._timers: dict[str, list] = {}
+
+    def count(self, name: str, increment: int = 1) -> None:
+        if self._enabled:
+            self._counters[name] = self._counters.get(name, 0) + increment
+
+    @contextlib.contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        if not self._enabled:
+            yield
+            return
+
+        startTime = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            timer = self._timers.setdefault(name, [0, 0.0])
+            timer[0] += 1
+            timer[1] += time.perf_counter() - startTime
+
+    def getStats(self) -> dict[str, dict]:
+        """
+        Return the recorded counters and timers (in seconds), as JSON-serializable data.
+        """
+        return {
+            "counters": dict(sorted(self._counters.items())),
+            "timers": {
+                name: {"calls": calls, "seconds": seconds}
+                for name, (calls, seconds) in sorted(self._timers.items())
+            },
+        }
@@ -0,0 +1,575 @@
+import contextlib
+import datetime
+import mmap
+import os
+import struct
+from collections.abc import Iterable, Iterator
+from tempfile import NamedTemporaryFile
+from typing import Union
+
+from comnuoc.calendar.domain.event.event import Event, EventId
+from comnuoc.calendar.domain.event.event_repository import (
+    EventIdGenerator,
+    EventIntervalIndex,
+    EventRecurrenceChecker,
+    EventRepository,
+)
+from comnuoc.calendar.domain.event.event_serializer import (
+    EventIdNormalizer,
+    EventNormalizer,
+)
+from comnuoc.calendar.domain.util.datetime_range import DateTimeRange
+
+from comnuoc.calendar.infrastructure.event.event_index import (
+    fromEpochMicroseconds,
+    toEpochMicroseconds,
+)
+
+
+class BinaryEventRepository(EventRepository):
+    """
+    Events are stored in fixed-width records:
+    16-byte ID, start and end dates (UTC epoch microseconds), flags,
+    offsets and lengths of the title and the recurrence interval
+    in a separate string heap file.
+    Records are read through mmap, so range scans only unpack the numeric
+    columns and decode strings of matching records only.
+    Overlap queries scan the start and end columns as well, instead of
+    building an interval tree, recurring events are checked occurrence-wise.
+    Fixed-width fields are updated in place, deleted records are flagged.
+    Records are found by ID through a map of their positions, which is built
+    on first use and extended with the records appended since.
+    Deleted records and replaced strings are kept, so both files only grow
+    until compact() rewrites them.
+    Operations of a transaction are replayed when it exits,
+    consecutive inserts with one write.
+    """
+
+    MAGIC = b"CNEV"
+    VERSION = 1
+    HEADER = struct.Struct("<4sI56x")
+    RECORD = struct.Struct("<16sqqB7xQIQI")
+    # start date, end date and flags
+    NUMERIC_COLUMNS = struct.Struct("<qqB")
+    NUMERIC_COLUMNS_OFFSET = 16
+    ID_SIZE = 16
+    FLAG_RECURRENT = 1
+    FLAG_DELETED = 2
+    ENCODING = "utf-8"
+
+    def __init__(
+        self,
+        idGenerator: EventIdGenerator,
+        idNormalizer: EventIdNormalizer,
+        normalizer: EventNormalizer,
+        recurrenceChecker: EventRecurrenceChecker,
+        filePath: str,
+        heapFilePath: str = None,
+    ) -> None:
+        self._idGenerator = idGenerator
+        self._idNormalizer = idNormalizer
+        self._normalizer = normalizer
+        self._recurrenceChecker = recurrenceChecker
+        # only its overlap check is used, the columns are scanned instead of its tree
+        self._intervalIndex = EventIntervalIndex(recurrenceChecker)
+        self._filePath = filePath
+
+        if heapFilePath is None:
+            heapFilePath = filePath + ".heap"
+
+        self._heapFilePath = heapFilePath
+        self._recordsFd: Union[int, None] = None
+        self._heapFd: Union[int, None] = None
+        self._recordsMap: Union[mmap.mmap, None] = None
+        self._heapMap: Union[mmap.mmap, None] = None
+        # (operation, event), operation is "insert", "update" or "delete"
+        self._pendingOperations: Union[list[tuple[str, Event]], None] = None
+        # incremented by compact(), which moves the records
+        self._generation = 0
+        # packed ID => position of the record, for the records before _indexedSize
+        self._positions: dict[bytes, int] = {}
+        self._indexedSize = self.HEADER.size
+
+    def find(self, id: EventId) -> Union[Event, None]:
+        position = self.__findPosition(id)
+
+        if position is None:
+            return None
+
+        return self.__readEvent(position)
+
+    def findByStartDate(self, startDateRange: DateTimeRange) -> Iterable[Event]:
+        for position, isRecurrent in self.__scan(startDateRange):
+            event = self.__readEvent(position)
+
+            if not isRecurrent:
+                yield event
+            elif self._recurrenceChecker.isStartDateInRange(event, startDateRange):
+                yield event
+
+    def findAll(self) -> Iterable[Event]:
+        for position, isRecurrent in self.__scan(DateTimeRange()):
+            yield self.__readEvent(position)
+
+    def findOverlapping(self, dateTimeRange: DateTimeRange) -> Iterable[Event]:
+        rangeStart, rangeEnd = self.__createEpochRange(dateTimeRange)
+        records = self.__getRecordsMap()
+
+        for position, isRecurrent in self.__scan(DateTimeRange()):
+            if isRecurrent:
+                event = self.__readEvent(position)
+
+                if self._intervalIndex.overlaps(event, dateTimeRange):
+                    yield event
+
+                continue
+
+            start, end, flags = self.NUMERIC_COLUMNS.unpack_from(
+                records, position + self.NUMERIC_COLUMNS_OFFSET
+            )
+
+            # the end date is not occupied
+            if start <= rangeEnd and max(start, end - 1) >= rangeStart:
+                yield self.__readEvent(position)
+
+    def hasEventInRange(self, startDateRange: DateTimeRange) -> bool:
+        recurringPositions = []
+
+        for position, isRecurrent in self.__scan(startDateRange):
+            if not isRecurrent:
+                return True
+
+            recurringPositions.append(position)
+
+        for position in recurringPositions:
+            if self._recurrenceChecker.isStartDateInRange(
+                self.__readEvent(position), startDateRange
+            ):
+                return True
+
+        return False
+
+    def findOccupiedDates(self, startDateRange: DateTimeRange) -> set[datetime.date]:
+        tzInfo = startDateRange.getRealStartDate().tzinfo
+        records = self.__getRecordsMap()
+        dates = set()
+
+        for position, isRecurrent in self.__scan(startDateRange):
+            if not isRecurrent:
+                start, end, flags = self.NUMERIC_COLUMNS.unpack_from(
+                    records, position + self.NUMERIC_COLUMNS_OFFSET
+                )
+                dates.add(fromEpochMicroseconds(start).astimezone(tzInfo).date())
+            else:
+                for startDate in self._recurrenceChecker.findStartDatesInRange(
+                    self.__readEvent(position), startDateRange
+                ):
+                    dates.add(startDate.astimezone(tzInfo).date())
+
+        return dates
+
+    def insert(self, event: Event) -> None:
+        self.insertMany([event])
+
+    def insertMany(self, events: Iterable[Event]) -> None:
+        if self._pendingOperations is None:
+            self.__insertMany(events)
+        else:
+            self._pendingOperations.extend(("insert", event) for event in events)
+
+    def update(self, event: Event) -> None:
+        if self._pendingOperations is None:
+            self.__update(event)
+        else:
+            self._pendingOperations.append(("update", event))
+
+    def delete(self, event: Event) -> None:
+        if self._pendingOperations is None:
+            self.__delete(event)
+        else:
+            self._pendingOperations.append(("delete", event))
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        if self._pendingOperations is not None:
+            # joins the outer transaction
+            yield
+
+            return
+
+        operations = []
+        self._pendingOperations = operations
+
+        try:
+            yield
+        finally:
+            self._pendingOperations = None
+
+        insertedEvents = []
+
+        for operation, event in operations:
+            if "insert" == operation:
+                insertedEvents.append(event)
+
+                continue
+
+            self.__insertMany(insertedEvents)
+            insertedEvents = []
+
+            if "update" == operation:
+                self.__update(event)
+            else:
+                self.__delete(event)
+
+        self.__insertMany(insertedEvents)
+
+    def generateId(self) -> EventId:
+        return self._idGenerator.generate()
+
+    def generateIds(self, count: int) -> list[EventId]:
+        return self._idGenerator.generateMany(count)
+
+    def compact(self) -> None:
+        """
+        Rewrite the records which are not deleted and their strings,
+        deleted records and replaced strings are reclaimed.
+        Iterations in progress fail afterwards, since the records are moved.
+        """
+        records = self.__getRecordsMap()
+        newRecords = bytearray(self.HEADER.pack(self.MAGIC, self.VERSION))
+        heap = bytearray()
+
+        for position in range(self.HEADER.size, len(records), self.RECORD.size):
+            (
+                id,
+                start,
+                end,
+                flags,
+                titleOffset,
+                titleLength,
+                intervalOffset,
+                intervalLength,
+            ) = self.RECORD.unpack_from(records, position)
+
+            if flags & self.FLAG_DELETED:
+                continue
+
+            title = self.__readBytes(titleOffset, titleLength)
+            interval = self.__readBytes(intervalOffset, intervalLength)
+            newRecords += self.RECORD.pack(
+                id,
+                start,
+                end,
+                flags,
+                len(heap),
+                titleLength,
+                len(heap) + titleLength,
+                intervalLength,
+            )
+            heap += title + interval
+
+        # the files are reopened and the positions are found again on the next operation
+        self.close()
+        self._generation += 1
+
+        for filePath, data in [
+            (self._heapFilePath, heap),
+            (self._filePath, newRecords),
+        ]:
+            tempFile = NamedTemporaryFile(
+                mode="wb",
+                delete=False,
+                dir=os.path.dirname(os.path.abspath(filePath)),
+            )
+
+            with tempFile:
+                tempFile.write(data)
+
+            os.replace(tempFile.name, filePath)
+
+    def close(self) -> None:
+        for fileMap in [self._recordsMap, self._heapMap]:
+            if fileMap is not None:
+                fileMap.close()
+
+        for fd in [self._recordsFd, self._heapFd]:
+            if fd is not None:
+                os.close(fd)
+
+        self._recordsMap = self._heapMap = None
+        self._recordsFd = self._heapFd = None
+        self._positions = {}
+        self._indexedSize = self.HEADER.size
+
+    def __insertMany(self, events: Iterable[Event]) -> None:
+        """
+        Strings and records are packed in memory,
+        then appended with one write to the heap and one to the records file.
+        """
+        self.__getRecordsMap()
+        heapOffset = os.lseek(self._heapFd, 0, os.SEEK_END)
+        heap = bytearray()
+        records = bytearray()
+
+        for event in events:
+            normalizedData = self._normalizer.normalize(event)
+            title = normalizedData[1].encode(self.ENCODING)
+            interval = normalizedData[5].encode(self.ENCODING)
+            titleOffset = heapOffset + len(heap)
+            heap += title
+            intervalOffset = heapOffset + len(heap)
+            heap += interval
+            records += self.__pack(event, titleOffset, title, intervalOffset, interval)
+
+        if 0 == len(records):
+            return
+
+        # strings are written first, so that readers never see a record without them
+        if len(heap) > 0:
+            os.write(self._heapFd, heap)
+
+        recordsOffset = os.lseek(self._recordsFd, 0, os.SEEK_END)
+        os.write(self._recordsFd, records)
+
+        # otherwise the records are indexed with the ones appended by others
+        if recordsOffset == self._indexedSize:
+            for offset in range(0, len(records), self.RECORD.size):
+                key = bytes(records[offset : offset + self.ID_SIZE])
+                self._positions[key] = recordsOffset + offset
+
+            self._indexedSize = recordsOffset + len(records)
+
+    def __update(self, event: Event) -> None:
+        position = self.__findPosition(event.getId())
+
+        if position is None:
+            return
+
+        os.lseek(self._recordsFd, position, os.SEEK_SET)
+        os.write(self._recordsFd, self.__packRecord(event, position))
+
+    def __delete(self, event: Event) -> None:
+        position = self.__findPosition(event.getId())
+
+        if position is None:
+            return
+
+        start, end, flags = self.NUMERIC_COLUMNS.unpack_from(
+            self._recordsMap, position + self.NUMERIC_COLUMNS_OFFSET
+        )
+        os.lseek(self._recordsFd, position + self.NUMERIC_COLUMNS_OFFSET, os.SEEK_SET)
+        os.write(
+            self._recordsFd,
+            self.NUMERIC_COLUMNS.pack(start, end, flags | self.FLAG_DELETED),
+        )
+        self._positions.pop(self.__packId(event.getId()), None)
+
+    def __scan(self, startDateRange: DateTimeRange) -> Iterable[tuple[int, bool]]:
+        """
+        Yield positions of not deleted records which are recurring
+        or start in the range, only the numeric columns are unpacked.
+        """
+        rangeStart, rangeEnd = self.__createEpochRange(startDateRange)
+        records = self.__getRecordsMap()
+        generation = self._generation
+        unpackFrom = self.NUMERIC_COLUMNS.unpack_from
+
+        for position in range(
+            self.HEADER.size + self.NUMERIC_COLUMNS_OFFSET,
+            len(records),
+            self.RECORD.size,
+        ):
+            if generation != self._generation:
+                raise RuntimeError("The events were compacted during the iteration.")
+
+            start, end, flags = unpackFrom(records, position)
+
+            if flags & self.FLAG_DELETED:
+                continue
+
+            if flags & self.FLAG_RECURRENT:
+                yield position - self.NUMERIC_COLUMNS_OFFSET, True
+            elif rangeStart <= start <= rangeEnd:
+                yield position - self.NUMERIC_COLUMNS_OFFSET, False
+
+    def __createEpochRange(self, dateTimeRange: DateTimeRange) -> tuple[int, int]:
+        startDate = dateTimeRange.getRealStartDate()
+        endDate = dateTimeRange.getRealEndDate()
+        rangeStart = -(2**63) if startDate is None else toEpochMicroseconds(startDate)
+        rangeEnd = 2**63 - 1 if endDate is None else toEpochMicroseconds(endDate)
+
+        return (rangeStart, rangeEnd)
+
+    def __findPosition(self, id: EventId) -> Union[int, None]:
+        key = self.__packId(id)
+        records = self.__getRecordsMap()
+
+        if self._indexedSize < len(records):
+            self.__indexPositions(records)
+
+        position = self._positions.get(key)
+
+        if position is None:
+            return None
+
+        # the record may have been deleted by another repository
+        start, end, flags = self.NUMERIC_COLUMNS.unpack_from(
+            records, position + self.NUMERIC_COLUMNS_OFFSET
+        )
+
+        if flags & self.FLAG_DELETED:
+            return None
+
+        return position
+
+    def __indexPositions(self, records: mmap.mmap) -> None:
+        """
+        Add the positions of the records appended since the last indexed one.
+        """
+        unpackFrom = self.NUMERIC_COLUMNS.unpack_from
+
+        for position in range(self._indexedSize, len(records), self.RECORD.size):
+            start, end, flags = unpackFrom(
+                records, position + self.NUMERIC_COLUMNS_OFFSET
+            )
+
+            if not flags & self.FLAG_DELETED:
+                self._positions[records[position : position + self.ID_SIZE]] = position
+
+        self._indexedSize = len(records)
+
+    def __readEvent(self, position: int) -> Event:
+        (
+            id,
+            start,
+            end,
+            flags,
+            titleOffset,
+            titleLength,
+            intervalOffset,
+            intervalLength,
+        ) = self.RECORD.unpack_from(self._recordsMap, position)
+        isRecurrent = bool(flags & self.FLAG_RECURRENT)
+
+        return self._normalizer.denormalize(
+            [
+                str(int.from_bytes(id, "big")),
+                self.__readString(titleOffset, titleLength),
+                self._normalizer.normalizeDateTime(fromEpochMicroseconds(start)),
+                self._normalizer.normalizeDateTime(fromEpochMicroseconds(end)),
+                self._normalizer.normalizeBoolean(isRecurrent),
+                self.__readString(intervalOffset, intervalLength),
+            ]
+        )
+
+    def __packRecord(self, event: Event, position: int) -> bytes:
+        """
+        Pack the record at the position, strings in the heap are reused
+        if they are not changed.
+        """
+        normalizedData = self._normalizer.normalize(event)
+        title = normalizedData[1].encode(self.ENCODING)
+        interval = normalizedData[5].encode(self.ENCODING)
+        (
+            id,
+            start,
+            end,
+            flags,
+            titleOffset,
+            titleLength,
+            intervalOffset,
+            intervalLength,
+        ) = self.RECORD.unpack_from(self._recordsMap, position)
+
+        if title != self.__readBytes(titleOffset, titleLength):
+            titleOffset = self.__appendString(title)
+
+        if interval != self.__readBytes(intervalOffset, intervalLength):
+            intervalOffset = self.__appendString(interval)
+
+        return self.__pack(event, titleOffset, title, intervalOffset, interval)
+
+    def __pack(
+        self,
+        event: Event,
+        titleOffset: int,
+        title: bytes,
+        intervalOffset: int,
+        interval: bytes,
+    ) -> bytes:
+        dateTimeRange = event.getDateTimeRange()
+        flags = 0
+
+        if event.isRecurrent():
+            flags |= self.FLAG_RECURRENT
+
+        return self.RECORD.pack(
+            self.__packId(event.getId()),
+            toEpochMicroseconds(dateTimeRange.getRealStartDate()),
+            toEpochMicroseconds(dateTimeRange.getRealEndDate()),
+            flags,
+            titleOffset,
+            len(title),
+            intervalOffset,
+            len(interval),
+        )
+
+    def __packId(self, id: EventId) -> bytes:
+        return int(self._idNormalizer.normalize(id)).to_bytes(16, "big")
+
+    def __appendString(self, value: bytes) -> int:
+        self.__getRecordsMap()
+        offset = os.lseek(self._heapFd, 0, os.SEEK_END)
+
+        if len(value) > 0:
+            os.write(self._heapFd, value)
+
+        return offset
+
+    def __readString(self, offset: int, length: int) -> str:
+        return self.__readBytes(offset, length).decode(self.ENCODING)
+
+    def __readBytes(self, offset: int, length: int) -> bytes:
+        if 0 == length:
+            return b""
+
+        heapSize = os.fstat(self._heapFd).st_size
+
+        if self._heapMap is None or len(self._heapMap) != heapSize:
+            if self._heapMap is not None:
+                self._heapMap.close()
+
+            self._heapMap = mmap.mmap(self._heapFd, 0, access=mmap.ACCESS_READ)
+
+        return self._heapMap[offset : offset + length]
+
+    def __getRecordsMap(self) -> mmap.mmap:
+        if self._recordsFd is None:
+            self.__open()
+
+        size = os.fstat(self._recordsFd).st_size
+
+        # the previous map is not closed, scans in progress still read it
+        # (records are only appended, updates are seen through both maps)
+        # and it is closed when they release it
+        if self._recordsMap is None or len(self._recordsMap) != size:
+            self._recordsMap = mmap.mmap(self._recordsFd, 0, access=mmap.ACCESS_READ)
+
+        return self._recordsMap
+
+    def __open(self) -> None:
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        self._recordsFd = os.open(self._filePath, flags, 0o644)
+        self._heapFd = os.open(self._heapFilePath, flags, 0o644)
+
+        if 0 == os.fstat(self._recordsFd).st_size:
+            os.write(self._recordsFd, self.HEADER.pack(self.MAGIC, self.VERSION))
+
+            return
+
+        magic, version = self.HEADER.unpack(os.read(self._recordsFd, self.HEADER.size))
+
+        if self.MAGIC != magic or self.VERSION != version:
+            self.close()
+
+            raise ValueError(f'"{self._filePath}" is not a valid events file.')
@@ -0,0 +1,503 @@
+import bisect
+import datetime
+import json
+import os
+import re
+import shutil
+from collections.abc import Iterable, Iterator
+from tempfile import NamedTemporaryFile
+from typing import Union
+
+from comnuoc.calendar.domain.event.event_index import EventTitleIndex
+from comnuoc.calendar.domain.util.datetime_range import DateTimeRange
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def toEpochMicroseconds(date: datetime.datetime) -> int:
+    return (date - EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def fromEpochMicroseconds(microseconds: int) -> datetime.datetime:
+    return EPOCH + datetime.timedelta(microseconds=microseconds)
+
+
+class CsvEventStartDateIndex(object):
+    """
+    Sidecar index of an events CSV file.
+    One-time events are kept sorted by their UTC start (epoch microseconds)
+    together with the byte offsets of their rows, recurring events are kept
+    as a list of row offsets together with the bounds of their occurrences,
+    so that expired and not yet started ones are skipped without being read.
+    The index is bound to the (inode, size, mtime) signature of the CSV file,
+    it is stale as soon as the CSV file is changed.
+    """
+
+    VERSION = 3
+
+    Signature = tuple[int, int, int]
+
+    def __init__(self, filePath: str) -> None:
+        self._filePath = filePath
+        self.reset(None)
+
+    def reset(self, signature: Union[Signature, None]) -> None:
+        self._signature = signature
+        self._oneTimeStarts: list[int] = []
+        self._oneTimeOffsets: list[int] = []
+        self._recurringOffsets: list[int] = []
+        self._recurringFirsts: list[int] = []
+        self._recurringLasts: list[Union[int, None]] = []
+
+    def build(
+        self,
+        signature: Signature,
+        oneTimeRows: list[tuple[datetime.datetime, int]],
+        recurringRows: list[tuple[int, DateTimeRange]],
+    ) -> None:
+        oneTimeRows = sorted(
+            (toEpochMicroseconds(startDate), offset)
+            for startDate, offset in oneTimeRows
+        )
+
+        self.reset(signature)
+        self._oneTimeStarts = [start for start, offset in oneTimeRows]
+        self._oneTimeOffsets = [offset for start, offset in oneTimeRows]
+
+        for offset, bounds in recurringRows:
+            self.addRecurring(offset, bounds)
+
+    def getSignature(self) -> Union[Signature, None]:
+        return self._signature
+
+    def setSignature(self, signature: Signature) -> None:
+        self._signature = signature
+
+    def isFresh(self, signature: Signature) -> bool:
+        return self._signature is not None and self._signature == signature
+
+    def addOneTime(self, startDate: datetime.datetime, offset: int) -> None:
+        start = toEpochMicroseconds(startDate)
+        position = bisect.bisect_right(self._oneTimeStarts, start)
+        self._oneTimeStarts.insert(position, start)
+        self._oneTimeOffsets.insert(position, offset)
+
+    def addRecurring(self, offset: int, bounds: DateTimeRange) -> None:
+        lastDate = bounds.getRealEndDate()
+
+        self._recurringOffsets.append(offset)
+        self._recurringFirsts.append(toEpochMicroseconds(bounds.getRealStartDate()))
+        self._recurringLasts.append(
+            None if lastDate is None else toEpochMicroseconds(lastDate)
+        )
+
+    def findOneTimeOffsets(self, startDateRange: DateTimeRange) -> list[int]:
+        left, right = self.__findOneTimeBounds(startDateRange)
+
+        return self._oneTimeOffsets[left:right]
+
+    def findOneTimeStartDates(
+        self, startDateRange: DateTimeRange
+    ) -> list[datetime.datetime]:
+        left, right = self.__findOneTimeBounds(startDateRange)
+
+        return [
+            fromEpochMicroseconds(start) for start in self._oneTimeStarts[left:right]
+        ]
+
+    def findRecurringOffsets(self, startDateRange: DateTimeRange) -> list[int]:
+        """
+        Return offsets of the recurring events which may have an occurrence
+        in the range.
+        """
+        startDate = startDateRange.getRealStartDate()
+        endDate = startDateRange.getRealEndDate()
+        rangeStart = -(2**63) if startDate is None else toEpochMicroseconds(startDate)
+        rangeEnd = 2**63 - 1 if endDate is None else toEpochMicroseconds(endDate)
+
+        return [
+            offset
+            for offset, first, last in zip(
+                self._recurringOffsets, self._recurringFirsts, self._recurringLasts
+            )
+            if first <= rangeEnd and (last is None or last >= rangeStart)
+        ]
+
+    def load(self, signature: Signature) -> bool:
+        """
+        Load the index from the sidecar file.
+        Return False if the file does not exist, is broken or is stale.
+        """
+        try:
+            with open(self._filePath, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return False
+
+        if (
+            not isinstance(data, dict)
+            or self.VERSION != data.get("version")
+            or list(signature) != data.get("signature")
+        ):
+            return False
+
+        self.reset(signature)
+        self._oneTimeStarts = data["oneTimeStarts"]
+        self._oneTimeOffsets = data["oneTimeOffsets"]
+        self._recurringOffsets = data["recurringOffsets"]
+        self._recurringFirsts = data["recurringFirsts"]
+        self._recurringLasts = data["recurringLasts"]
+
+        return True
+
+    def save(self) -> None:
+        data = {
+            "version": self.VERSION,
+            "signature": list(self._signature),
+            "oneTimeStarts": self._oneTimeStarts,
+            "oneTimeOffsets": self._oneTimeOffsets,
+            "recurringOffsets": self._recurringOffsets,
+            "recurringFirsts": self._recurringFirsts,
+            "recurringLasts": self._recurringLasts,
+        }
+        tempFile = NamedTemporaryFile(
+            mode="w",
+            delete=False,
+            encoding="utf-8",
+            dir=os.path.dirname(os.path.abspath(self._filePath)),
+        )
+
+        with tempFile:
+            json.dump(data, tempFile, separators=(",", ":"))
+
+        shutil.move(tempFile.name, self._filePath)
+
+    def __findOneTimeBounds(self, startDateRange: DateTimeRange) -> tuple[int, int]:
+        startDate = startDateRange.getRealStartDate()
+        endDate = startDateRange.getRealEndDate()
+
+        if startDate is None:
+            left = 0
+        else:
+            left = bisect.bisect_left(
+                self._oneTimeStarts, toEpochMicroseconds(startDate)
+            )
+
+        if endDate is None:
+            right = len(self._oneTimeStarts)
+        else:
+            right = bisect.bisect_right(
+                self._oneTimeStarts, toEpochMicroseconds(endDate)
+            )
+
+        return left, right
+
+
+class EventTitleTrigramIndex(EventTitleIndex):
+    """
+    Sidecar inverted index of the event titles of a store (any storage).
+    Titles are split into case-insensitive tokens, each token is mapped to
+    the IDs of the events whose title has it and each trigram of a token
+    to the tokens (of the vocabulary) which have it, so that a query token is
+    matched exactly, as a prefix (by bisecting the sorted vocabulary),
+    as a substring or by similar trigrams (e.g. a typo) without scanning the events.
+    The sidecar file is a log of JSON lines: the titles, then the changes appended
+    by each save, it is rewritten when the changes outnumber the titles.
+    The postings are rebuilt when the index is loaded.
+    The index is bound to the (inode, size, mtime) signature of the store file,
+    it is stale as soon as the store is changed (unless it is updated with the change).
+    If the store has no file, the index is only kept in memory.
+    """
+
+    VERSION = 1
+
+    Signature = tuple[int, int, int]
+    EventId = str
+    Score = float
+
+    EXACT_SCORE = 1.0
+    PREFIX_SCORE = 0.8
+    SUBSTRING_SCORE = 0.6
+    # tokens with similar trigrams score the half of their similarity (Jaccard)
+    SIMILAR_SCORE = 0.5
+    MIN_SIMILARITY = 0.4
+    MIN_SUBSTRING_LENGTH = 3
+    MIN_COMPACTION_CHANGES = 1000
+    TOKEN_PATTERN = re.compile(r"\w+")
+
+    def __init__(self, filePath: str, storeFilePath: str) -> None:
+        self._filePath = filePath
+        self._storeFilePath = storeFilePath
+        self.reset(None)
+
+    def reset(self, signature: Union[Signature, None]) -> None:
+        self._signature = signature
+        # False until the index is built or loaded
+        self._isBuilt = False
+        # event ID => title
+        self._titles: dict[str, str] = {}
+        # token => event IDs (as keys, in the insertion order)
+        self._postings: dict[str, dict[str, None]] = {}
+        # sorted tokens
+        self._tokens: list[str] = []
+        # trigram => tokens
+        self._trigramTokens: dict[str, set[str]] = {}
+        # (event ID, title or None if removed) since the last save
+        self._changes: list[tuple[str, Union[str, None]]] = []
+        # changes appended to the sidecar file since it was written,
+        # None if the sidecar file does not hold the index
+        self._savedChanges: Union[int, None] = None
+
+    def build(
+        self,
+        signature: Union[Signature, None],
+        titles: Iterable[tuple[EventId, str]],
+    ) -> None:
+        self.reset(signature)
+        self._isBuilt = True
+
+        for id, title in titles:
+            self.__add(id, title)
+
+    def getSignature(self) -> Union[Signature, None]:
+        return self._signature
+
+    def setSignature(self, signature: Union[Signature, None]) -> None:
+        self._signature = signature
+
+    def getStoreSignature(self) -> Union[Signature, None]:
+        """
+        Return the current signature of the store file, None if it does not exist.
+        """
+        try:
+            stat = os.stat(self._storeFilePath)
+        except OSError:
+            return None
+
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def isFresh(self, signature: Union[Signature, None]) -> bool:
+        return self._isBuilt and self._signature == signature
+
+    def add(self, id: EventId, title: str) -> None:
+        """
+        Add the title of the event, its previous title is replaced.
+        """
+        self.__add(id, title)
+        self._changes.append((id, title))
+
+    def remove(self, id: EventId) -> None:
+        self.__remove(id)
+        self._changes.append((id, None))
+
+    def search(self, query: str) -> Iterator[tuple[EventId, Score]]:
+        """
+        Yield the IDs of the events whose title matches a token of the query
+        with their scores (the sum of the best match of each query token),
+        the best ones first.
+        """
+        queryTokens = self.__tokenize(query)
+
+        if 1 == len(queryTokens):
+            # IDs are yielded token by token, without scoring every matching event
+            seenIds = set()
+
+            for token, score in self.__match(queryTokens[0]):
+                for id in self._postings[token]:
+                    if id not in seenIds:
+                        seenIds.add(id)
+
+                        yield (id, score)
+
+            return
+
+        scores: dict[str, float] = {}
+
+        for queryToken in queryTokens:
+            bestScores: dict[str, float] = {}
+
+            for token, score in self.__match(queryToken):
+                for id in self._postings[token]:
+                    if id not in bestScores:
+                        bestScores[id] = score
+
+            for id, score in bestScores.items():
+                scores[id] = scores.get(id, 0.0) + score
+
+        yield from sorted(scores.items(), key=lambda idScore: -idScore[1])
+
+    def load(self, signature: Signature) -> bool:
+        """
+        Load the index from the sidecar file (the titles, then the changes).
+        Return False if the file does not exist, is broken or is stale.
+        """
+        try:
+            with open(self._filePath, encoding="utf-8") as file:
+                header = json.loads(file.readline())
+
+                if (
+                    not isinstance(header, dict)
+                    or self.VERSION != header.get("version")
+                    or signature is None
+                ):
+                    return False
+
+                self.build(header["signature"], header["titles"].items())
+                savedChanges = 0
+
+                for line in file:
+                    entry = json.loads(line)
+
+                    for id, title in entry["changes"]:
+                        if title is None:
+                            self.__remove(id)
+                        else:
+                            self.__add(id, title)
+
+                    self._signature = entry["signature"]
+                    savedChanges += len(entry["changes"])
+        except (OSError, ValueError, KeyError, TypeError):
+            self.reset(None)
+
+            return False
+
+        if list(signature) != self._signature:
+            self.reset(None)
+
+            return False
+
+        self._signature = signature
+        self._savedChanges = savedChanges
+
+        return True
+
+    def save(self) -> None:
+        """
+        Append the changes since the last save to the sidecar file,
+        or rewrite it if it does not hold the index or has too many changes.
+        Nothing is saved if the store has no file.
+        """
+        if self._signature is None:
+            return
+
+        if self._savedChanges is not None and self._savedChanges + len(
+            self._changes
+        ) <= max(len(self._titles), self.MIN_COMPACTION_CHANGES):
+            entry = {"signature": list(self._signature), "changes": self._changes}
+
+            with open(self._filePath, "a", encoding="utf-8") as file:
+                file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+            self._savedChanges += len(self._changes)
+            self._changes = []
+
+            return
+
+        header = {
+            "version": self.VERSION,
+            "signature": list(self._signature),
+            "titles": self._titles,
+        }
+        tempFile = NamedTemporaryFile(
+            mode="w",
+            delete=False,
+            encoding="utf-8",
+            dir=os.path.dirname(os.path.abspath(self._filePath)),
+        )
+
+        with tempFile:
+            tempFile.write(json.dumps(header, separators=(",", ":")) + "\n")
+
+        shutil.move(tempFile.name, self._filePath)
+
+        self._savedChanges = 0
+        self._changes = []
+
+    def __add(self, id: EventId, title: str) -> None:
+        self.__remove(id)
+        self._titles[id] = title
+
+        for token in self.__tokenize(title):
+            if token not in self._postings:
+                self._postings[token] = {}
+                bisect.insort(self._tokens, token)
+
+                for trigram in self.__getTrigrams(token):
+                    self._trigramTokens.setdefault(trigram, set()).add(token)
+
+            self._postings[token][id] = None
+
+    def __remove(self, id: EventId) -> None:
+        title = self._titles.pop(id, None)
+
+        if title is None:
+            return
+
+        for token in self.__tokenize(title):
+            ids = self._postings[token]
+            del ids[id]
+
+            if len(ids) > 0:
+                continue
+
+            del self._postings[token]
+            del self._tokens[bisect.bisect_left(self._tokens, token)]
+
+            for trigram in self.__getTrigrams(token):
+                tokens = self._trigramTokens[trigram]
+                tokens.discard(token)
+
+                if len(tokens) == 0:
+                    del self._trigramTokens[trigram]
+
+    def __match(self, queryToken: str) -> list[tuple[str, Score]]:
+        """
+        Return the tokens which match the query token with their scores,
+        the best ones first.
+        """
+        scores = {}
+
+        if queryToken in self._postings:
+            scores[queryToken] = self.EXACT_SCORE
+
+        position = bisect.bisect_right(self._tokens, queryToken)
+
+        while position < len(self._tokens) and self._tokens[position].startswith(
+            queryToken
+        ):
+            scores[self._tokens[position]] = self.PREFIX_SCORE
+            position += 1
+
+        queryTrigrams = self.__getTrigrams(queryToken)
+        # token => number of trigrams shared with the query token
+        sharedTrigrams: dict[str, int] = {}
+
+        for trigram in queryTrigrams:
+            for token in self._trigramTokens.get(trigram, ()):
+                sharedTrigrams[token] = sharedTrigrams.get(token, 0) + 1
+
+        for token, count in sharedTrigrams.items():
+            if token in scores:
+                continue
+
+            if len(queryToken) >= self.MIN_SUBSTRING_LENGTH and queryToken in token:
+                scores[token] = self.SUBSTRING_SCORE
+
+                continue
+
+            similarity = count / (
+                len(queryTrigrams) + len(self.__getTrigrams(token)) - count
+            )
+
+            if similarity >= self.MIN_SIMILARITY:
+                scores[token] = self.SIMILAR_SCORE * similarity
+
+        return sorted(scores.items(), key=lambda tokenScore: -tokenScore[1])
+
+    def __tokenize(self, title: str) -> list[str]:
+        return list(dict.fromkeys(self.TOKEN_PATTERN.findall(title.casefold())))
+
+    def __getTrigrams(self, token: str) -> set[str]:
+        paddedToken = f" {token} "
+
+        return set(paddedToken[i : i + 3] for i in range(len(paddedToken) - 2))
@@ -0,0 +1,168 @@
+import datetime
+from typing import Union
+
+from dateutil import rrule
+
+
+class RruleComponents(object):
+    """
+    Components of the RRULE line of a rule, read from its text,
+    as dateutil does not expose them (e.g. COUNT and UNTIL).
+    Only the components given to the rule are present, e.g. there is
+    no BYMONTHDAY if the day of month is taken from the start date.
+    """
+
+    RRULE_PREFIX = "RRULE:"
+    DATE_FORMAT = "%Y%m%dT%H%M%S"
+
+    def __init__(self, rule: rrule.rrule) -> None:
+        self._components: dict[str, str] = {}
+
+        for line in str(rule).splitlines():
+            if not line.upper().startswith(self.RRULE_PREFIX):
+                continue
+
+            for component in line[len(self.RRULE_PREFIX) :].split(";"):
+                name, separator, value = component.partition("=")
+                self._components[name.upper()] = value
+
+    def has(self, name: str) -> bool:
+        return name in self._components
+
+    def getFreq(self) -> int:
+        return rrule.FREQNAMES.index(self._components["FREQ"].upper())
+
+    def getInterval(self) -> int:
+        return int(self._components.get("INTERVAL", 1))
+
+    def getCount(self) -> Union[int, None]:
+        count = self._components.get("COUNT")
+
+        return None if count is None else int(count)
+
+    def getUntil(
+        self, tzInfo: Union[datetime.tzinfo, None]
+    ) -> Union[datetime.datetime, None]:
+        """
+        UNTIL is serialized without time zone (as DTSTART),
+        in that case it is in the given time zone.
+        """
+        until = self._components.get("UNTIL")
+
+        if until is None:
+            return None
+
+        if until.upper().endswith("Z"):
+            return datetime.datetime.strptime(until[:-1], self.DATE_FORMAT).replace(
+                tzinfo=datetime.timezone.utc
+            )
+
+        return datetime.datetime.strptime(until, self.DATE_FORMAT).replace(
+            tzinfo=tzInfo
+        )
+
+
+class RruleOccurrenceEngine(object):
+    """
+    Expand rules from a start date moved close to the queried date,
+    so that the cost does not depend on how far in the past the rule starts.
+    The start date of DAILY, WEEKLY and MONTHLY rules is moved by a whole number
+    of periods computed from FREQ and INTERVAL (one period before the queried date,
+    to keep occurrences of the period which the queried date belongs to),
+    other rules (and rules with COUNT or BYSETPOS) are expanded by dateutil
+    from their own start date.
+    The start date is given by the caller, which has just set it on the rule,
+    and so can be the components of the rule (they are read from it otherwise).
+    """
+
+    SUPPORTED_FREQS = [rrule.DAILY, rrule.WEEKLY, rrule.MONTHLY]
+    DAY_SELECTORS = ["BYMONTHDAY", "BYDAY", "BYYEARDAY", "BYWEEKNO", "BYEASTER"]
+
+    def between(
+        self,
+        rule: rrule.rrule,
+        startDate: datetime.datetime,
+        after: datetime.datetime,
+        before: datetime.datetime,
+        inc: bool = False,
+        components: RruleComponents = None,
+    ) -> list[datetime.datetime]:
+        return self.moveStartDate(rule, startDate, after, components).between(
+            after, before, inc
+        )
+
+    def moveStartDate(
+        self,
+        rule: rrule.rrule,
+        startDate: datetime.datetime,
+        date: datetime.datetime,
+        components: RruleComponents = None,
+    ) -> rrule.rrule:
+        """
+        Return a rule which has the same occurrences as the given rule
+        (which starts at the given start date) from the given date,
+        with the start date moved close to the given date.
+        """
+        if components is None:
+            components = RruleComponents(rule)
+
+        freq = components.getFreq()
+
+        if (
+            freq not in self.SUPPORTED_FREQS
+            or components.has("COUNT")
+            or components.has("BYSETPOS")
+        ):
+            return rule
+
+        if startDate.tzinfo is not None and date.tzinfo is not None:
+            date = date.astimezone(startDate.tzinfo)
+
+        if date <= startDate:
+            return rule
+
+        interval = components.getInterval()
+
+        if rrule.DAILY == freq:
+            periods = (date.date() - startDate.date()).days // interval - 1
+
+            if periods <= 0:
+                return rule
+
+            return rule.replace(
+                dtstart=startDate + datetime.timedelta(days=periods * interval)
+            )
+
+        if rrule.WEEKLY == freq:
+            periods = (date.date() - startDate.date()).days // (7 * interval) - 1
+
+            if periods <= 0:
+                return rule
+
+            return rule.replace(
+                dtstart=startDate + datetime.timedelta(weeks=periods * interval)
+            )
+
+        months = (date.year - startDate.year) * 12 + date.month - startDate.month
+        periods = months // interval - 1
+
+        if periods <= 0:
+            return rule
+
+        month = startDate.month - 1 + periods * interval
+        newStartDate = startDate.replace(
+            year=startDate.year + month // 12, month=month % 12 + 1, day=1
+        )
+
+        if self.__hasImplicitMonthDay(components):
+            # the day of month was taken from the original start date
+            return rule.replace(dtstart=newStartDate, bymonthday=startDate.day)
+
+        return rule.replace(dtstart=newStartDate)
+
+    def __hasImplicitMonthDay(self, components: RruleComponents) -> bool:
+        for selector in self.DAY_SELECTORS:
+            if components.has(selector):
+                return False
+
+        return True
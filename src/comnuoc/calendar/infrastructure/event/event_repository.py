@@ -1,7 +1,13 @@
+import bisect
+import contextlib
 import csv
+import datetime
+import io
+import os
 import shutil
 import uuid
-from collections.abc import Generator, Iterable
+import weakref
+from collections.abc import Generator, Iterable, Iterator
 from tempfile import NamedTemporaryFile
 from typing import Union
 
@@ -10,14 +16,111 @@ from dateutil import rrule
 from comnuoc.calendar.domain.event.event import Event, EventId
 from comnuoc.calendar.domain.event.event_repository import (
     EventIdGenerator,
+    EventIntervalIndex,
     EventRecurrenceChecker,
     EventRepository,
 )
 from comnuoc.calendar.domain.event.event_serializer import EventNormalizer
 from comnuoc.calendar.domain.util.datetime_range import DateTimeRange
+from comnuoc.calendar.domain.util.profiler import Profiler
+
+from comnuoc.calendar.infrastructure.event.event_index import CsvEventStartDateIndex
+from comnuoc.calendar.infrastructure.event.event_occurrence import (
+    RruleComponents,
+    RruleOccurrenceEngine,
+)
+from comnuoc.calendar.infrastructure.util.lru_cache import LruCache
+
+
+class CsvLineReader(Iterator[str]):
+    """
+    Iterate lines of a binary file as strings and keep track of the byte offset
+    of the next line, so that the offset of each CSV row can be known
+    even when a row spans multiple lines.
+    """
+
+    def __init__(self, file, encoding: str) -> None:
+        self._file = file
+        self._encoding = encoding
+        self._offset = file.tell()
+
+    def __next__(self) -> str:
+        line = self._file.readline()
+
+        if not line:
+            raise StopIteration
+
+        self._offset += len(line)
+
+        return line.decode(self._encoding)
+
+    def getOffset(self) -> int:
+        return self._offset
+
+
+class CsvEventRow(object):
+    """
+    View of a CSV row which decodes columns on demand,
+    so that rows can be filtered on raw values before the event is built.
+    """
+
+    def __init__(
+        self, offset: int, data: list[str], normalizer: EventNormalizer
+    ) -> None:
+        self._offset = offset
+        self._data = data
+        self._normalizer = normalizer
+        self._startDate: Union[datetime.datetime, None] = None
+        self._event: Union[Event, None] = None
+
+    def getOffset(self) -> int:
+        return self._offset
+
+    def getData(self) -> list[str]:
+        return self._data
+
+    def getId(self) -> str:
+        return self._data[0]
+
+    def getStartDate(self) -> datetime.datetime:
+        if self._startDate is None:
+            self._startDate = self._normalizer.denormalizeDateTime(self._data[2])
+
+        return self._startDate
+
+    def isRecurrent(self) -> bool:
+        return self._normalizer.denormalizeBoolean(self._data[4])
+
+    def getEvent(self) -> Event:
+        if self._event is None:
+            self._event = self._normalizer.denormalize(self._data)
+
+        return self._event
+
+    def move(self, offset: int) -> "CsvEventRow":
+        """
+        Return the same row (keeping the decoded values) at another offset.
+        """
+        row = CsvEventRow(offset, self._data, self._normalizer)
+        row._startDate = self._startDate
+        row._event = self._event
+
+        return row
 
 
 class CsvEventRepository(EventRepository):
+    """
+    Rows of the CSV file are kept in memory (as lazily decoded row views)
+    together with the (inode, size, mtime) signature of the file,
+    they are reloaded only when the file is changed by someone else
+    (e.g. another process), writes made through the repository update them in place.
+    In a transaction, changes are collected by event ID and applied with one
+    append (inserts only) or one rewrite of the file.
+    """
+
+    # normalized ID => (event or None if deleted, whether it is inserted)
+    Changes = dict[str, tuple[Union[Event, None], bool]]
+
     def __init__(
         self,
         idGenerator: EventIdGenerator,
@@ -26,7 +129,12 @@ class CsvEventRepository(EventRepository):
         filePath: str,
         dialectName: str = "excel",
         encoding: str = "utf-8",
+        indexFilePath: str = None,
+        profiler: Profiler = None,
     ) -> None:
+        if profiler is None:
+            profiler = Profiler()
+
         self._idGenerator = idGenerator
         self._normalizer = normalizer
         self._recurrenceChecker = recurrenceChecker
@@ -34,96 +142,392 @@ class CsvEventRepository(EventRepository):
         self._dialectName = dialectName
         self._encoding = encoding
 
+        if indexFilePath is None:
+            indexFilePath = filePath + ".idx"
+
+        self._index = CsvEventStartDateIndex(indexFilePath)
+        # IDs by the dates occupied by the events, bound to the rows
+        self._intervalIndex = EventIntervalIndex(recurrenceChecker)
+        self._profiler = profiler
+        self._changes: Union[CsvEventRepository.Changes, None] = None
+        self.__resetRows(None)
+
     def find(self, id: EventId) -> Union[Event, None]:
-        events = self.__readEvents()
+        rows = self.__getRows()
+        offset = self._offsets.get(self._normalizer.normalizeId(id))
 
-        try:
-            for event in events:
-                if event.getId() == id:
-                    return event
-        finally:
-            events.close()  # as https://peps.python.org/pep-0533/
+        if offset is None:
+            return None
 
-        return None
+        return rows[offset].getEvent()
 
     def findByStartDate(self, startDateRange: DateTimeRange) -> Iterable[Event]:
-        events = self.__readEvents()
+        index = self.__getIndex()
+        rows = self.__getRows()
+        oneTimeOffsets = index.findOneTimeOffsets(startDateRange)
+        offsets = sorted(oneTimeOffsets + index.findRecurringOffsets(startDateRange))
+        oneTimeOffsets = set(oneTimeOffsets)
+
+        for offset in offsets:
+            event = rows[offset].getEvent()
+
+            if offset in oneTimeOffsets:
+                yield event
+            elif self._recurrenceChecker.isStartDateInRange(event, startDateRange):
+                yield event
+
+    def findAll(self) -> Iterable[Event]:
+        """
+        Rows are read from the file, without being kept in memory.
+        """
+        rows = self.__readRows()
 
         try:
-            for event in events:
-                if not event.isRecurrent():
-                    if startDateRange.includes(event.getDateTimeRange().getStartDate()):
-                        yield event
-                else:
-                    if self._recurrenceChecker.isStartDateInRange(
-                        event, startDateRange
-                    ):
-                        yield event
+            for row in rows:
+                yield row.getEvent()
         finally:
-            events.close()  # as https://peps.python.org/pep-0533/
+            rows.close()  # as https://peps.python.org/pep-0533/
+
+    def findOverlapping(self, dateTimeRange: DateTimeRange) -> Iterable[Event]:
+        rows = self.__getRows()
+
+        if not self._intervalIndex.isFresh(self._signature):
+            self._profiler.count("CsvEventRepository.intervalIndexBuilds")
+            self._intervalIndex.build(
+                self._signature,
+                [(row.getId(), row.getEvent()) for row in rows.values()],
+            )
+
+        for id in self._intervalIndex.findKeys(dateTimeRange):
+            event = rows[self._offsets[id]].getEvent()
+
+            if self._intervalIndex.overlaps(event, dateTimeRange):
+                yield event
 
     def hasEventInRange(self, startDateRange: DateTimeRange) -> bool:
-        events = self.__readEvents()
+        index = self.__getIndex()
 
-        try:
-            for event in events:
-                if not event.isRecurrent():
-                    if startDateRange.includes(event.getDateTimeRange().getStartDate()):
-                        return True
-                else:
-                    if self._recurrenceChecker.isStartDateInRange(
-                        event, startDateRange
-                    ):
-                        return True
-        finally:
-            events.close()  # as https://peps.python.org/pep-0533/
+        if len(index.findOneTimeOffsets(startDateRange)) > 0:
+            return True
+
+        rows = self.__getRows()
+
+        for offset in index.findRecurringOffsets(startDateRange):
+            if self._recurrenceChecker.isStartDateInRange(
+                rows[offset].getEvent(), startDateRange
+            ):
+                return True
 
         return False
 
+    def findOccupiedDates(self, startDateRange: DateTimeRange) -> set[datetime.date]:
+        tzInfo = startDateRange.getRealStartDate().tzinfo
+        index = self.__getIndex()
+        rows = self.__getRows()
+        dates = set(
+            startDate.astimezone(tzInfo).date()
+            for startDate in index.findOneTimeStartDates(startDateRange)
+        )
+
+        for offset in index.findRecurringOffsets(startDateRange):
+            for startDate in self._recurrenceChecker.findStartDatesInRange(
+                rows[offset].getEvent(), startDateRange
+            ):
+                dates.add(startDate.astimezone(tzInfo).date())
+
+        return dates
+
     def insert(self, event: Event) -> None:
-        with open(self._filePath, "a", newline="", encoding=self._encoding) as csvFile:
-            writer = csv.writer(csvFile, dialect=self._dialectName)
-            writer.writerow(self._normalizer.normalize(event))
+        self.insertMany([event])
+
+    def insertMany(self, events: Iterable[Event]) -> None:
+        if self._changes is None:
+            self.__append(events)
+
+            return
+
+        for event in events:
+            self._changes[self._normalizer.normalizeId(event.getId())] = (event, True)
 
     def update(self, newEvent: Event) -> None:
-        self.__update(newEvent, False)
+        normalizedId = self._normalizer.normalizeId(newEvent.getId())
+
+        if self._changes is None:
+            self.__rewrite({normalizedId: (newEvent, False)})
+        else:
+            previousChange = self._changes.get(normalizedId, (None, False))
+            self._changes[normalizedId] = (newEvent, previousChange[1])
 
     def delete(self, deletedEvent: Event) -> None:
-        self.__update(deletedEvent, True)
+        normalizedId = self._normalizer.normalizeId(deletedEvent.getId())
+
+        if self._changes is None:
+            self.__rewrite({normalizedId: (None, False)})
+        elif self._changes.get(normalizedId, (None, False))[1]:
+            # inserted in the transaction
+            del self._changes[normalizedId]
+        else:
+            self._changes[normalizedId] = (None, False)
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        if self._changes is not None:
+            # joins the outer transaction
+            yield
+
+            return
+
+        changes: CsvEventRepository.Changes = {}
+        self._changes = changes
+
+        try:
+            yield
+        finally:
+            self._changes = None
+
+        if all(isInserted for event, isInserted in changes.values()):
+            self.__append(event for event, isInserted in changes.values())
+        else:
+            self.__rewrite(changes)
 
     def generateId(self) -> EventId:
         return self._idGenerator.generate()
 
-    def __readEvents(self) -> Generator[Event, None, None]:
-        with open(self._filePath, newline="", encoding=self._encoding) as csvFile:
-            reader = csv.reader(csvFile, dialect=self._dialectName)
+    def generateIds(self, count: int) -> list[EventId]:
+        return self._idGenerator.generateMany(count)
+
+    def __append(self, events: Iterable[Event]) -> None:
+        """
+        Rows are encoded in memory and appended with one write.
+        """
+        signature = self.__getFileSignature()
+        isIndexFresh = self._index.isFresh(signature)
+        areRowsFresh = signature == self._signature
+        isIntervalIndexFresh = areRowsFresh and self._intervalIndex.isFresh(signature)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, dialect=self._dialectName)
+        # (event, normalized event, offset from the end of the file)
+        insertedRows = []
+        lines = []
+        size = 0
+
+        for event in events:
+            data = self._normalizer.normalize(event)
+            line = self.__encodeRow(writer, buffer, data)
+            insertedRows.append((event, data, size))
+            lines.append(line)
+            size += len(line)
+
+        if 0 == len(lines):
+            return
+
+        self._profiler.count("CsvEventRepository.fileOpens")
+
+        with open(self._filePath, "ab") as csvFile:
+            fileSize = os.fstat(csvFile.fileno()).st_size
+            csvFile.write(b"".join(lines))
+
+        signature = self.__getFileSignature()
+
+        if areRowsFresh:
+            for event, data, offset in insertedRows:
+                self.__addRow(CsvEventRow(fileSize + offset, data, self._normalizer))
+
+            self._signature = signature
+
+        if isIntervalIndexFresh:
+            for event, data, offset in insertedRows:
+                self._intervalIndex.add(data[0], event)
+
+            self._intervalIndex.setSignature(signature)
+
+        # keep the index fresh instead of rebuilding it on the next query
+        if isIndexFresh:
+            for event, data, offset in insertedRows:
+                if event.isRecurrent():
+                    self._index.addRecurring(
+                        fileSize + offset,
+                        self._recurrenceChecker.findOccurrenceBounds(event),
+                    )
+                else:
+                    self._index.addOneTime(
+                        event.getDateTimeRange().getRealStartDate(), fileSize + offset
+                    )
 
-            for row in reader:
-                event = self._normalizer.denormalize(row)
+            self._index.setSignature(signature)
+            self._index.save()
+            self._profiler.count("CsvEventRepository.indexSaves")
 
-                yield event
+    def __getRows(self) -> dict[int, CsvEventRow]:
+        signature = self.__getFileSignature()
+
+        if signature == self._signature:
+            self._profiler.count("CsvEventRepository.rowsCacheHits")
+
+            return self._rows
 
-    def __update(self, updatedEvent: Event, isDeleted: bool = False) -> None:
+        self._profiler.count("CsvEventRepository.rowsCacheMisses")
+        self.__resetRows(signature)
+        rows = self.__readRows()
+
+        try:
+            for row in rows:
+                self.__addRow(row)
+        finally:
+            rows.close()  # as https://peps.python.org/pep-0533/
+
+        return self._rows
+
+    def __resetRows(
+        self, signature: Union[CsvEventStartDateIndex.Signature, None]
+    ) -> None:
+        self._signature = signature
+        # offset => row, in the file order
+        self._rows: dict[int, CsvEventRow] = {}
+        # normalized ID => offset
+        self._offsets: dict[str, int] = {}
+
+    def __addRow(self, row: CsvEventRow) -> None:
+        self._rows[row.getOffset()] = row
+        self._offsets[row.getId()] = row.getOffset()
+
+    def __readRows(self) -> Generator[CsvEventRow, None, None]:
+        self._profiler.count("CsvEventRepository.fileOpens")
+
+        with open(self._filePath, "rb") as csvFile:
+            lines = CsvLineReader(csvFile, self._encoding)
+            reader = csv.reader(lines, dialect=self._dialectName)
+
+            while True:
+                offset = lines.getOffset()
+                row = next(reader, None)
+
+                if row is None:
+                    break
+
+                if 0 == len(row):
+                    continue
+
+                self._profiler.count("CsvEventRepository.rowsRead")
+
+                yield CsvEventRow(offset, row, self._normalizer)
+
+    def __getIndex(self) -> CsvEventStartDateIndex:
+        signature = self.__getFileSignature()
+
+        if self._index.isFresh(signature):
+            return self._index
+
+        if self._index.load(signature):
+            self._profiler.count("CsvEventRepository.indexLoads")
+
+            return self._index
+
+        self._profiler.count("CsvEventRepository.indexBuilds")
+
+        oneTimeRows = []
+        recurringRows = []
+
+        for offset, row in self.__getRows().items():
+            if row.isRecurrent():
+                recurringRows.append(
+                    (
+                        offset,
+                        self._recurrenceChecker.findOccurrenceBounds(row.getEvent()),
+                    )
+                )
+            else:
+                oneTimeRows.append((row.getStartDate(), offset))
+
+        self._index.build(self._signature, oneTimeRows, recurringRows)
+        self._index.save()
+        self._profiler.count("CsvEventRepository.indexSaves")
+
+        return self._index
+
+    def __getFileSignature(self) -> CsvEventStartDateIndex.Signature:
+        stat = os.stat(self._filePath)
+
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def __encodeRow(self, writer, buffer: io.StringIO, data: list[str]) -> bytes:
+        """
+        Return the CSV line of the row, written through the buffer of the writer.
+        """
+        writer.writerow(data)
+        line = buffer.getvalue().encode(self._encoding)
+        buffer.seek(0)
+        buffer.truncate()
+
+        return line
+
+    def __rewrite(self, changes: Changes) -> None:
+        """
+        Rewrite the file once: changed rows are found by a lookup of their ID,
+        inserted events are appended.
+        """
+        rows = self.__getRows()
+        isIntervalIndexFresh = self._intervalIndex.isFresh(self._signature)
+        changedEvents = [(id, event) for id, (event, isInserted) in changes.items()]
+        changes = dict(changes)
+        updatedRows = []
+        offset = 0
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, dialect=self._dialectName)
         tempFile = NamedTemporaryFile(
-            mode="w", newline="", delete=False, encoding=self._encoding
+            mode="wb",
+            delete=False,
+            dir=os.path.dirname(os.path.abspath(self._filePath)),
         )
+        self._profiler.count("CsvEventRepository.fileOpens")
+        self._profiler.count("CsvEventRepository.fileRewrites")
 
         with tempFile:
-            writer = csv.writer(tempFile, dialect=self._dialectName)
-            events = self.__readEvents()
-
-            try:
-                for event in events:
-                    if event == updatedEvent:
-                        if not isDeleted:
-                            writer.writerow(self._normalizer.normalize(updatedEvent))
-                    else:
-                        writer.writerow(self._normalizer.normalize(event))
-            finally:
-                events.close()  # as https://peps.python.org/pep-0533/
+            # other rows are copied without being decoded
+            for row in list(rows.values()):
+                if row.getId() in changes:
+                    event, isInserted = changes.pop(row.getId())
+
+                    if event is None:
+                        continue
+
+                    row = CsvEventRow(
+                        offset, self._normalizer.normalize(event), self._normalizer
+                    )
+
+                line = self.__encodeRow(writer, buffer, row.getData())
+                tempFile.write(line)
+                updatedRows.append(row.move(offset))
+                offset += len(line)
+
+            for event, isInserted in changes.values():
+                if event is None or not isInserted:
+                    continue
+
+                row = CsvEventRow(
+                    offset, self._normalizer.normalize(event), self._normalizer
+                )
+                line = self.__encodeRow(writer, buffer, row.getData())
+                tempFile.write(line)
+                updatedRows.append(row)
+                offset += len(line)
 
         shutil.move(tempFile.name, self._filePath)
 
+        self.__resetRows(self.__getFileSignature())
+
+        for row in updatedRows:
+            self.__addRow(row)
+
+        if isIntervalIndexFresh:
+            for id, event in changedEvents:
+                if event is None or id not in self._offsets:
+                    self._intervalIndex.remove(id)
+                else:
+                    self._intervalIndex.add(id, event)
+
+            self._intervalIndex.setSignature(self._signature)
+
 
 class EventIdUuidGenerator(EventIdGenerator):
     def generate(self) -> EventId:
@@ -131,12 +535,131 @@ class EventIdUuidGenerator(EventIdGenerator):
 
         return EventId(uuid4)
 
+    def generateMany(self, count: int) -> list[EventId]:
+        """
+        Random bytes of all IDs are read at once.
+        """
+        randomBytes = os.urandom(16 * count)
+
+        return [
+            EventId(uuid.UUID(bytes=randomBytes[i : i + 16], version=4))
+            for i in range(0, 16 * count, 16)
+        ]
+
 
 class EventRecurrenceRruleChecker(EventRecurrenceChecker):
-    def __init__(self, firstWeekDay: int = 0) -> None:
+    """
+    Occurrences of an event are materialized in a window around the queried range
+    (padded by windowPadding) and cached by the event ID and a fingerprint
+    of the rule, so that following queries in the window (e.g. the days of a month)
+    are answered by bisecting the cached occurrences.
+    """
+
+    # the wall time of occurrences depends on the time zone of the queried range
+    BOUNDS_PADDING = datetime.timedelta(days=2)
+
+    # (window start, window end, occurrences)
+    CacheEntry = tuple[datetime.datetime, datetime.datetime, list[datetime.datetime]]
+
+    def __init__(
+        self,
+        firstWeekDay: int = 0,
+        cache: LruCache = None,
+        windowPadding: datetime.timedelta = datetime.timedelta(days=45),
+        occurrenceEngine: RruleOccurrenceEngine = None,
+        profiler: Profiler = None,
+    ) -> None:
         self._firstWeekDay = firstWeekDay
 
+        if cache is None:
+            cache = LruCache(1024)
+
+        if occurrenceEngine is None:
+            occurrenceEngine = RruleOccurrenceEngine()
+
+        if profiler is None:
+            profiler = Profiler()
+
+        self._cache = cache
+        self._windowPadding = windowPadding
+        self._occurrenceEngine = occurrenceEngine
+        self._profiler = profiler
+        # rule => its components, the parsed rules are shared by the interval normalizer
+        self._components: weakref.WeakKeyDictionary[rrule.rrule, RruleComponents] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def getCache(self) -> LruCache:
+        return self._cache
+
     def isStartDateInRange(self, event: Event, startDateRange: DateTimeRange) -> bool:
+        occurrences, left, right = self.__findOccurrences(event, startDateRange)
+
+        return right > left
+
+    def findStartDatesInRange(
+        self, event: Event, startDateRange: DateTimeRange
+    ) -> list[datetime.datetime]:
+        occurrences, left, right = self.__findOccurrences(event, startDateRange)
+
+        return occurrences[left:right]
+
+    def iterStartDatesInRange(
+        self, event: Event, startDateRange: DateTimeRange
+    ) -> Iterator[datetime.datetime]:
+        """
+        Occurrences are expanded one by one from the start of the range
+        (and not cached), so that the first ones are found without expanding
+        the whole range.
+        """
+        interval = self.__getRule(event)
+        components = self.__getComponents(interval)
+        rangeStartDate = startDateRange.getRealStartDate()
+        startDate = event.getDateTimeRange().getRealStartDate()
+
+        if rangeStartDate is None:
+            rangeStartDate = startDate
+        else:
+            startDate = startDate.astimezone(rangeStartDate.tzinfo)
+
+        self._profiler.count("EventRecurrenceRruleChecker.rruleIterations")
+        interval = self._occurrenceEngine.moveStartDate(
+            self.__replaceStartDate(interval, components, startDate),
+            startDate,
+            rangeStartDate,
+            components,
+        )
+
+        for date in interval.xafter(rangeStartDate, inc=True):
+            if not startDateRange.includes(date):
+                return
+
+            yield date
+
+    def findOccurrenceBounds(self, event: Event) -> DateTimeRange:
+        interval = self.__getRule(event)
+        startDate = event.getDateTimeRange().getRealStartDate()
+        components = self.__getComponents(interval)
+        lastDate = None
+
+        if components.has("COUNT"):
+            self._profiler.count("EventRecurrenceRruleChecker.rruleExpansions")
+            occurrences = list(self.__replaceStartDate(interval, components, startDate))
+
+            if len(occurrences) > 0:
+                lastDate = occurrences[-1]
+            else:
+                lastDate = startDate
+        elif components.has("UNTIL"):
+            lastDate = max(components.getUntil(startDate.tzinfo), startDate)
+
+        if lastDate is not None:
+            # occurrences are computed in the time zone of the queried range
+            lastDate = lastDate + self.BOUNDS_PADDING
+
+        return DateTimeRange(startDate, lastDate)
+
+    def __getRule(self, event: Event) -> rrule.rrule:
         interval = event.getRecurrenceInterval()
 
         if interval is None:
@@ -149,19 +672,78 @@ class EventRecurrenceRruleChecker(EventRecurrenceChecker):
                 "The value of event interval should be an instance of dateutil.rrule.rrule"
             )
 
-        # Replace start date (with the timezone of the date range) and first week day in the rule
-        # in order to ensure the integrity.
-        interval = interval.replace(
-            dtstart=event.getDateTimeRange()
-            .getRealStartDate()
-            .astimezone(startDateRange.getRealStartDate().tzinfo),
-            wkst=self._firstWeekDay,
-        )
+        return interval
 
-        occurrences = interval.between(
-            after=startDateRange.getRealStartDate(),
-            before=startDateRange.getRealEndDate(),
-            inc=True,
+    def __getComponents(self, interval: rrule.rrule) -> RruleComponents:
+        components = self._components.get(interval)
+
+        if components is None:
+            components = RruleComponents(interval)
+            self._components[interval] = components
+
+        return components
+
+    def __replaceStartDate(
+        self,
+        interval: rrule.rrule,
+        components: RruleComponents,
+        startDate: datetime.datetime,
+    ) -> rrule.rrule:
+        until = components.getUntil(startDate.tzinfo)
+
+        if until is None:
+            return interval.replace(dtstart=startDate, wkst=self._firstWeekDay)
+
+        return interval.replace(dtstart=startDate, wkst=self._firstWeekDay, until=until)
+
+    def __findOccurrences(
+        self, event: Event, startDateRange: DateTimeRange
+    ) -> tuple[list[datetime.datetime], int, int]:
+        """
+        Return the cached occurrences and the bounds of the ones in the range.
+        """
+        interval = self.__getRule(event)
+        rangeStartDate = startDateRange.getRealStartDate()
+        rangeEndDate = startDateRange.getRealEndDate()
+        startDate = event.getDateTimeRange().getRealStartDate()
+        key = (
+            str(event.getId()),
+            str(interval),
+            startDate,
+            repr(rangeStartDate.tzinfo),
         )
+        entry = self._cache.get(key)
+
+        if entry is None or rangeStartDate < entry[0] or rangeEndDate > entry[1]:
+            self._profiler.count("EventRecurrenceRruleChecker.rruleExpansions")
+            windowStartDate = rangeStartDate - self._windowPadding
+            windowEndDate = rangeEndDate + self._windowPadding
+
+            # Replace start date (with the timezone of the date range) and first week day in the rule
+            # in order to ensure the integrity.
+            components = self.__getComponents(interval)
+            startDate = startDate.astimezone(rangeStartDate.tzinfo)
+            interval = self.__replaceStartDate(interval, components, startDate)
+            entry = (
+                windowStartDate,
+                windowEndDate,
+                self._occurrenceEngine.between(
+                    interval,
+                    startDate,
+                    after=windowStartDate,
+                    before=windowEndDate,
+                    inc=True,
+                    components=components,
+                ),
+            )
+            self._cache.set(key, entry)
+        else:
+            self._profiler.count("EventRecurrenceRruleChecker.cacheHits")
+
+        occurrences = entry[2]
 
-        return len(occurrences) > 0
+        return (
+            occurrences,
+            bisect.bisect_left(occurrences, rangeStartDate),
+            bisect.bisect_right(occurrences, rangeEndDate),
+        )
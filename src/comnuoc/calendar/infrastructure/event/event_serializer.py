@@ -1,3 +1,4 @@
+import datetime
 import uuid
 
 from dateutil import rrule
@@ -5,6 +6,8 @@ from dateutil import rrule
 from comnuoc.calendar.domain.event.event import EventId
 from comnuoc.calendar.domain.event.event_serializer import *
 
+from comnuoc.calendar.infrastructure.util.lru_cache import LruCache
+
 
 class EventIdUuidNormalizer(EventIdNormalizer):
     def normalize(self, id: EventId) -> str:
@@ -22,6 +25,31 @@ class EventIdUuidNormalizer(EventIdNormalizer):
 
 
 class EventIntervalRruleNormalizer(EventIntervalNormalizer):
+    """
+    Parsed rules are cached by the normalized text (cache) and by the RRULE part
+    without DTSTART (rule cache), so rules which differ only in DTSTART
+    are parsed once.
+    """
+
+    DTSTART_PREFIX = "DTSTART:"
+    DTSTART_FORMAT = "%Y%m%dT%H%M%S"
+
+    def __init__(self, cache: LruCache = None, ruleCache: LruCache = None) -> None:
+        if cache is None:
+            cache = LruCache(4096)
+
+        if ruleCache is None:
+            ruleCache = LruCache(1024)
+
+        self._cache = cache
+        self._ruleCache = ruleCache
+
+    def getCache(self) -> LruCache:
+        return self._cache
+
+    def getRuleCache(self) -> LruCache:
+        return self._ruleCache
+
     def normalize(self, interval: Union[EventInterval, None]) -> str:
         if interval is None:
             return ""
@@ -39,4 +67,33 @@ class EventIntervalRruleNormalizer(EventIntervalNormalizer):
         if "" == interval:
             return None
 
-        return EventInterval(rrule.rrulestr(interval))
+        rule = self._cache.get(interval)
+
+        if rule is None:
+            rule = self.__parse(interval)
+            self._cache.set(interval, rule)
+
+        return EventInterval(rule)
+
+    def __parse(self, interval: str) -> rrule.rrule:
+        lines = interval.splitlines()
+
+        if 2 != len(lines) or not lines[0].startswith(self.DTSTART_PREFIX):
+            return rrule.rrulestr(interval)
+
+        try:
+            startDate = datetime.datetime.strptime(
+                lines[0][len(self.DTSTART_PREFIX) :], self.DTSTART_FORMAT
+            )
+        except ValueError:
+            return rrule.rrulestr(interval)
+
+        rule = self._ruleCache.get(lines[1])
+
+        if rule is None:
+            rule = rrule.rrulestr(lines[1], dtstart=startDate)
+            self._ruleCache.set(lines[1], rule)
+
+            return rule
+
+        return rule.replace(dtstart=startDate)
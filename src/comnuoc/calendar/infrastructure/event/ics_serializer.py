@@ -0,0 +1,433 @@
+import datetime
+import re
+import uuid
+from collections.abc import Iterable, Iterator
+from typing import Union
+
+from dateutil import tz
+
+from comnuoc.calendar.domain.event.event import (
+    Event,
+    EventDateTimeRange,
+    EventId,
+    EventTitle,
+)
+from comnuoc.calendar.domain.event.event_repository import EventIdGenerator
+
+from comnuoc.calendar.infrastructure.event.event_serializer import (
+    EventIntervalRruleNormalizer,
+)
+
+# (name, parameters, value)
+IcsProperty = tuple[str, dict[str, str], str]
+
+ICS_DATE_FORMAT = "%Y%m%d"
+ICS_DATE_TIME_FORMAT = "%Y%m%dT%H%M%S"
+
+
+class IcsEventReader(object):
+    """
+    Streaming reader of iCalendar (RFC 5545) VEVENTs.
+    Lines are unfolded and parsed one by one, only the properties of the current
+    VEVENT are kept in memory.
+    UID, SUMMARY, DTSTART, DTEND (or DURATION) and RRULE are mapped,
+    other properties (e.g. EXDATE), nested components (e.g. VALARM)
+    and overridden occurrences (RECURRENCE-ID) are skipped.
+    """
+
+    # namespace of the event IDs created from UIDs which are not UUIDs
+    UID_NAMESPACE = uuid.UUID("62c77eb6-e359-4f8a-afd8-1b469c58bb13")
+
+    DEFAULT_TITLE = "Untitled"
+
+    DURATION_PATTERN = re.compile(
+        r"^([-+])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$"
+    )
+    UNTIL_PATTERN = re.compile(r"UNTIL=([0-9TZ]+)", re.IGNORECASE)
+
+    def __init__(
+        self,
+        intervalNormalizer: EventIntervalRruleNormalizer,
+        idGenerator: EventIdGenerator,
+    ) -> None:
+        self._intervalNormalizer = intervalNormalizer
+        self._idGenerator = idGenerator
+
+    def read(
+        self, lines: Iterable[str], tzInfo: datetime.tzinfo = None
+    ) -> Iterator[Event]:
+        """
+        Floating dates (without time zone) are in tzInfo (UTC by default),
+        the time zone of the calendar which the events are read in.
+        """
+        if tzInfo is None:
+            tzInfo = datetime.timezone.utc
+
+        properties: Union[dict[str, IcsProperty], None] = None
+        # depth of the components nested in the VEVENT
+        depth = 0
+
+        for icsProperty in self.__readProperties(lines):
+            name, parameters, value = icsProperty
+
+            if "BEGIN" == name:
+                if properties is not None:
+                    depth += 1
+                elif "VEVENT" == value.upper():
+                    properties = {}
+            elif "END" == name:
+                if depth > 0:
+                    depth -= 1
+                elif properties is not None and "VEVENT" == value.upper():
+                    event = self.__createEvent(properties, tzInfo)
+                    properties = None
+
+                    if event is not None:
+                        yield event
+            elif properties is not None and 0 == depth:
+                properties.setdefault(name, icsProperty)
+
+    def __readProperties(self, lines: Iterable[str]) -> Iterator[IcsProperty]:
+        contentLine = None
+
+        for line in lines:
+            line = line.rstrip("\r\n")
+
+            if line.startswith((" ", "\t")):
+                # folded line
+                if contentLine is not None:
+                    contentLine += line[1:]
+
+                continue
+
+            if contentLine:
+                yield self.__parseProperty(contentLine)
+
+            contentLine = line
+
+        if contentLine:
+            yield self.__parseProperty(contentLine)
+
+    def __parseProperty(self, contentLine: str) -> IcsProperty:
+        isQuoted = False
+        separator = len(contentLine)
+
+        for i, char in enumerate(contentLine):
+            if '"' == char:
+                isQuoted = not isQuoted
+            elif ":" == char and not isQuoted:
+                separator = i
+
+                break
+
+        parts = contentLine[:separator].split(";")
+        parameters = {}
+
+        for part in parts[1:]:
+            key, sign, parameterValue = part.partition("=")
+            parameters[key.upper()] = parameterValue.strip('"')
+
+        return (parts[0].upper(), parameters, contentLine[separator + 1 :])
+
+    def __createEvent(
+        self, properties: dict[str, IcsProperty], tzInfo: datetime.tzinfo
+    ) -> Union[Event, None]:
+        if "RECURRENCE-ID" in properties or "DTSTART" not in properties:
+            return None
+
+        startDate, isDate = self.__parseDate(properties["DTSTART"], tzInfo)
+
+        if "DTEND" in properties:
+            endDate, isEndDate = self.__parseDate(properties["DTEND"], tzInfo)
+        elif "DURATION" in properties:
+            endDate = startDate + self.__parseDuration(properties["DURATION"][2])
+        elif isDate:
+            endDate = startDate + datetime.timedelta(days=1)
+        else:
+            endDate = startDate
+
+        title = ""
+
+        if "SUMMARY" in properties:
+            title = unescapeText(properties["SUMMARY"][2]).strip()
+
+        interval = None
+
+        if "RRULE" in properties:
+            rule = self.__convertUntil(properties["RRULE"][2], startDate.tzinfo, tzInfo)
+            interval = self._intervalNormalizer.denormalize(
+                f"{EventIntervalRruleNormalizer.DTSTART_PREFIX}"
+                f"{formatWallDateTime(startDate, tzInfo)}\nRRULE:{rule}"
+            )
+
+        # as stored events, events are in UTC
+        startDate = startDate.astimezone(datetime.timezone.utc)
+        endDate = endDate.astimezone(datetime.timezone.utc)
+
+        return Event(
+            id=self.__createId(properties.get("UID")),
+            title=EventTitle(title or self.DEFAULT_TITLE),
+            dateTimeRange=EventDateTimeRange(startDate, max(startDate, endDate)),
+            isRecurrent=interval is not None,
+            recurrenceInterval=interval,
+        )
+
+    def __createId(self, icsProperty: Union[IcsProperty, None]) -> EventId:
+        if icsProperty is None or "" == icsProperty[2].strip():
+            return self._idGenerator.generate()
+
+        uid = icsProperty[2].strip()
+
+        try:
+            return EventId(uuid.UUID(uid))
+        except ValueError:
+            return EventId(uuid.uuid5(self.UID_NAMESPACE, uid))
+
+    def __parseDate(
+        self, icsProperty: IcsProperty, tzInfo: datetime.tzinfo
+    ) -> tuple[datetime.datetime, bool]:
+        """
+        Return the date and whether it is a date without time.
+        """
+        name, parameters, value = icsProperty
+        value = value.strip()
+
+        if "DATE" == parameters.get("VALUE", "").upper() or 8 == len(value):
+            date = datetime.datetime.strptime(value[:8], ICS_DATE_FORMAT)
+
+            return date.replace(tzinfo=tzInfo), True
+
+        if value.upper().endswith("Z"):
+            date = datetime.datetime.strptime(value[:-1], ICS_DATE_TIME_FORMAT)
+
+            return date.replace(tzinfo=datetime.timezone.utc), False
+
+        if "TZID" in parameters:
+            tzInfo = tz.gettz(parameters["TZID"]) or tzInfo
+
+        date = datetime.datetime.strptime(value, ICS_DATE_TIME_FORMAT)
+
+        return date.replace(tzinfo=tzInfo), False
+
+    def __parseDuration(self, value: str) -> datetime.timedelta:
+        match = self.DURATION_PATTERN.match(value.strip().upper())
+
+        if match is None:
+            return datetime.timedelta()
+
+        sign, weeks, days, hours, minutes, seconds = match.groups()
+        duration = datetime.timedelta(
+            weeks=int(weeks or 0),
+            days=int(days or 0),
+            hours=int(hours or 0),
+            minutes=int(minutes or 0),
+            seconds=int(seconds or 0),
+        )
+
+        return -duration if "-" == sign else duration
+
+    def __convertUntil(
+        self, rule: str, startTzInfo: datetime.tzinfo, tzInfo: datetime.tzinfo
+    ) -> str:
+        """
+        Rules are stored with a naive DTSTART and UNTIL, which are read
+        in the time zone of the start date of the event as it is viewed
+        (the time zone of the calendar, tzInfo), so UNTIL is converted
+        to a naive wall time in tzInfo.
+        UNTIL without time zone is in the time zone of DTSTART (startTzInfo).
+        """
+
+        def convert(match: re.Match) -> str:
+            value = match.group(1).upper()
+            untilTzInfo = startTzInfo
+
+            if value.endswith("Z"):
+                value = value[:-1]
+                untilTzInfo = datetime.timezone.utc
+            elif 8 == len(value):
+                # until the end of the day
+                value += "T235959"
+
+            until = datetime.datetime.strptime(value, ICS_DATE_TIME_FORMAT)
+            until = until.replace(tzinfo=untilTzInfo)
+
+            return f"UNTIL={formatWallDateTime(until, tzInfo)}"
+
+        return self.UNTIL_PATTERN.sub(convert, rule)
+
+
+class IcsEventWriter(object):
+    """
+    Streaming writer of iCalendar (RFC 5545) VEVENTs.
+    Lines are yielded one by one (folded at 75 octets, with CRLF),
+    dates are written in UTC, except the dates of recurring events:
+    their rules are expanded in the wall time of the calendar, so they are
+    written as wall times with its TZID (without VTIMEZONE, consumers resolve
+    the IANA name), or floating if the calendar time zone has no name.
+    """
+
+    PRODUCT_ID = "-//comnuoc//Simple Calendar//EN"
+    MAX_LINE_LENGTH = 75
+
+    UNTIL_PATTERN = re.compile(r"UNTIL=([0-9TZ]+)", re.IGNORECASE)
+
+    def __init__(
+        self,
+        intervalNormalizer: EventIntervalRruleNormalizer,
+        stampDate: datetime.datetime = None,
+    ) -> None:
+        self._intervalNormalizer = intervalNormalizer
+        self._stampDate = stampDate
+
+    def write(
+        self,
+        events: Iterable[Event],
+        tzInfo: datetime.tzinfo = None,
+        timeZone: str = None,
+    ) -> Iterator[str]:
+        """
+        Naive UNTIL of the rules are in tzInfo (UTC by default),
+        the time zone of the calendar which the events are read in,
+        timeZone is its name (TZID).
+        """
+        if tzInfo is None:
+            tzInfo = datetime.timezone.utc
+
+        stampDate = self._stampDate
+
+        if stampDate is None:
+            stampDate = datetime.datetime.now(datetime.timezone.utc)
+
+        stamp = formatUtcDateTime(stampDate)
+
+        yield from self.__foldLines(
+            [
+                "BEGIN:VCALENDAR",
+                "VERSION:2.0",
+                f"PRODID:{self.PRODUCT_ID}",
+            ]
+        )
+
+        for event in events:
+            yield from self.__foldLines(
+                self.__createEventLines(event, stamp, tzInfo, timeZone)
+            )
+
+        yield from self.__foldLines(["END:VCALENDAR"])
+
+    def __createEventLines(
+        self,
+        event: Event,
+        stamp: str,
+        tzInfo: datetime.tzinfo,
+        timeZone: Union[str, None],
+    ) -> list[str]:
+        dateTimeRange = event.getDateTimeRange()
+        isRecurrent = event.isRecurrent() and event.getRecurrenceInterval() is not None
+        lines = ["BEGIN:VEVENT", f"UID:{event.getId()}", f"DTSTAMP:{stamp}"]
+
+        for name, date in [
+            ("DTSTART", dateTimeRange.getRealStartDate()),
+            ("DTEND", dateTimeRange.getRealEndDate()),
+        ]:
+            if not isRecurrent:
+                lines.append(f"{name}:{formatUtcDateTime(date)}")
+            elif timeZone is not None:
+                lines.append(
+                    f"{name};TZID={timeZone}:{formatWallDateTime(date, tzInfo)}"
+                )
+            elif datetime.timezone.utc == tzInfo:
+                lines.append(f"{name}:{formatUtcDateTime(date)}")
+            else:
+                lines.append(f"{name}:{formatWallDateTime(date, tzInfo)}")
+
+        lines.append(f"SUMMARY:{escapeText(str(event.getTitle()))}")
+
+        if isRecurrent:
+            isFloating = timeZone is None and datetime.timezone.utc != tzInfo
+            lines.append(f"RRULE:{self.__createRule(event, tzInfo, isFloating)}")
+
+        lines.append("END:VEVENT")
+
+        return lines
+
+    def __createRule(
+        self, event: Event, tzInfo: datetime.tzinfo, isFloating: bool
+    ) -> str:
+        """
+        UNTIL is in UTC, or floating as DTSTART.
+        """
+        rule = ""
+
+        for line in self._intervalNormalizer.normalize(
+            event.getRecurrenceInterval()
+        ).splitlines():
+            if line.startswith("RRULE:"):
+                rule = line[len("RRULE:") :]
+
+        def convert(match: re.Match) -> str:
+            value = match.group(1).upper()
+            untilTzInfo = tzInfo
+
+            # a naive UNTIL is in the time zone of the calendar
+            if value.endswith("Z"):
+                value = value[:-1]
+                untilTzInfo = datetime.timezone.utc
+
+            until = datetime.datetime.strptime(value, ICS_DATE_TIME_FORMAT)
+            until = until.replace(tzinfo=untilTzInfo)
+
+            if isFloating:
+                return f"UNTIL={formatWallDateTime(until, tzInfo)}"
+
+            return f"UNTIL={formatUtcDateTime(until)}"
+
+        return self.UNTIL_PATTERN.sub(convert, rule)
+
+    def __foldLines(self, lines: list[str]) -> Iterator[str]:
+        for line in lines:
+            chunk = ""
+            chunkLength = 0
+
+            for char in line:
+                charLength = len(char.encode("utf-8"))
+
+                if chunkLength + charLength > self.MAX_LINE_LENGTH:
+                    yield chunk + "\r\n"
+                    # continuation lines start with a space
+                    chunk = " "
+                    chunkLength = 1
+
+                chunk += char
+                chunkLength += charLength
+
+            yield chunk + "\r\n"
+
+
+def formatUtcDateTime(date: datetime.datetime) -> str:
+    return date.astimezone(datetime.timezone.utc).strftime(ICS_DATE_TIME_FORMAT) + "Z"
+
+
+def formatWallDateTime(date: datetime.datetime, tzInfo: datetime.tzinfo) -> str:
+    """
+    Format the date as a naive wall time in the time zone.
+    """
+    return date.astimezone(tzInfo).strftime(ICS_DATE_TIME_FORMAT)
+
+
+def escapeText(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def unescapeText(text: str) -> str:
+    return re.sub(
+        r"\\([\\;,nN])",
+        lambda match: "\n" if match.group(1) in "nN" else match.group(1),
+        text,
+    )
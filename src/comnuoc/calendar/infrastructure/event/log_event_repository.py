@@ -0,0 +1,375 @@
+import contextlib
+import csv
+import datetime
+import os
+import shutil
+import threading
+from collections.abc import Iterable, Iterator
+from tempfile import NamedTemporaryFile
+from typing import Union
+
+from comnuoc.calendar.domain.event.event import Event, EventId
+from comnuoc.calendar.domain.event.event_repository import (
+    EventIdGenerator,
+    EventIntervalIndex,
+    EventRecurrenceChecker,
+    EventRepository,
+)
+from comnuoc.calendar.domain.event.event_serializer import (
+    EventIdNormalizer,
+    EventNormalizer,
+)
+from comnuoc.calendar.domain.util.datetime_range import DateTimeRange
+
+from comnuoc.calendar.infrastructure.event.event_repository import CsvLineReader
+
+
+class LogEventRepository(EventRepository):
+    """
+    Append-only event log.
+    Each record is a CSV row starting with a version and an operation:
+    an upsert record holds the normalized event,
+    a delete record (tombstone) holds only the event ID.
+    Readers resolve the latest version per ID, the resolved state is kept
+    in memory and only the records appended since the last read are read.
+    The log is compacted (in a background thread by default) when the ratio of
+    dead records (overwritten records and tombstones) exceeds compactionRatio.
+    Records of a transaction are appended with one write when it exits.
+    """
+
+    OPERATION_UPSERT = "U"
+    OPERATION_DELETE = "D"
+
+    # normalized ID => (version, normalized event, start date of one-time event)
+    Record = tuple[int, list[str], Union[datetime.datetime, None]]
+
+    def __init__(
+        self,
+        idGenerator: EventIdGenerator,
+        idNormalizer: EventIdNormalizer,
+        normalizer: EventNormalizer,
+        recurrenceChecker: EventRecurrenceChecker,
+        filePath: str,
+        compactionRatio: float = 0.5,
+        compactionMinRecords: int = 100,
+        backgroundCompaction: bool = True,
+        dialectName: str = "excel",
+        encoding: str = "utf-8",
+    ) -> None:
+        self._idGenerator = idGenerator
+        self._idNormalizer = idNormalizer
+        self._normalizer = normalizer
+        self._recurrenceChecker = recurrenceChecker
+        self._filePath = filePath
+        self._compactionRatio = compactionRatio
+        self._compactionMinRecords = compactionMinRecords
+        self._backgroundCompaction = backgroundCompaction
+        self._dialectName = dialectName
+        self._encoding = encoding
+        self._lock = threading.RLock()
+        self._compactionThread: Union[threading.Thread, None] = None
+        self._pendingRecords: Union[list[list[str]], None] = None
+        # IDs by the dates occupied by the events, bound to the records
+        self._intervalIndex = EventIntervalIndex(recurrenceChecker)
+        self.__reset(None)
+
+    def find(self, id: EventId) -> Union[Event, None]:
+        record = self.__getRecords().get(self._idNormalizer.normalize(id))
+
+        if record is None:
+            return None
+
+        return self._normalizer.denormalize(record[1])
+
+    def findByStartDate(self, startDateRange: DateTimeRange) -> Iterable[Event]:
+        for version, row, startDate in list(self.__getRecords().values()):
+            if startDate is not None:
+                if startDateRange.includes(startDate):
+                    yield self._normalizer.denormalize(row)
+            else:
+                event = self._normalizer.denormalize(row)
+
+                if self._recurrenceChecker.isStartDateInRange(event, startDateRange):
+                    yield event
+
+    def findAll(self) -> Iterable[Event]:
+        for version, row, startDate in list(self.__getRecords().values()):
+            yield self._normalizer.denormalize(row)
+
+    def findOverlapping(self, dateTimeRange: DateTimeRange) -> Iterable[Event]:
+        with self._lock:
+            records = dict(self.__getRecords())
+
+            if not self._intervalIndex.isFresh(self._signature):
+                self._intervalIndex.build(
+                    self._signature,
+                    [
+                        (id, self._normalizer.denormalize(record[1]))
+                        for id, record in records.items()
+                    ],
+                )
+
+            ids = self._intervalIndex.findKeys(dateTimeRange)
+
+        for id in ids:
+            event = self._normalizer.denormalize(records[id][1])
+
+            if self._intervalIndex.overlaps(event, dateTimeRange):
+                yield event
+
+    def hasEventInRange(self, startDateRange: DateTimeRange) -> bool:
+        records = list(self.__getRecords().values())
+
+        for version, row, startDate in records:
+            if startDate is not None and startDateRange.includes(startDate):
+                return True
+
+        for version, row, startDate in records:
+            if startDate is None and self._recurrenceChecker.isStartDateInRange(
+                self._normalizer.denormalize(row), startDateRange
+            ):
+                return True
+
+        return False
+
+    def findOccupiedDates(self, startDateRange: DateTimeRange) -> set[datetime.date]:
+        tzInfo = startDateRange.getRealStartDate().tzinfo
+        dates = set()
+
+        for version, row, startDate in list(self.__getRecords().values()):
+            if startDate is not None:
+                if startDateRange.includes(startDate):
+                    dates.add(startDate.astimezone(tzInfo).date())
+            else:
+                for occurrenceDate in self._recurrenceChecker.findStartDatesInRange(
+                    self._normalizer.denormalize(row), startDateRange
+                ):
+                    dates.add(occurrenceDate.astimezone(tzInfo).date())
+
+        return dates
+
+    def insert(self, event: Event) -> None:
+        self.insertMany([event])
+
+    def insertMany(self, events: Iterable[Event]) -> None:
+        self.__append(
+            [
+                [self.OPERATION_UPSERT] + self._normalizer.normalize(event)
+                for event in events
+            ]
+        )
+
+    def update(self, event: Event) -> None:
+        self.insert(event)
+
+    def delete(self, event: Event) -> None:
+        self.__append(
+            [[self.OPERATION_DELETE, self._idNormalizer.normalize(event.getId())]]
+        )
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        if self._pendingRecords is not None:
+            # joins the outer transaction
+            yield
+
+            return
+
+        records = []
+        self._pendingRecords = records
+
+        try:
+            yield
+        finally:
+            self._pendingRecords = None
+
+        self.__append(records)
+
+    def generateId(self) -> EventId:
+        return self._idGenerator.generate()
+
+    def generateIds(self, count: int) -> list[EventId]:
+        return self._idGenerator.generateMany(count)
+
+    def getCompactionRatio(self) -> float:
+        return self._compactionRatio
+
+    def getDeadRecordsRatio(self) -> float:
+        with self._lock:
+            self.__refresh()
+
+            if 0 == self._recordsCount:
+                return 0.0
+
+            return 1 - len(self._records) / self._recordsCount
+
+    def compact(self) -> None:
+        with self._lock:
+            self.__refresh()
+            tempFile = NamedTemporaryFile(
+                mode="w",
+                newline="",
+                delete=False,
+                encoding=self._encoding,
+                dir=os.path.dirname(os.path.abspath(self._filePath)),
+            )
+
+            with tempFile:
+                writer = csv.writer(tempFile, dialect=self._dialectName)
+
+                for version, row, startDate in self._records.values():
+                    writer.writerow([str(version), self.OPERATION_UPSERT] + row)
+
+            shutil.move(tempFile.name, self._filePath)
+
+            isIntervalIndexFresh = self._intervalIndex.isFresh(self._signature)
+            self._recordsCount = len(self._records)
+            self._signature = self.__getFileSignature()
+
+            # the events are the same
+            if isIntervalIndexFresh:
+                self._intervalIndex.setSignature(self._signature)
+
+    def waitForCompaction(self) -> None:
+        thread = self._compactionThread
+
+        if thread is not None:
+            thread.join()
+
+    def __getRecords(self) -> dict[str, Record]:
+        with self._lock:
+            self.__refresh()
+
+            return self._records
+
+    def __append(self, records: list[list[str]]) -> None:
+        """
+        Append the records (operation and data) with consecutive versions.
+        """
+        if self._pendingRecords is not None:
+            self._pendingRecords.extend(records)
+
+            return
+
+        if 0 == len(records):
+            return
+
+        with self._lock:
+            self.__refresh()
+            version = self._version
+            isIntervalIndexFresh = self._intervalIndex.isFresh(self._signature)
+
+            with open(
+                self._filePath, "a", newline="", encoding=self._encoding
+            ) as csvFile:
+                writer = csv.writer(csvFile, dialect=self._dialectName)
+                writer.writerows(
+                    [str(version + i + 1)] + data for i, data in enumerate(records)
+                )
+
+            for i, data in enumerate(records):
+                self.__apply(version + i + 1, data)
+
+            self._signature = self.__getFileSignature()
+
+            if isIntervalIndexFresh:
+                for data in records:
+                    if self.OPERATION_DELETE == data[0]:
+                        self._intervalIndex.remove(data[1])
+                    else:
+                        self._intervalIndex.add(
+                            data[1], self._normalizer.denormalize(data[1:])
+                        )
+
+                self._intervalIndex.setSignature(self._signature)
+
+        self.__compactIfNeeded()
+
+    def __compactIfNeeded(self) -> None:
+        if (
+            self._recordsCount < self._compactionMinRecords
+            or self.getDeadRecordsRatio() <= self._compactionRatio
+        ):
+            return
+
+        if not self._backgroundCompaction:
+            self.compact()
+
+            return
+
+        if self._compactionThread is not None and self._compactionThread.is_alive():
+            return
+
+        self._compactionThread = threading.Thread(target=self.compact, daemon=True)
+        self._compactionThread.start()
+
+    def __refresh(self) -> None:
+        """
+        Read the records appended since the last read,
+        or all records if the log has been rewritten (e.g. compacted by another process).
+        """
+        if not os.path.isfile(self._filePath):
+            self.__reset(None)
+
+            return
+
+        signature = self.__getFileSignature()
+
+        if signature == self._signature:
+            return
+
+        inode, size, mtime = signature
+
+        if (
+            self._signature is None
+            or inode != self._signature[0]
+            or size <= self._signature[1]
+        ):
+            self.__reset(None)
+            offset = 0
+        else:
+            offset = self._signature[1]
+
+        with open(self._filePath, "rb") as csvFile:
+            csvFile.seek(offset)
+            reader = csv.reader(
+                CsvLineReader(csvFile, self._encoding), dialect=self._dialectName
+            )
+
+            for row in reader:
+                if len(row) > 2:
+                    self.__apply(int(row[0]), row[1:])
+
+        self._signature = signature
+
+    def __apply(self, version: int, data: list[str]) -> None:
+        operation = data[0]
+        row = data[1:]
+        id = row[0]
+        self._version = max(self._version, version)
+        self._recordsCount += 1
+
+        if id in self._records and self._records[id][0] > version:
+            return
+
+        if self.OPERATION_DELETE == operation:
+            self._records.pop(id, None)
+        elif self._normalizer.denormalizeBoolean(row[4]):
+            self._records[id] = (version, row, None)
+        else:
+            self._records[id] = (
+                version,
+                row,
+                self._normalizer.denormalizeDateTime(row[2]),
+            )
+
+    def __reset(self, signature: Union[tuple[int, int, int], None]) -> None:
+        self._signature = signature
+        self._records: dict[str, LogEventRepository.Record] = {}
+        self._recordsCount = 0
+        self._version = 0
+
+    def __getFileSignature(self) -> tuple[int, int, int]:
+        stat = os.stat(self._filePath)
+
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
@@ -0,0 +1,348 @@
+import contextlib
+import datetime
+import sqlite3
+from collections.abc import Iterable, Iterator
+from typing import Union
+
+from comnuoc.calendar.domain.event.event import Event, EventId
+from comnuoc.calendar.domain.event.event_repository import (
+    EventIdGenerator,
+    EventIntervalIndex,
+    EventRecurrenceChecker,
+    EventRepository,
+)
+from comnuoc.calendar.domain.event.event_serializer import (
+    EventIdNormalizer,
+    EventNormalizer,
+)
+from comnuoc.calendar.domain.util.datetime_range import DateTimeRange
+
+from comnuoc.calendar.infrastructure.event.event_index import (
+    fromEpochMicroseconds,
+    toEpochMicroseconds,
+)
+
+
+class SqliteEventRepository(EventRepository):
+    """
+    One-time events are stored in the "events" table and recurring events
+    in the "recurring_events" table. Both are keyed by the normalized event ID
+    and have an indexed UTC start column (epoch microseconds).
+    Overlap queries go through an in-memory interval index of the event IDs,
+    which is rebuilt after changes of the connection or of other connections
+    (detected by the data version of the database).
+    """
+
+    ONE_TIME_TABLE = "events"
+    RECURRING_TABLE = "recurring_events"
+    COLUMNS = "id, title, start_date, end_date, recurrence_interval"
+
+    def __init__(
+        self,
+        idGenerator: EventIdGenerator,
+        idNormalizer: EventIdNormalizer,
+        normalizer: EventNormalizer,
+        recurrenceChecker: EventRecurrenceChecker,
+        filePath: str,
+    ) -> None:
+        self._idGenerator = idGenerator
+        self._idNormalizer = idNormalizer
+        self._normalizer = normalizer
+        self._recurrenceChecker = recurrenceChecker
+        self._filePath = filePath
+        self._connection: Union[sqlite3.Connection, None] = None
+        self._isInTransaction = False
+        self._intervalIndex = EventIntervalIndex(recurrenceChecker)
+        # incremented by each change of the connection
+        self._version = 0
+
+    def find(self, id: EventId) -> Union[Event, None]:
+        normalizedId = self._idNormalizer.normalize(id)
+
+        for table in [self.ONE_TIME_TABLE, self.RECURRING_TABLE]:
+            row = (
+                self.__getConnection()
+                .execute(
+                    f"SELECT {self.COLUMNS} FROM {table} WHERE id = ?", (normalizedId,)
+                )
+                .fetchone()
+            )
+
+            if row is not None:
+                return self.__denormalize(row)
+
+        return None
+
+    def findByStartDate(self, startDateRange: DateTimeRange) -> Iterable[Event]:
+        rows = self.__getConnection().execute(
+            f"SELECT {self.COLUMNS} FROM {self.ONE_TIME_TABLE}"
+            " WHERE start_epoch BETWEEN ? AND ? ORDER BY start_epoch",
+            self.__createEpochRange(startDateRange),
+        )
+
+        for row in rows:
+            yield self.__denormalize(row)
+
+        for event in self.__findRecurringEvents():
+            if self._recurrenceChecker.isStartDateInRange(event, startDateRange):
+                yield event
+
+    def findAll(self) -> Iterable[Event]:
+        for table in [self.ONE_TIME_TABLE, self.RECURRING_TABLE]:
+            rows = self.__getConnection().execute(
+                f"SELECT {self.COLUMNS} FROM {table} ORDER BY start_epoch"
+            )
+
+            for row in rows:
+                yield self.__denormalize(row)
+
+    def findOverlapping(self, dateTimeRange: DateTimeRange) -> Iterable[Event]:
+        signature = self.__getIntervalIndexSignature(self.__getConnection())
+
+        if not self._intervalIndex.isFresh(signature):
+            self._intervalIndex.build(
+                signature,
+                [
+                    (self._idNormalizer.normalize(event.getId()), event)
+                    for event in self.findAll()
+                ],
+            )
+
+        for id in self._intervalIndex.findKeys(dateTimeRange):
+            event = self.find(self._idNormalizer.denormalize(id))
+
+            if event is not None and self._intervalIndex.overlaps(event, dateTimeRange):
+                yield event
+
+    def hasEventInRange(self, startDateRange: DateTimeRange) -> bool:
+        row = (
+            self.__getConnection()
+            .execute(
+                f"SELECT 1 FROM {self.ONE_TIME_TABLE}"
+                " WHERE start_epoch BETWEEN ? AND ? LIMIT 1",
+                self.__createEpochRange(startDateRange),
+            )
+            .fetchone()
+        )
+
+        if row is not None:
+            return True
+
+        for event in self.__findRecurringEvents():
+            if self._recurrenceChecker.isStartDateInRange(event, startDateRange):
+                return True
+
+        return False
+
+    def findOccupiedDates(self, startDateRange: DateTimeRange) -> set[datetime.date]:
+        tzInfo = startDateRange.getRealStartDate().tzinfo
+        rows = self.__getConnection().execute(
+            f"SELECT DISTINCT start_epoch FROM {self.ONE_TIME_TABLE}"
+            " WHERE start_epoch BETWEEN ? AND ?",
+            self.__createEpochRange(startDateRange),
+        )
+        dates = set(
+            fromEpochMicroseconds(row[0]).astimezone(tzInfo).date() for row in rows
+        )
+
+        for event in self.__findRecurringEvents():
+            for startDate in self._recurrenceChecker.findStartDatesInRange(
+                event, startDateRange
+            ):
+                dates.add(startDate.astimezone(tzInfo).date())
+
+        return dates
+
+    def insert(self, event: Event) -> None:
+        with self.__begin() as connection:
+            self.__insert(connection, event)
+
+    def insertMany(self, events: Iterable[Event]) -> None:
+        """
+        Insert the events in one transaction.
+        """
+        with self.__begin() as connection:
+            for event in events:
+                self.__insert(connection, event)
+
+    def update(self, event: Event) -> None:
+        with self.__begin() as connection:
+            self.__delete(connection, event)
+            self.__insert(connection, event)
+
+    def delete(self, event: Event) -> None:
+        with self.__begin() as connection:
+            self.__delete(connection, event)
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self.__begin():
+            yield
+
+    def generateId(self) -> EventId:
+        return self._idGenerator.generate()
+
+    def generateIds(self, count: int) -> list[EventId]:
+        return self._idGenerator.generateMany(count)
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    @contextlib.contextmanager
+    def __begin(self) -> Iterator[sqlite3.Connection]:
+        """
+        Changes are committed (or rolled back) at the exit of the outermost context.
+        """
+        connection = self.__getConnection()
+
+        if self._isInTransaction:
+            yield connection
+
+            return
+
+        self._isInTransaction = True
+
+        try:
+            with connection:
+                yield connection
+        except BaseException:
+            # changes are rolled back
+            self._version += 1
+
+            raise
+        finally:
+            self._isInTransaction = False
+
+    def __getConnection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self._filePath)
+            self.__createSchema(self._connection)
+
+        return self._connection
+
+    def __createSchema(self, connection: sqlite3.Connection) -> None:
+        with connection:
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.ONE_TIME_TABLE} ("
+                " id TEXT PRIMARY KEY,"
+                " title TEXT NOT NULL,"
+                " start_date TEXT NOT NULL,"
+                " end_date TEXT NOT NULL,"
+                " recurrence_interval TEXT NOT NULL DEFAULT '',"
+                " start_epoch INTEGER NOT NULL"
+                ")"
+            )
+            connection.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.ONE_TIME_TABLE}_start_epoch"
+                f" ON {self.ONE_TIME_TABLE} (start_epoch)"
+            )
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.RECURRING_TABLE} ("
+                " id TEXT PRIMARY KEY,"
+                " title TEXT NOT NULL,"
+                " start_date TEXT NOT NULL,"
+                " end_date TEXT NOT NULL,"
+                " recurrence_interval TEXT NOT NULL,"
+                " start_epoch INTEGER NOT NULL"
+                ")"
+            )
+
+    def __findRecurringEvents(self) -> Iterable[Event]:
+        rows = self.__getConnection().execute(
+            f"SELECT {self.COLUMNS} FROM {self.RECURRING_TABLE} ORDER BY start_epoch"
+        )
+
+        for row in rows:
+            yield self.__denormalize(row)
+
+    def __getIntervalIndexSignature(
+        self, connection: sqlite3.Connection
+    ) -> tuple[int, int]:
+        """
+        The data version changes when another connection commits.
+        """
+        return (connection.execute("PRAGMA data_version").fetchone()[0], self._version)
+
+    def __changeIntervalIndex(
+        self, connection: sqlite3.Connection, id: str, event: Union[Event, None]
+    ) -> None:
+        """
+        Bump the version, the interval index is updated in place if it is fresh.
+        """
+        isIndexFresh = self._intervalIndex.isFresh(
+            self.__getIntervalIndexSignature(connection)
+        )
+        self._version += 1
+
+        if not isIndexFresh:
+            return
+
+        if event is None:
+            self._intervalIndex.remove(id)
+        else:
+            self._intervalIndex.add(id, event)
+
+        self._intervalIndex.setSignature(self.__getIntervalIndexSignature(connection))
+
+    def __insert(self, connection: sqlite3.Connection, event: Event) -> None:
+        id, title, startDate, endDate, isRecurrent, interval = (
+            self._normalizer.normalize(event)
+        )
+        self.__changeIntervalIndex(connection, id, event)
+
+        if event.isRecurrent():
+            table = self.RECURRING_TABLE
+        else:
+            table = self.ONE_TIME_TABLE
+
+        connection.execute(
+            f"INSERT INTO {table} ({self.COLUMNS}, start_epoch)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                id,
+                title,
+                startDate,
+                endDate,
+                interval,
+                toEpochMicroseconds(event.getDateTimeRange().getRealStartDate()),
+            ),
+        )
+
+    def __delete(self, connection: sqlite3.Connection, event: Event) -> None:
+        normalizedId = self._idNormalizer.normalize(event.getId())
+        self.__changeIntervalIndex(connection, normalizedId, None)
+
+        for table in [self.ONE_TIME_TABLE, self.RECURRING_TABLE]:
+            connection.execute(f"DELETE FROM {table} WHERE id = ?", (normalizedId,))
+
+    def __denormalize(self, row: tuple) -> Event:
+        id, title, startDate, endDate, interval = row
+
+        return self._normalizer.denormalize(
+            [
+                id,
+                title,
+                startDate,
+                endDate,
+                self._normalizer.normalizeBoolean("" != interval),
+                interval,
+            ]
+        )
+
+    def __createEpochRange(self, startDateRange: DateTimeRange) -> tuple[int, int]:
+        startDate = startDateRange.getRealStartDate()
+        endDate = startDateRange.getRealEndDate()
+
+        if startDate is None:
+            start = -(2**63)
+        else:
+            start = toEpochMicroseconds(startDate)
+
+        if endDate is None:
+            end = 2**63 - 1
+        else:
+            end = toEpochMicroseconds(endDate)
+
+        return (start, end)
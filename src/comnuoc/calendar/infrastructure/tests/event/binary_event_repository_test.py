@@ -0,0 +1,140 @@
+import datetime
+import os
+import unittest
+
+from comnuoc.calendar.domain.event.event import EventTitle
+
+from comnuoc.calendar.infrastructure.event.binary_event_repository import (
+    BinaryEventRepository,
+)
+from comnuoc.calendar.infrastructure.event.event_repository import (
+    EventIdUuidGenerator,
+    EventRecurrenceRruleChecker,
+)
+from comnuoc.calendar.infrastructure.event.event_serializer import (
+    EventIdUuidNormalizer,
+)
+from comnuoc.calendar.infrastructure.tests.event.event_repository_test import (
+    EventRepositoryTestMixin,
+)
+
+
+class BinaryEventRepositoryTest(EventRepositoryTestMixin, unittest.TestCase):
+    def tearDown(self) -> None:
+        self._repository.close()
+        super().tearDown()
+
+    def _createRepository(self) -> BinaryEventRepository:
+        return BinaryEventRepository(
+            idGenerator=EventIdUuidGenerator(),
+            idNormalizer=EventIdUuidNormalizer(),
+            normalizer=self._createNormalizer(),
+            recurrenceChecker=EventRecurrenceRruleChecker(),
+            filePath=os.path.join(self._dir.name, "events.bin"),
+        )
+
+    def testUpdateInPlace(self) -> None:
+        event = self._createEvent("Event", datetime.datetime(2024, 3, 5, 10))
+        self._repository.insert(event)
+        recordsSize = os.path.getsize(os.path.join(self._dir.name, "events.bin"))
+        heapSize = os.path.getsize(os.path.join(self._dir.name, "events.bin.heap"))
+
+        event.setDateTimeRange(
+            self._createEvent(
+                "Moved", datetime.datetime(2024, 3, 6, 10)
+            ).getDateTimeRange()
+        )
+        self._repository.update(event)
+
+        self.assertEqual(
+            os.path.getsize(os.path.join(self._dir.name, "events.bin")), recordsSize
+        )
+        self.assertEqual(
+            os.path.getsize(os.path.join(self._dir.name, "events.bin.heap")), heapSize
+        )
+        self.assertEqual(self._findTitles(2024, 3, 6), ["Event"])
+
+        event.setTitle(EventTitle("Renamed"))
+        self._repository.update(event)
+        self._repository.close()
+
+        self._repository = self._createRepository()
+        self.assertEqual(self._findTitles(2024, 3, 6), ["Renamed"])
+
+    def testWriteDuringIteration(self) -> None:
+        for title in ["First", "Second"]:
+            self._repository.insert(
+                self._createEvent(title, datetime.datetime(2024, 3, 5, 10))
+            )
+
+        events = self._repository.findAll()
+        titles = [str(next(events).getTitle())]
+
+        # the records file grows and is mapped again
+        added = self._createEvent("Added", datetime.datetime(2024, 3, 5, 12))
+        self._repository.insert(added)
+        self.assertIsNotNone(self._repository.find(added.getId()))
+
+        titles.extend(str(event.getTitle()) for event in events)
+
+        self.assertEqual(titles, ["First", "Second"])
+
+    def testCompaction(self) -> None:
+        recordsPath = os.path.join(self._dir.name, "events.bin")
+        heapPath = os.path.join(self._dir.name, "events.bin.heap")
+        events = [
+            self._createEvent(title, datetime.datetime(2024, 3, 5, 10))
+            for title in ["First", "Second", "Third"]
+        ]
+        self._repository.insertMany(events)
+        recordsSize = os.path.getsize(recordsPath)
+        heapSize = os.path.getsize(heapPath)
+
+        events[0].setTitle(EventTitle("Renamed"))
+        self._repository.update(events[0])
+        self._repository.delete(events[1])
+        iteration = self._repository.findAll()
+        next(iteration)
+
+        self._repository.compact()
+
+        self.assertLess(os.path.getsize(recordsPath), recordsSize)
+        self.assertLess(os.path.getsize(heapPath), heapSize)
+        self.assertEqual(self._findTitles(2024, 3, 5), ["Renamed", "Third"])
+
+        with self.assertRaises(RuntimeError):
+            next(iteration)
+
+        self._repository.close()
+        self._repository = self._createRepository()
+
+        self.assertEqual(self._findTitles(2024, 3, 5), ["Renamed", "Third"])
+        self.assertIsNone(self._repository.find(events[1].getId()))
+
+    def testFindByPosition(self) -> None:
+        events = [
+            self._createEvent(title, datetime.datetime(2024, 3, 5, 10))
+            for title in ["First", "Second", "Third"]
+        ]
+        self._repository.insertMany(events[:2])
+        other = self._createRepository()
+
+        try:
+            self.assertIsNotNone(other.find(events[0].getId()))
+
+            # appended and deleted by the other repository
+            self._repository.insert(events[2])
+            self._repository.delete(events[0])
+
+            self.assertIsNone(other.find(events[0].getId()))
+            self.assertEqual(str(other.find(events[2].getId()).getTitle()), "Third")
+
+            self._repository.compact()
+            self._repository.delete(events[2])
+            self.assertIsNone(self._repository.find(events[2].getId()))
+
+            events[1].setTitle(EventTitle("Renamed"))
+            self._repository.update(events[1])
+            self.assertEqual(self._findTitles(2024, 3, 5), ["Renamed"])
+        finally:
+            other.close()
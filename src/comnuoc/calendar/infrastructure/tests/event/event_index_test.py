@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+
+from comnuoc.calendar.infrastructure.event.event_index import EventTitleTrigramIndex
+
+
+class EventTitleTrigramIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self._storePath = os.path.join(self._dir.name, "events.csv")
+
+        with open(self._storePath, "w") as file:
+            file.write("events\n")
+
+        self._index = EventTitleTrigramIndex(
+            self._storePath + ".titles", self._storePath
+        )
+        self._index.build(
+            self._index.getStoreSignature(),
+            [
+                ("1", "Team meeting"),
+                ("2", "Meetup with Anna"),
+                ("3", "Dentist"),
+                ("4", "Weekly team sync"),
+                ("5", "Project kick-off meeting"),
+            ],
+        )
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def _search(self, query: str) -> list[str]:
+        return [id for id, score in self._index.search(query)]
+
+    def testSearch(self) -> None:
+        self.assertEqual(self._search("MEETING"), ["1", "5"])
+        # prefixes, in the order of the tokens
+        self.assertEqual(self._search("meet"), ["1", "5", "2"])
+        self.assertEqual(self._search("dent"), ["3"])
+        # substring and typo
+        self.assertEqual(self._search("tist"), ["3"])
+        self.assertEqual(self._search("dentsit"), [])
+        self.assertEqual(self._search("meting"), ["1", "5"])
+        # more matching tokens rank higher
+        self.assertEqual(self._search("team meeting")[0], "1")
+        self.assertEqual(sorted(self._search("team meeting")[1:]), ["4", "5"])
+        self.assertEqual(self._search("holiday"), [])
+        self.assertEqual(self._search(" - "), [])
+
+    def testAddAndRemove(self) -> None:
+        self._index.add("3", "Dentist appointment")
+        self._index.add("6", "Appointment")
+        self._index.remove("1")
+        self._index.remove("unknown")
+
+        self.assertEqual(self._search("appointment"), ["3", "6"])
+        self.assertEqual(self._search("team"), ["4"])
+
+        self._index.remove("3")
+        self._index.remove("6")
+
+        self.assertEqual(self._search("appoint"), [])
+
+    def testSaveAndLoad(self) -> None:
+        signature = self._index.getStoreSignature()
+        self._index.save()
+        index = EventTitleTrigramIndex(self._storePath + ".titles", self._storePath)
+
+        self.assertTrue(index.load(signature))
+        self.assertTrue(index.isFresh(signature))
+        self.assertEqual(
+            [id for id, score in index.search("meeting")], self._search("meeting")
+        )
+
+        # changes are appended to the sidecar file
+        self._index.add("6", "Dentist appointment")
+        self._index.remove("3")
+        self._index.save()
+
+        with open(self._storePath + ".titles") as file:
+            self.assertEqual(len(file.readlines()), 2)
+
+        self.assertTrue(index.load(signature))
+        self.assertEqual([id for id, score in index.search("dentist")], ["6"])
+
+        # the store is changed
+        with open(self._storePath, "a") as file:
+            file.write("changed\n")
+
+        self.assertFalse(index.load(index.getStoreSignature()))
+        self.assertFalse(self._index.isFresh(self._index.getStoreSignature()))
+
+    def testStoreWithoutFile(self) -> None:
+        index = EventTitleTrigramIndex(
+            os.path.join(self._dir.name, "memory.titles"),
+            os.path.join(self._dir.name, "memory"),
+        )
+
+        self.assertIsNone(index.getStoreSignature())
+        self.assertFalse(index.isFresh(None))
+        self.assertFalse(index.load(None))
+
+        index.build(None, [("1", "Team meeting")])
+        index.add("2", "Dentist")
+        index.save()
+
+        # kept in memory only
+        self.assertTrue(index.isFresh(None))
+        self.assertFalse(os.path.exists(os.path.join(self._dir.name, "memory.titles")))
+        self.assertEqual([id for id, score in index.search("dentist")], ["2"])
@@ -0,0 +1,108 @@
+import datetime
+import random
+import unittest
+
+from dateutil import rrule, tz
+
+from comnuoc.calendar.infrastructure.event.event_occurrence import (
+    RruleComponents,
+    RruleOccurrenceEngine,
+)
+
+
+class RruleOccurrenceEngineTest(unittest.TestCase):
+    RULES = [
+        "FREQ=DAILY",
+        "FREQ=DAILY;INTERVAL=3;BYMONTH=2,3",
+        "FREQ=WEEKLY",
+        "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE,SU",
+        "FREQ=MONTHLY",
+        "FREQ=MONTHLY;INTERVAL=5",
+        "FREQ=MONTHLY;BYDAY=+1MO,-1FR",
+        "FREQ=MONTHLY;BYMONTHDAY=31,-2",
+        "FREQ=MONTHLY;INTERVAL=2;BYHOUR=1,22",
+        "FREQ=DAILY;UNTIL=20230101T000000Z",
+        "FREQ=DAILY;COUNT=100",
+        "FREQ=YEARLY",
+    ]
+
+    def testBetweenIsSameAsRrule(self) -> None:
+        engine = RruleOccurrenceEngine()
+        randomizer = random.Random(2024)
+        timeZones = [
+            tz.gettz("Europe/Paris"),
+            tz.gettz("America/New_York"),
+            datetime.timezone.utc,
+        ]
+
+        for i in range(500):
+            startDate = datetime.datetime(
+                randomizer.randint(2010, 2020),
+                randomizer.randint(1, 12),
+                randomizer.randint(1, 28),
+                randomizer.randint(0, 23),
+                randomizer.choice([0, 30]),
+                tzinfo=randomizer.choice(timeZones),
+            )
+            rule = rrule.rrulestr(
+                randomizer.choice(self.RULES), dtstart=startDate
+            ).replace(wkst=randomizer.choice([0, 6]))
+            after = startDate + datetime.timedelta(
+                days=randomizer.randint(-100, 4000), hours=randomizer.randint(0, 23)
+            )
+            before = after + datetime.timedelta(days=randomizer.randint(0, 60))
+
+            self.assertEqual(
+                engine.between(rule, startDate, after, before, True),
+                rule.between(after, before, True),
+                f"{rule} between {after} and {before}",
+            )
+
+    def testStartDateIsMovedCloseToDate(self) -> None:
+        engine = RruleOccurrenceEngine()
+        startDate = datetime.datetime(2019, 1, 31, 10, tzinfo=datetime.timezone.utc)
+        date = datetime.datetime(2024, 3, 15, tzinfo=datetime.timezone.utc)
+
+        for rule, expectedStartDate in [
+            ("FREQ=DAILY;INTERVAL=2", datetime.datetime(2024, 3, 13, 10)),
+            ("FREQ=WEEKLY", datetime.datetime(2024, 3, 7, 10)),
+            ("FREQ=MONTHLY", datetime.datetime(2024, 2, 1, 10)),
+            ("FREQ=DAILY;COUNT=3", datetime.datetime(2019, 1, 31, 10)),
+        ]:
+            movedRule = engine.moveStartDate(
+                rrule.rrulestr(rule, dtstart=startDate), startDate, date
+            )
+
+            self.assertEqual(
+                str(movedRule).splitlines()[0],
+                expectedStartDate.strftime("DTSTART:%Y%m%dT%H%M%S"),
+            )
+
+    def testComponents(self) -> None:
+        startDate = datetime.datetime(2024, 3, 1, 9, tzinfo=tz.gettz("Europe/Paris"))
+        components = RruleComponents(
+            rrule.rrulestr(
+                "FREQ=MONTHLY;INTERVAL=2;BYDAY=+1MO;UNTIL=20240901T090000",
+                dtstart=startDate.replace(tzinfo=None),
+            )
+        )
+
+        self.assertEqual(components.getFreq(), rrule.MONTHLY)
+        self.assertEqual(components.getInterval(), 2)
+        self.assertIsNone(components.getCount())
+        self.assertTrue(components.has("BYDAY"))
+        self.assertFalse(components.has("BYMONTHDAY"))
+        self.assertEqual(
+            components.getUntil(startDate.tzinfo),
+            datetime.datetime(2024, 9, 1, 9, tzinfo=startDate.tzinfo),
+        )
+
+        components = RruleComponents(
+            rrule.rrulestr("FREQ=WEEKLY;COUNT=6", dtstart=startDate)
+        )
+
+        self.assertEqual(components.getFreq(), rrule.WEEKLY)
+        self.assertEqual(components.getInterval(), 1)
+        self.assertEqual(components.getCount(), 6)
+        self.assertFalse(components.has("BYDAY"))
+        self.assertIsNone(components.getUntil(startDate.tzinfo))
@@ -0,0 +1,693 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+from dateutil import rrule
+
+from comnuoc.calendar.domain.event.event import *
+from comnuoc.calendar.domain.event.event_repository import EventRepository
+from comnuoc.calendar.domain.event.event_serializer import EventNormalizer
+from comnuoc.calendar.domain.util.datetime_range import DateTimeRange
+from comnuoc.calendar.domain.util.profiler import Profiler
+
+from comnuoc.calendar.infrastructure.event.event_repository import (
+    CsvEventRepository,
+    EventIdUuidGenerator,
+    EventRecurrenceRruleChecker,
+)
+from comnuoc.calendar.infrastructure.event.event_serializer import (
+    EventIdUuidNormalizer,
+    EventIntervalRruleNormalizer,
+)
+
+
+class EventRepositoryTestMixin(object):
+    """
+    Tests which every EventRepository implementation should pass.
+    """
+
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self._repository = self._createRepository()
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def _createRepository(self) -> EventRepository:
+        raise NotImplementedError
+
+    def _createEvent(
+        self,
+        title: str,
+        startDate: datetime.datetime,
+        rule: str = None,
+        duration: datetime.timedelta = datetime.timedelta(hours=1),
+    ) -> Event:
+        startDate = startDate.replace(tzinfo=datetime.timezone.utc)
+        interval = None
+
+        if rule is not None:
+            interval = EventInterval(rrule.rrulestr(rule, dtstart=startDate))
+
+        return Event(
+            id=EventIdUuidGenerator().generate(),
+            title=EventTitle(title),
+            dateTimeRange=EventDateTimeRange(startDate, startDate + duration),
+            isRecurrent=interval is not None,
+            recurrenceInterval=interval,
+        )
+
+    def _createNormalizer(self) -> EventNormalizer:
+        return EventNormalizer(
+            idNormalizer=EventIdUuidNormalizer(),
+            intervalNormalizer=EventIntervalRruleNormalizer(),
+        )
+
+    def _findTitles(self, year: int, month: int, day: int) -> list[str]:
+        events = self._repository.findByStartDate(
+            self._createDayRange(year, month, day)
+        )
+
+        return sorted(str(event.getTitle()) for event in events)
+
+    def _createDayRange(self, year: int, month: int, day: int) -> DateTimeRange:
+        startDate = datetime.datetime(year, month, day, tzinfo=datetime.timezone.utc)
+
+        return DateTimeRange(
+            startDate, startDate + datetime.timedelta(days=1), True, False
+        )
+
+    def testFindByStartDate(self) -> None:
+        oneTime = self._createEvent("One time", datetime.datetime(2024, 3, 5, 10))
+        other = self._createEvent("Other", datetime.datetime(2024, 3, 6, 10))
+        weekly = self._createEvent(
+            "Weekly\nmulti-line", datetime.datetime(2024, 1, 2, 9), "FREQ=WEEKLY"
+        )
+
+        for event in [oneTime, other, weekly]:
+            self._repository.insert(event)
+
+        self.assertEqual(
+            self._findTitles(2024, 3, 5), ["One time", "Weekly\nmulti-line"]
+        )
+        self.assertEqual(self._findTitles(2024, 3, 6), ["Other"])
+        self.assertEqual(self._findTitles(2023, 3, 5), [])
+        self.assertTrue(
+            self._repository.hasEventInRange(self._createDayRange(2024, 3, 12))
+        )
+        self.assertFalse(
+            self._repository.hasEventInRange(self._createDayRange(2024, 3, 13))
+        )
+
+    def testFindUpdateDelete(self) -> None:
+        event = self._createEvent("Event", datetime.datetime(2024, 3, 5, 10))
+        other = self._createEvent("Other", datetime.datetime(2024, 3, 5, 12))
+        self._repository.insert(event)
+        self._repository.insert(other)
+
+        self.assertEqual(str(self._repository.find(event.getId()).getTitle()), "Event")
+        self.assertIsNone(self._repository.find(EventIdUuidGenerator().generate()))
+
+        updatedEvent = self._createEvent(
+            "Updated", datetime.datetime(2024, 3, 4, 10), "FREQ=DAILY;COUNT=2"
+        )
+        updatedEvent = Event(
+            id=event.getId(),
+            title=updatedEvent.getTitle(),
+            dateTimeRange=updatedEvent.getDateTimeRange(),
+            isRecurrent=True,
+            recurrenceInterval=updatedEvent.getRecurrenceInterval(),
+        )
+        self._repository.update(updatedEvent)
+
+        self.assertTrue(self._repository.find(event.getId()).isRecurrent())
+        self.assertEqual(self._findTitles(2024, 3, 5), ["Other", "Updated"])
+        self.assertEqual(self._findTitles(2024, 3, 6), [])
+
+        self._repository.delete(updatedEvent)
+
+        self.assertIsNone(self._repository.find(event.getId()))
+        self.assertEqual(self._findTitles(2024, 3, 5), ["Other"])
+
+    def testFindAll(self) -> None:
+        self.assertEqual(list(self._repository.findAll()), [])
+
+        event = self._createEvent("One time", datetime.datetime(2024, 3, 5, 10))
+        weekly = self._createEvent(
+            "Weekly", datetime.datetime(2024, 1, 2, 9), "FREQ=WEEKLY"
+        )
+        deleted = self._createEvent("Deleted", datetime.datetime(2024, 3, 6, 10))
+        self._repository.insertMany([event, weekly, deleted])
+        self._repository.delete(deleted)
+        event.setTitle(EventTitle("Updated"))
+        self._repository.update(event)
+
+        self.assertEqual(
+            sorted(str(event.getTitle()) for event in self._repository.findAll()),
+            ["Updated", "Weekly"],
+        )
+
+    def testInsertMany(self) -> None:
+        self._repository.insert(
+            self._createEvent("Before", datetime.datetime(2024, 3, 5, 8))
+        )
+        ids = self._repository.generateIds(3)
+        events = [
+            self._createEvent("One time", datetime.datetime(2024, 3, 5, 10)),
+            self._createEvent(
+                "Weekly", datetime.datetime(2024, 1, 2, 9), "FREQ=WEEKLY"
+            ),
+            self._createEvent("Other", datetime.datetime(2024, 3, 6, 10)),
+        ]
+        events = [
+            Event(
+                id=id,
+                title=event.getTitle(),
+                dateTimeRange=event.getDateTimeRange(),
+                isRecurrent=event.isRecurrent(),
+                recurrenceInterval=event.getRecurrenceInterval(),
+            )
+            for id, event in zip(ids, events)
+        ]
+        self._repository.insertMany(iter(events))
+        self._repository.insertMany([])
+
+        self.assertEqual(len(set(str(id) for id in ids)), 3)
+        self.assertEqual(str(self._repository.find(ids[2]).getTitle()), "Other")
+        self.assertEqual(self._findTitles(2024, 3, 5), ["Before", "One time", "Weekly"])
+        self.assertEqual(self._findTitles(2024, 3, 12), ["Weekly"])
+
+        self._repository.delete(events[0])
+
+        self.assertEqual(self._findTitles(2024, 3, 5), ["Before", "Weekly"])
+        self.assertEqual(self._findTitles(2024, 3, 6), ["Other"])
+
+    def testTransaction(self) -> None:
+        event = self._createEvent("Event", datetime.datetime(2024, 3, 5, 10))
+        other = self._createEvent("Other", datetime.datetime(2024, 3, 5, 12))
+        deleted = self._createEvent("Deleted", datetime.datetime(2024, 3, 5, 14))
+        self._repository.insertMany([event, other, deleted])
+        inserted = self._createEvent("Inserted", datetime.datetime(2024, 3, 5, 16))
+        insertedThenDeleted = self._createEvent(
+            "Inserted then deleted", datetime.datetime(2024, 3, 5, 18)
+        )
+
+        with self._repository.transaction():
+            event.setTitle(EventTitle("Updated"))
+            self._repository.update(event)
+            self._repository.delete(deleted)
+            self._repository.insert(inserted)
+            self._repository.insert(insertedThenDeleted)
+
+            with self._repository.transaction():
+                self._repository.delete(insertedThenDeleted)
+                inserted.setTitle(EventTitle("Inserted and updated"))
+                self._repository.update(inserted)
+
+        self.assertEqual(
+            self._findTitles(2024, 3, 5), ["Inserted and updated", "Other", "Updated"]
+        )
+        self.assertIsNone(self._repository.find(deleted.getId()))
+
+        with self.assertRaises(KeyError):
+            with self._repository.transaction():
+                self._repository.delete(other)
+                self._repository.insert(deleted)
+
+                raise KeyError("discard")
+
+        self.assertEqual(
+            self._findTitles(2024, 3, 5), ["Inserted and updated", "Other", "Updated"]
+        )
+
+    def testFindOverlapping(self) -> None:
+        overnight = self._createEvent(
+            "Overnight",
+            datetime.datetime(2024, 3, 5, 22),
+            duration=datetime.timedelta(hours=4),
+        )
+        self._repository.insertMany(
+            [
+                overnight,
+                self._createEvent("Morning", datetime.datetime(2024, 3, 6, 9)),
+                self._createEvent("Back to back", datetime.datetime(2024, 3, 6, 10)),
+                self._createEvent(
+                    "Daily",
+                    datetime.datetime(2024, 3, 1, 23),
+                    "FREQ=DAILY;COUNT=10",
+                    datetime.timedelta(hours=2),
+                ),
+                self._createEvent(
+                    "Weekly", datetime.datetime(2024, 1, 2, 9), "FREQ=WEEKLY"
+                ),
+            ]
+        )
+
+        def findTitles(
+            startDate: datetime.datetime, endDate: datetime.datetime
+        ) -> list[str]:
+            events = self._repository.findOverlapping(
+                DateTimeRange(
+                    startDate.replace(tzinfo=datetime.timezone.utc),
+                    endDate.replace(tzinfo=datetime.timezone.utc),
+                    True,
+                    False,
+                )
+            )
+
+            return sorted(str(event.getTitle()) for event in events)
+
+        # started on the day before
+        self.assertEqual(
+            findTitles(datetime.datetime(2024, 3, 6), datetime.datetime(2024, 3, 6, 1)),
+            ["Daily", "Overnight"],
+        )
+        self.assertEqual(
+            findTitles(
+                datetime.datetime(2024, 3, 6, 10),
+                datetime.datetime(2024, 3, 6, 10, 30),
+            ),
+            ["Back to back"],
+        )
+        self.assertEqual(
+            findTitles(
+                datetime.datetime(2024, 3, 5, 9, 30),
+                datetime.datetime(2024, 3, 5, 9, 45),
+            ),
+            ["Weekly"],
+        )
+        self.assertEqual(
+            findTitles(
+                datetime.datetime(2024, 3, 11, 0, 30),
+                datetime.datetime(2024, 3, 11, 0, 45),
+            ),
+            ["Daily"],
+        )
+        self.assertEqual(
+            findTitles(
+                datetime.datetime(2024, 3, 12, 0, 30),
+                datetime.datetime(2024, 3, 12, 0, 45),
+            ),
+            [],
+        )
+
+        self._repository.delete(overnight)
+
+        self.assertEqual(
+            findTitles(datetime.datetime(2024, 3, 6), datetime.datetime(2024, 3, 6, 1)),
+            ["Daily"],
+        )
+
+    def testFindOverlappingAfterWrites(self) -> None:
+        event = self._createEvent("Event", datetime.datetime(2024, 3, 5, 10))
+        self._repository.insert(event)
+        dayRange = self._createDayRange(2024, 3, 5)
+
+        def findTitles() -> list[str]:
+            events = self._repository.findOverlapping(dayRange)
+
+            return sorted(str(event.getTitle()) for event in events)
+
+        self.assertEqual(findTitles(), ["Event"])
+
+        # the interval index follows the writes
+        self._repository.insert(
+            self._createEvent(
+                "Daily", datetime.datetime(2024, 3, 1, 8), "FREQ=DAILY;COUNT=10"
+            )
+        )
+        self.assertEqual(findTitles(), ["Daily", "Event"])
+
+        event.setDateTimeRange(
+            EventDateTimeRange(
+                datetime.datetime(2024, 3, 6, 10, tzinfo=datetime.timezone.utc),
+                datetime.datetime(2024, 3, 6, 11, tzinfo=datetime.timezone.utc),
+            )
+        )
+        self._repository.update(event)
+        self.assertEqual(findTitles(), ["Daily"])
+
+        event.setDateTimeRange(
+            EventDateTimeRange(
+                datetime.datetime(2024, 3, 5, 12, tzinfo=datetime.timezone.utc),
+                datetime.datetime(2024, 3, 5, 13, tzinfo=datetime.timezone.utc),
+            )
+        )
+        self._repository.update(event)
+        self.assertEqual(findTitles(), ["Daily", "Event"])
+
+        self._repository.delete(event)
+        self.assertEqual(findTitles(), ["Daily"])
+
+    def testFindOccupiedDates(self) -> None:
+        self._repository.insert(
+            self._createEvent("One time", datetime.datetime(2024, 3, 5, 23, 30))
+        )
+        self._repository.insert(
+            self._createEvent(
+                "Every 2 weeks",
+                datetime.datetime(2024, 1, 2, 9),
+                "FREQ=WEEKLY;INTERVAL=2",
+            )
+        )
+        tzInfo = datetime.timezone(datetime.timedelta(hours=2))
+        startDate = datetime.datetime(2024, 3, 1, tzinfo=tzInfo)
+        range = DateTimeRange(
+            startDate, startDate + datetime.timedelta(days=42), True, False
+        )
+
+        self.assertEqual(
+            self._repository.findOccupiedDates(range),
+            {
+                datetime.date(2024, 3, 6),
+                datetime.date(2024, 3, 12),
+                datetime.date(2024, 3, 26),
+                datetime.date(2024, 4, 9),
+            },
+        )
+
+
+class CsvEventRepositoryTest(EventRepositoryTestMixin, unittest.TestCase):
+    def _createRepository(
+        self, recurrenceChecker: EventRecurrenceRruleChecker = None
+    ) -> CsvEventRepository:
+        filePath = os.path.join(self._dir.name, "events.csv")
+
+        if not os.path.isfile(filePath):
+            with open(filePath, "w"):
+                pass
+
+        if recurrenceChecker is None:
+            recurrenceChecker = EventRecurrenceRruleChecker()
+
+        return CsvEventRepository(
+            idGenerator=EventIdUuidGenerator(),
+            normalizer=self._createNormalizer(),
+            recurrenceChecker=recurrenceChecker,
+            filePath=filePath,
+        )
+
+    def testProfilerCountsRowsAndRewrites(self) -> None:
+        profiler = Profiler(True)
+        event = self._createEvent("Event", datetime.datetime(2024, 3, 5, 10))
+        weekly = self._createEvent(
+            "Weekly", datetime.datetime(2024, 1, 2, 9), "FREQ=WEEKLY"
+        )
+
+        for insertedEvent in [event, weekly]:
+            self._repository.insert(insertedEvent)
+
+        repository = CsvEventRepository(
+            idGenerator=EventIdUuidGenerator(),
+            normalizer=EventNormalizer(
+                idNormalizer=EventIdUuidNormalizer(),
+                intervalNormalizer=EventIntervalRruleNormalizer(),
+                profiler=profiler,
+            ),
+            recurrenceChecker=EventRecurrenceRruleChecker(profiler=profiler),
+            filePath=os.path.join(self._dir.name, "events.csv"),
+            profiler=profiler,
+        )
+        repository.findOccupiedDates(self._createDayRange(2024, 3, 5))
+        repository.findOccupiedDates(self._createDayRange(2024, 3, 5))
+        repository.delete(event)
+        counters = profiler.getStats()["counters"]
+
+        self.assertEqual(counters["CsvEventRepository.rowsRead"], 2)
+        self.assertEqual(counters["CsvEventRepository.fileRewrites"], 1)
+        self.assertEqual(counters["EventNormalizer.denormalize"], 1)
+        self.assertEqual(counters["EventRecurrenceRruleChecker.rruleExpansions"], 1)
+        self.assertEqual(counters["EventRecurrenceRruleChecker.cacheHits"], 1)
+
+    def testIntervalIndexIsUpdatedInPlace(self) -> None:
+        profiler = Profiler(True)
+        repository = CsvEventRepository(
+            idGenerator=EventIdUuidGenerator(),
+            normalizer=self._createNormalizer(),
+            recurrenceChecker=EventRecurrenceRruleChecker(),
+            filePath=os.path.join(self._dir.name, "events.csv"),
+            profiler=profiler,
+        )
+        dayRange = self._createDayRange(2024, 3, 5)
+        event = self._createEvent("Event", datetime.datetime(2024, 3, 5, 10))
+        repository.insert(event)
+
+        self.assertEqual(len(list(repository.findOverlapping(dayRange))), 1)
+
+        repository.insert(self._createEvent("Added", datetime.datetime(2024, 3, 5, 12)))
+        event.setTitle(EventTitle("Updated"))
+        repository.update(event)
+
+        self.assertEqual(
+            sorted(str(e.getTitle()) for e in repository.findOverlapping(dayRange)),
+            ["Added", "Updated"],
+        )
+
+        repository.delete(event)
+
+        self.assertEqual(
+            [str(e.getTitle()) for e in repository.findOverlapping(dayRange)],
+            ["Added"],
+        )
+        counters = profiler.getStats()["counters"]
+        self.assertEqual(counters["CsvEventRepository.intervalIndexBuilds"], 1)
+
+    def testTransactionRewritesFileOnce(self) -> None:
+        profiler = Profiler(True)
+        repository = CsvEventRepository(
+            idGenerator=EventIdUuidGenerator(),
+            normalizer=self._createNormalizer(),
+            recurrenceChecker=EventRecurrenceRruleChecker(),
+            filePath=os.path.join(self._dir.name, "events.csv"),
+            profiler=profiler,
+        )
+        events = [
+            self._createEvent(f"Event {day}", datetime.datetime(2024, 3, day, 10))
+            for day in range(1, 11)
+        ]
+        repository.insertMany(events)
+
+        with repository.transaction():
+            for event in events[:5]:
+                repository.delete(event)
+
+            for event in events[5:]:
+                event.setTitle(EventTitle("Updated"))
+                repository.update(event)
+
+        self.assertEqual(
+            profiler.getStats()["counters"]["CsvEventRepository.fileRewrites"], 1
+        )
+        self.assertEqual(self._findTitles(2024, 3, 5), [])
+        self.assertEqual(self._findTitles(2024, 3, 6), ["Updated"])
+
+    def testEventsAreCachedUntilFileIsChanged(self) -> None:
+        event = self._createEvent("Event", datetime.datetime(2024, 3, 5, 10))
+        other = self._createEvent("Other", datetime.datetime(2024, 3, 6, 10))
+        self._repository.insert(event)
+        cachedEvent = self._repository.find(event.getId())
+
+        self.assertIs(self._repository.find(event.getId()), cachedEvent)
+
+        # writes through the repository keep the parsed events
+        self._repository.insert(other)
+        self.assertIs(self._repository.find(event.getId()), cachedEvent)
+
+        other.setTitle(EventTitle("Updated"))
+        self._repository.update(other)
+        self.assertIs(self._repository.find(event.getId()), cachedEvent)
+        self.assertEqual(self._findTitles(2024, 3, 6), ["Updated"])
+
+        # another repository (e.g. another process) changes the file
+        self._createRepository().delete(other)
+
+        self.assertIsNot(self._repository.find(event.getId()), cachedEvent)
+        self.assertIsNone(self._repository.find(other.getId()))
+        self.assertEqual(self._findTitles(2024, 3, 6), [])
+
+    def testOtherRowsAreNotDecoded(self) -> None:
+        event = self._createEvent("Event", datetime.datetime(2024, 3, 5, 10))
+        self._repository.insert(event)
+
+        # a row which cannot be denormalized (blank title)
+        with open(os.path.join(self._dir.name, "events.csv"), "a", newline="") as file:
+            file.write("1, ,2024-03-05T09:00:00+00:00,2024-03-05T10:00:00+00:00,0,\r\n")
+
+        self.assertEqual(str(self._repository.find(event.getId()).getTitle()), "Event")
+
+        event.setTitle(EventTitle("Updated"))
+        self._repository.update(event)
+
+        self.assertEqual(
+            str(self._repository.find(event.getId()).getTitle()), "Updated"
+        )
+
+        with open(os.path.join(self._dir.name, "events.csv"), newline="") as file:
+            self.assertIn("1, ,2024-03-05T09:00:00+00:00", file.read())
+
+    def testRecurringEventsOutOfBoundsAreSkipped(self) -> None:
+        checker = EventRecurrenceRruleChecker()
+        self._repository = self._createRepository(checker)
+        self._repository.insert(
+            self._createEvent(
+                "Expired", datetime.datetime(2020, 1, 1, 9), "FREQ=DAILY;COUNT=10"
+            )
+        )
+        self._repository.insert(
+            self._createEvent(
+                "Until",
+                datetime.datetime(2020, 1, 1, 9),
+                "FREQ=WEEKLY;UNTIL=20210101T000000Z",
+            )
+        )
+        self._repository.insert(
+            self._createEvent("Future", datetime.datetime(2030, 1, 1, 9), "FREQ=DAILY")
+        )
+
+        self.assertEqual(self._findTitles(2024, 3, 5), [])
+        self.assertEqual(checker.getCache().getMisses(), 0)
+
+        # the bounds are kept when the index is rebuilt
+        self._repository = self._createRepository(checker)
+        os.remove(os.path.join(self._dir.name, "events.csv.idx"))
+
+        self.assertEqual(self._findTitles(2024, 3, 5), [])
+        self.assertEqual(self._findTitles(2020, 1, 8), ["Expired", "Until"])
+        self.assertEqual(self._findTitles(2030, 1, 10), ["Future"])
+        self.assertEqual(checker.getCache().getMisses(), 3)
+
+    def testIndexIsRebuiltWhenStale(self) -> None:
+        event = self._createEvent("Event", datetime.datetime(2024, 3, 5, 10))
+        self._repository.insert(event)
+
+        self.assertEqual(self._findTitles(2024, 3, 5), ["Event"])
+
+        # another repository (e.g. another process) changes the file
+        otherRepository = self._createRepository()
+        otherRepository.insert(
+            self._createEvent("Added", datetime.datetime(2024, 3, 5, 8))
+        )
+        event.setTitle(EventTitle("Updated"))
+        otherRepository.update(event)
+
+        self.assertEqual(self._findTitles(2024, 3, 5), ["Added", "Updated"])
+        self.assertTrue(os.path.isfile(os.path.join(self._dir.name, "events.csv.idx")))
+
+        # a new repository loads the persisted index
+        self._repository = self._createRepository()
+        self.assertEqual(self._findTitles(2024, 3, 5), ["Added", "Updated"])
+
+        otherRepository.delete(event)
+        self.assertEqual(self._findTitles(2024, 3, 5), ["Added"])
+
+
+class EventRecurrenceRruleCheckerTest(unittest.TestCase):
+    def testOccurrencesAreCachedInWindow(self) -> None:
+        checker = EventRecurrenceRruleChecker()
+        startDate = datetime.datetime(2020, 1, 6, 9, tzinfo=datetime.timezone.utc)
+        event = Event(
+            id=EventIdUuidGenerator().generate(),
+            title=EventTitle("Stand-up"),
+            dateTimeRange=EventDateTimeRange(
+                startDate, startDate + datetime.timedelta(minutes=15)
+            ),
+            isRecurrent=True,
+            recurrenceInterval=EventInterval(
+                rrule.rrulestr("FREQ=WEEKLY;BYDAY=MO,WE", dtstart=startDate)
+            ),
+        )
+        tzInfo = datetime.timezone(datetime.timedelta(hours=2))
+        monthStartDate = datetime.datetime(2024, 3, 1, tzinfo=tzInfo)
+        occupiedDays = []
+
+        for day in range(31):
+            dayStartDate = monthStartDate + datetime.timedelta(days=day)
+            dayRange = DateTimeRange(
+                dayStartDate, dayStartDate + datetime.timedelta(days=1), True, False
+            )
+
+            if checker.isStartDateInRange(event, dayRange):
+                occupiedDays.append(dayStartDate.day)
+
+        self.assertEqual(occupiedDays, [4, 6, 11, 13, 18, 20, 25, 27])
+        self.assertEqual(checker.getCache().getMisses(), 1)
+        self.assertEqual(checker.getCache().getHits(), 30)
+
+        # a changed rule is not answered from the cache
+        event.setRecurrence(
+            True,
+            EventInterval(rrule.rrulestr("FREQ=WEEKLY;BYDAY=TU", dtstart=startDate)),
+        )
+        weekRange = DateTimeRange(
+            monthStartDate, monthStartDate + datetime.timedelta(days=7), True, False
+        )
+
+        self.assertEqual(
+            checker.findStartDatesInRange(event, weekRange),
+            [datetime.datetime(2024, 3, 5, 11, tzinfo=tzInfo)],
+        )
+        self.assertEqual(checker.getCache().getMisses(), 2)
+
+    def testStartDatesAreIteratedLazily(self) -> None:
+        checker = EventRecurrenceRruleChecker()
+        startDate = datetime.datetime(2020, 1, 6, 9, tzinfo=datetime.timezone.utc)
+        event = Event(
+            id=EventIdUuidGenerator().generate(),
+            title=EventTitle("Stand-up"),
+            dateTimeRange=EventDateTimeRange(
+                startDate, startDate + datetime.timedelta(minutes=15)
+            ),
+            isRecurrent=True,
+            recurrenceInterval=EventInterval(
+                rrule.rrulestr("FREQ=WEEKLY;BYDAY=MO,WE", dtstart=startDate)
+            ),
+        )
+        tzInfo = datetime.timezone(datetime.timedelta(hours=2))
+        monthRange = DateTimeRange(
+            datetime.datetime(2024, 3, 4, 11, tzinfo=tzInfo),
+            datetime.datetime(2024, 4, 1, tzinfo=tzInfo),
+            False,
+            False,
+        )
+        startDates = checker.iterStartDatesInRange(event, monthRange)
+
+        self.assertEqual(
+            next(startDates), datetime.datetime(2024, 3, 6, 11, tzinfo=tzInfo)
+        )
+        self.assertEqual(
+            list(startDates), checker.findStartDatesInRange(event, monthRange)[1:]
+        )
+        self.assertEqual(
+            list(checker.iterStartDatesInRange(event, DateTimeRange(None, startDate))),
+            [startDate],
+        )
+
+    def testOccurrenceBounds(self) -> None:
+        checker = EventRecurrenceRruleChecker()
+        startDate = datetime.datetime(2024, 1, 31, 9, tzinfo=datetime.timezone.utc)
+        padding = EventRecurrenceRruleChecker.BOUNDS_PADDING
+
+        for rule, lastDate in [
+            ("FREQ=MONTHLY;COUNT=3", startDate.replace(month=5, day=31) + padding),
+            (
+                "FREQ=DAILY;UNTIL=20240210T000000Z",
+                datetime.datetime(2024, 2, 10, tzinfo=datetime.timezone.utc) + padding,
+            ),
+            ("FREQ=WEEKLY", None),
+        ]:
+            event = Event(
+                id=EventIdUuidGenerator().generate(),
+                title=EventTitle("Event"),
+                dateTimeRange=EventDateTimeRange(
+                    startDate, startDate + datetime.timedelta(hours=1)
+                ),
+                isRecurrent=True,
+                recurrenceInterval=EventInterval(
+                    rrule.rrulestr(rule, dtstart=startDate)
+                ),
+            )
+            bounds = checker.findOccurrenceBounds(event)
+
+            self.assertEqual(bounds.getRealStartDate(), startDate)
+            self.assertEqual(bounds.getRealEndDate(), lastDate)
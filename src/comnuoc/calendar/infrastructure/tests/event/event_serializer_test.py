@@ -0,0 +1,43 @@
+import unittest
+
+from comnuoc.calendar.infrastructure.event.event_serializer import (
+    EventIntervalRruleNormalizer,
+)
+from comnuoc.calendar.infrastructure.util.lru_cache import LruCache
+
+
+class EventIntervalRruleNormalizerTest(unittest.TestCase):
+    def testDenormalizeIsCached(self) -> None:
+        normalizer = EventIntervalRruleNormalizer()
+        monday = "DTSTART:20240101T090000\nRRULE:FREQ=WEEKLY;BYDAY=MO,WE"
+        tuesday = "DTSTART:20240102T093000\nRRULE:FREQ=WEEKLY;BYDAY=MO,WE"
+
+        for interval in [monday, tuesday, monday]:
+            self.assertEqual(
+                normalizer.normalize(normalizer.denormalize(interval)), interval
+            )
+
+        # without DTSTART, the rule is parsed as a whole
+        self.assertIn("FREQ=DAILY", str(normalizer.denormalize("RRULE:FREQ=DAILY")))
+        self.assertIsNone(normalizer.denormalize(""))
+        self.assertIs(
+            normalizer.denormalize(monday).getInterval(),
+            normalizer.denormalize(monday).getInterval(),
+        )
+        self.assertEqual(normalizer.getCache().getSize(), 3)
+        self.assertEqual(normalizer.getRuleCache().getSize(), 1)
+        self.assertEqual(normalizer.getRuleCache().getHits(), 1)
+
+    def testCacheSizeIsBounded(self) -> None:
+        cache = LruCache(2)
+        normalizer = EventIntervalRruleNormalizer(cache=cache)
+
+        for day in range(1, 6):
+            normalizer.denormalize(f"DTSTART:202401{day:02d}T090000\nRRULE:FREQ=DAILY")
+
+        normalizer.denormalize("DTSTART:20240105T090000\nRRULE:FREQ=DAILY")
+        normalizer.denormalize("DTSTART:20240101T090000\nRRULE:FREQ=DAILY")
+
+        self.assertEqual(cache.getSize(), 2)
+        self.assertEqual(cache.getHits(), 1)
+        self.assertEqual(cache.getMisses(), 6)
@@ -0,0 +1,135 @@
+import datetime
+import unittest
+import uuid
+
+from dateutil import tz
+
+from comnuoc.calendar.infrastructure.event.event_repository import (
+    EventIdUuidGenerator,
+)
+from comnuoc.calendar.infrastructure.event.event_serializer import (
+    EventIntervalRruleNormalizer,
+)
+from comnuoc.calendar.infrastructure.event.ics_serializer import (
+    IcsEventReader,
+    IcsEventWriter,
+)
+
+
+class IcsSerializerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._reader = IcsEventReader(
+            intervalNormalizer=EventIntervalRruleNormalizer(),
+            idGenerator=EventIdUuidGenerator(),
+        )
+        self._writer = IcsEventWriter(
+            intervalNormalizer=EventIntervalRruleNormalizer(),
+            stampDate=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+        )
+
+    def testRead(self) -> None:
+        lines = [
+            "BEGIN:VCALENDAR",
+            "BEGIN:VEVENT",
+            "UID:meeting@example.com",
+            'DTSTART;TZID="Europe/Paris":20240305T090000',
+            "DURATION:PT1H30M",
+            "SUMMARY:Team\\, weekly",
+            "  meeting",
+            "RRULE:FREQ=WEEKLY;UNTIL=20240319T080000Z",
+            "BEGIN:VALARM",
+            "TRIGGER:-PT15M",
+            "END:VALARM",
+            "END:VEVENT",
+            "BEGIN:VEVENT",
+            "UID:meeting@example.com",
+            "RECURRENCE-ID:20240312T080000Z",
+            "DTSTART:20240312T100000Z",
+            "END:VEVENT",
+            "BEGIN:VEVENT",
+            "DTSTART;VALUE=DATE:20240306",
+            "END:VEVENT",
+            "BEGIN:VEVENT",
+            "DTSTART:20240307T120000",
+            "DTEND:20240307T130000",
+            "RRULE:FREQ=DAILY;UNTIL=20240309",
+            "END:VEVENT",
+            "END:VCALENDAR",
+        ]
+        events = list(self._reader.read(lines, tz.gettz("Asia/Ho_Chi_Minh")))
+
+        self.assertEqual(len(events), 3)
+        meeting, allDay, daily = events
+
+        self.assertEqual(
+            meeting.getId().getId(),
+            uuid.uuid5(IcsEventReader.UID_NAMESPACE, "meeting@example.com"),
+        )
+        self.assertEqual(str(meeting.getTitle()), "Team, weekly meeting")
+        self.assertEqual(
+            meeting.getDateTimeRange().getRealStartDate(),
+            datetime.datetime(2024, 3, 5, 8, tzinfo=datetime.timezone.utc),
+        )
+        self.assertEqual(
+            meeting.getDateTimeRange().getRealEndDate(),
+            datetime.datetime(2024, 3, 5, 9, 30, tzinfo=datetime.timezone.utc),
+        )
+        self.assertEqual(
+            [date.day for date in meeting.getRecurrenceInterval().getInterval()],
+            [5, 12, 19],
+        )
+
+        self.assertEqual(str(allDay.getTitle()), IcsEventReader.DEFAULT_TITLE)
+        self.assertFalse(allDay.isRecurrent())
+        self.assertEqual(
+            allDay.getDateTimeRange().getRealStartDate(),
+            datetime.datetime(2024, 3, 5, 17, tzinfo=datetime.timezone.utc),
+        )
+        self.assertEqual(
+            allDay.getDateTimeRange().getRealEndDate(),
+            datetime.datetime(2024, 3, 6, 17, tzinfo=datetime.timezone.utc),
+        )
+
+        # floating dates are in the given time zone, UNTIL is the end of the day
+        self.assertEqual(
+            [date.day for date in daily.getRecurrenceInterval().getInterval()],
+            [7, 8, 9],
+        )
+
+    def testWriteThenRead(self) -> None:
+        startDate = datetime.datetime(2024, 3, 5, 9, tzinfo=datetime.timezone.utc)
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:{uuid.uuid4()}",
+            "DTSTART:20240305T090000Z",
+            "DTEND:20240305T100000Z",
+            f"SUMMARY:{'Long, title; with ünicode ' * 4}",
+            "RRULE:FREQ=WEEKLY;BYDAY=TU,TH;UNTIL=20240314T090000Z",
+            "END:VEVENT",
+        ]
+        event = next(self._reader.read(lines))
+        writtenLines = list(self._writer.write([event]))
+
+        self.assertEqual(writtenLines[0], "BEGIN:VCALENDAR\r\n")
+        self.assertEqual(writtenLines[-1], "END:VCALENDAR\r\n")
+        self.assertIn("DTSTAMP:20240101T000000Z\r\n", writtenLines)
+        self.assertTrue(all(len(line.encode("utf-8")) <= 77 for line in writtenLines))
+        self.assertTrue(any(line.startswith(" ") for line in writtenLines))
+
+        events = list(self._reader.read(writtenLines))
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].getId(), event.getId())
+        self.assertEqual(str(events[0].getTitle()), str(event.getTitle()))
+        self.assertEqual(events[0].getDateTimeRange().getRealStartDate(), startDate)
+        # as stored intervals, the interval is naive (in UTC)
+        startDate = startDate.replace(tzinfo=None)
+        self.assertEqual(
+            list(events[0].getRecurrenceInterval().getInterval()),
+            [
+                startDate,
+                startDate + datetime.timedelta(days=2),
+                startDate + datetime.timedelta(days=7),
+                startDate + datetime.timedelta(days=9),
+            ],
+        )
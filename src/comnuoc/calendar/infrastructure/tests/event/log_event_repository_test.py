@@ -0,0 +1,60 @@
+import datetime
+import os
+import unittest
+
+from comnuoc.calendar.infrastructure.event.event_repository import (
+    EventIdUuidGenerator,
+    EventRecurrenceRruleChecker,
+)
+from comnuoc.calendar.infrastructure.event.event_serializer import (
+    EventIdUuidNormalizer,
+)
+from comnuoc.calendar.infrastructure.event.log_event_repository import (
+    LogEventRepository,
+)
+from comnuoc.calendar.infrastructure.tests.event.event_repository_test import (
+    EventRepositoryTestMixin,
+)
+
+
+class LogEventRepositoryTest(EventRepositoryTestMixin, unittest.TestCase):
+    def _createRepository(self) -> LogEventRepository:
+        return LogEventRepository(
+            idGenerator=EventIdUuidGenerator(),
+            idNormalizer=EventIdUuidNormalizer(),
+            normalizer=self._createNormalizer(),
+            recurrenceChecker=EventRecurrenceRruleChecker(),
+            filePath=os.path.join(self._dir.name, "events.log"),
+            compactionMinRecords=4,
+            backgroundCompaction=False,
+        )
+
+    def testCompaction(self) -> None:
+        event = self._createEvent("Event", datetime.datetime(2024, 3, 5, 10))
+        other = self._createEvent("Other", datetime.datetime(2024, 3, 5, 12))
+        self._repository.insert(event)
+        self._repository.insert(other)
+        self._repository.update(event)
+
+        self.assertAlmostEqual(self._repository.getDeadRecordsRatio(), 1 / 3)
+
+        # the other repository reads only appended records
+        otherRepository = self._createRepository()
+        self.assertEqual(self._findTitles(2024, 3, 5), ["Event", "Other"])
+
+        self.assertEqual(self.__countRecords(), 3)
+
+        # 3 dead records of 4 records exceed the ratio
+        self._repository.delete(other)
+        self.assertAlmostEqual(self._repository.getDeadRecordsRatio(), 0.0)
+        self.assertEqual(self.__countRecords(), 1)
+
+        self.assertIsNone(otherRepository.find(other.getId()))
+        self.assertEqual(str(otherRepository.find(event.getId()).getTitle()), "Event")
+
+        otherRepository.update(event)
+        self.assertEqual(self._findTitles(2024, 3, 5), ["Event"])
+
+    def __countRecords(self) -> int:
+        with open(os.path.join(self._dir.name, "events.log")) as file:
+            return len(file.readlines())
@@ -0,0 +1,41 @@
+import datetime
+import os
+import unittest
+
+from comnuoc.calendar.infrastructure.event.event_repository import (
+    EventIdUuidGenerator,
+    EventRecurrenceRruleChecker,
+)
+from comnuoc.calendar.infrastructure.event.event_serializer import (
+    EventIdUuidNormalizer,
+)
+from comnuoc.calendar.infrastructure.event.sqlite_event_repository import (
+    SqliteEventRepository,
+)
+from comnuoc.calendar.infrastructure.tests.event.event_repository_test import (
+    EventRepositoryTestMixin,
+)
+
+
+class SqliteEventRepositoryTest(EventRepositoryTestMixin, unittest.TestCase):
+    def tearDown(self) -> None:
+        self._repository.close()
+        super().tearDown()
+
+    def _createRepository(self) -> SqliteEventRepository:
+        return SqliteEventRepository(
+            idGenerator=EventIdUuidGenerator(),
+            idNormalizer=EventIdUuidNormalizer(),
+            normalizer=self._createNormalizer(),
+            recurrenceChecker=EventRecurrenceRruleChecker(),
+            filePath=os.path.join(self._dir.name, "events.sqlite"),
+        )
+
+    def testEventsArePersisted(self) -> None:
+        event = self._createEvent("Event", datetime.datetime(2024, 3, 5, 10))
+        self._repository.insert(event)
+        self._repository.close()
+
+        self._repository = self._createRepository()
+
+        self.assertEqual(self._findTitles(2024, 3, 5), ["Event"])
@@ -0,0 +1,56 @@
+import calendar
+import datetime
+import os
+import tempfile
+import unittest
+
+from comnuoc.calendar.infrastructure.util.setting_repository import (
+    FileSettingRepository,
+)
+
+
+class FileSettingRepositoryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self._filePath = os.path.join(self._dir.name, "settings.ini")
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def testSnapshotIsRefreshedAfterWrite(self) -> None:
+        repository = FileSettingRepository(self._filePath)
+        snapshot = repository.getSnapshot()
+
+        self.assertIsNone(snapshot.getTimeZone())
+        self.assertTrue(snapshot.getIso8601())
+        self.assertEqual(snapshot.getFirstWeekDay(), calendar.MONDAY)
+        self.assertIs(repository.getSnapshot(), snapshot)
+
+        repository.setTimeZone("Asia/Ho_Chi_Minh")
+        repository.setFirstWeekDay(calendar.SUNDAY)
+        snapshot = repository.getSnapshot()
+
+        self.assertEqual(snapshot.getTimeZone(), "Asia/Ho_Chi_Minh")
+        self.assertEqual(snapshot.getFirstWeekDay(), calendar.SUNDAY)
+        self.assertEqual(
+            datetime.datetime(2024, 3, 5, tzinfo=snapshot.getTzInfo()).utcoffset(),
+            datetime.timedelta(hours=7),
+        )
+        self.assertIs(repository.getTzInfo(), snapshot.getTzInfo())
+
+        # values are persisted
+        snapshot = FileSettingRepository(self._filePath).getSnapshot()
+
+        self.assertEqual(snapshot.getTimeZone(), "Asia/Ho_Chi_Minh")
+        self.assertEqual(snapshot.getFirstWeekDay(), calendar.SUNDAY)
+
+    def testLogCompactionRatio(self) -> None:
+        repository = FileSettingRepository(self._filePath)
+
+        self.assertEqual(repository.getLogCompactionRatio(), 0.5)
+
+        repository.setLogCompactionRatio(0.25)
+
+        self.assertEqual(
+            FileSettingRepository(self._filePath).getLogCompactionRatio(), 0.25
+        )
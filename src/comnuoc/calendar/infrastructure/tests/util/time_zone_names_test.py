@@ -0,0 +1,35 @@
+import unittest
+
+from comnuoc.calendar.infrastructure.util.time_zone_names import (
+    TimeZoneNameRepository,
+)
+
+
+class TimeZoneNameRepositoryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._repository = TimeZoneNameRepository()
+
+    def testNamesAreLoadedOnce(self) -> None:
+        names = self._repository.getNames()
+
+        self.assertIsInstance(names, frozenset)
+        self.assertIs(self._repository.getNames(), names)
+        self.assertTrue(self._repository.isValid("Europe/Paris"))
+        self.assertFalse(self._repository.isValid("Europe"))
+        self.assertFalse(self._repository.isValid("europe/paris"))
+
+    def testFindByPrefix(self) -> None:
+        names = self._repository.findNames("europe/pa")
+
+        self.assertIn("Europe/Paris", names)
+        self.assertEqual(names, sorted(names))
+        self.assertTrue(all(name.startswith("Europe/Pa") for name in names))
+        self.assertEqual(len(self._repository.findNames("America/", 3)), 3)
+        self.assertEqual(self._repository.findNames("Unknown/"), [])
+
+    def testDateutilNames(self) -> None:
+        names = self._repository._TimeZoneNameRepository__readDateutilNames()
+
+        self.assertIn("Asia/Ho_Chi_Minh", names)
+        self.assertNotIn("Asia", names)
+        self.assertNotIn("METADATA", names)
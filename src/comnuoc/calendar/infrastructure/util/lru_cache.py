@@ -0,0 +1,59 @@
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Union
+
+
+class LruCache(object):
+    """
+    Size bounded cache which evicts the least recently used item,
+    with hit and miss counters.
+    """
+
+    def __init__(self, maxSize: int = 1024) -> None:
+        if maxSize < 1:
+            raise ValueError("Max size should be greater than 0")
+
+        self._maxSize = maxSize
+        self._items: OrderedDict[Hashable, object] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable, default: object = None) -> Union[object, None]:
+        try:
+            value = self._items[key]
+        except KeyError:
+            self._misses += 1
+
+            return default
+
+        self._items.move_to_end(key)
+        self._hits += 1
+
+        return value
+
+    def set(self, key: Hashable, value: object) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+
+        if len(self._items) > self._maxSize:
+            self._items.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._items.pop(key, None)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def getSize(self) -> int:
+        return len(self._items)
+
+    def getMaxSize(self) -> int:
+        return self._maxSize
+
+    def getHits(self) -> int:
+        return self._hits
+
+    def getMisses(self) -> int:
+        return self._misses
@@ -8,6 +8,36 @@ from dateutil import tz
 from comnuoc.calendar.domain.util.setting_repository import SettingRepository
 
 
+class SettingSnapshot(object):
+    """
+    Immutable resolved values of the settings which are read in hot paths.
+    """
+
+    def __init__(
+        self,
+        timeZone: Union[str, None],
+        tzInfo: Union[datetime.tzinfo, None],
+        iso8601: bool,
+        firstWeekDay: int,
+    ) -> None:
+        self._timeZone = timeZone
+        self._tzInfo = tzInfo
+        self._iso8601 = iso8601
+        self._firstWeekDay = firstWeekDay
+
+    def getTimeZone(self) -> Union[str, None]:
+        return self._timeZone
+
+    def getTzInfo(self) -> Union[datetime.tzinfo, None]:
+        return self._tzInfo
+
+    def getIso8601(self) -> bool:
+        return self._iso8601
+
+    def getFirstWeekDay(self) -> int:
+        return self._firstWeekDay
+
+
 class FileSettingRepository(SettingRepository):
     def __init__(
         self,
@@ -17,6 +47,8 @@ class FileSettingRepository(SettingRepository):
         settingIso8601: str = "iso8601",
         settingFirstWeekDay: str = "firstWeekDay",
         settingEventsFilePath: str = "eventsFilePath",
+        settingEventsStorage: str = "eventsStorage",
+        settingLogCompactionRatio: str = "logCompactionRatio",
     ) -> None:
         self._filePath = filePath
         self._section = section
@@ -27,6 +59,9 @@ class FileSettingRepository(SettingRepository):
         self._settingIso8601 = settingIso8601
         self._settingFirstWeekDay = settingFirstWeekDay
         self._settingEventsFilePath = settingEventsFilePath
+        self._settingEventsStorage = settingEventsStorage
+        self._settingLogCompactionRatio = settingLogCompactionRatio
+        self._snapshot: Union[SettingSnapshot, None] = None
 
     def get(self, key: str, default: str = "") -> str:
         return self._config.get(self._section, key, fallback=default)
@@ -44,10 +79,26 @@ class FileSettingRepository(SettingRepository):
         with open(self._filePath, "w") as file:
             self._config.write(file)
 
-    def getTzInfo(self) -> datetime.tzinfo:
-        timeZoneName = self.getTimeZone()
+        self._snapshot = None
+
+    def getSnapshot(self) -> SettingSnapshot:
+        """
+        Return the current values of the settings,
+        resolved once and refreshed only after new values are written.
+        """
+        if self._snapshot is None:
+            timeZone = self.getTimeZone()
+            self._snapshot = SettingSnapshot(
+                timeZone=timeZone,
+                tzInfo=tz.gettz(timeZone),
+                iso8601=self.getIso8601(),
+                firstWeekDay=self.getFirstWeekDay(),
+            )
 
-        return tz.gettz(timeZoneName)
+        return self._snapshot
+
+    def getTzInfo(self) -> datetime.tzinfo:
+        return self.getSnapshot().getTzInfo()
 
     def getTimeZone(self, default: str = None) -> Union[str, None]:
         timeZone = self.get(self._settingTimeZone, default)
@@ -92,3 +143,17 @@ class FileSettingRepository(SettingRepository):
 
     def setEventsFilePath(self, path: str) -> None:
         self.set(self._settingEventsFilePath, path)
+
+    def getEventsStorage(self, default: str = "csv") -> str:
+        return self.get(self._settingEventsStorage, default)
+
+    def setEventsStorage(self, storage: str) -> None:
+        self.set(self._settingEventsStorage, storage)
+
+    def getLogCompactionRatio(self, default: float = 0.5) -> float:
+        value = self.get(self._settingLogCompactionRatio, default)
+
+        return float(value)
+
+    def setLogCompactionRatio(self, ratio: float) -> None:
+        self.set(self._settingLogCompactionRatio, str(ratio))
@@ -0,0 +1,77 @@
+import bisect
+import os
+import threading
+from typing import Union
+
+
+class TimeZoneNameRepository(object):
+    """
+    Names of the available time zones, loaded once on first use.
+    """
+
+    def __init__(self) -> None:
+        self._names: Union[frozenset[str], None] = None
+        # (lower-cased name, name) sorted, for case-insensitive prefix search
+        self._sortedNames: list[tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    def getNames(self) -> frozenset[str]:
+        if self._names is None:
+            with self._lock:
+                if self._names is None:
+                    names = self.__readAvailableNames()
+
+                    if 0 == len(names):
+                        names = self.__readDateutilNames()
+
+                    self._sortedNames = sorted((name.lower(), name) for name in names)
+                    self._names = frozenset(names)
+
+        return self._names
+
+    def isValid(self, name: str) -> bool:
+        return name in self.getNames()
+
+    def findNames(self, prefix: str = "", limit: int = None) -> list[str]:
+        """
+        Return the sorted names which start with the prefix (case-insensitive).
+        """
+        self.getNames()
+        prefix = prefix.lower()
+        position = bisect.bisect_left(self._sortedNames, (prefix, ""))
+        names = []
+
+        for lowerName, name in self._sortedNames[position:]:
+            if not lowerName.startswith(prefix) or len(names) == limit:
+                break
+
+            names.append(name)
+
+        return names
+
+    def __readAvailableNames(self) -> set[str]:
+        """
+        Names from the system time zone database (or the tzdata package).
+        """
+        import zoneinfo
+
+        return zoneinfo.available_timezones()
+
+    def __readDateutilNames(self) -> set[str]:
+        """
+        Names from the tarball bundled with dateutil.
+        """
+        import tarfile
+
+        from dateutil import zoneinfo
+
+        filePath = os.path.join(
+            os.path.dirname(os.path.abspath(zoneinfo.__file__)), zoneinfo.ZONEFILENAME
+        )
+
+        with tarfile.open(filePath) as zonesFile:
+            return set(
+                member.name
+                for member in zonesFile.getmembers()
+                if member.isfile() and zoneinfo.METADATA_FN != member.name
+            )
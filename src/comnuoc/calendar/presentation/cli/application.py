@@ -1,107 +1,205 @@
 from comnuoc.calendar.application.service_container import ServiceContainer
 
-from comnuoc.calendar.presentation.cli.controller.calendar_controller import (
-    CalendarController,
-)
-from comnuoc.calendar.presentation.cli.controller.event_controller import (
-    EventController,
-)
-from comnuoc.calendar.presentation.cli.controller.setting_controller import (
-    SettingController,
-)
-
-from comnuoc.calendar.presentation.cli.helper.calendar_formatter import (
-    CalendarFormatter,
-)
-from comnuoc.calendar.presentation.cli.helper.event_formatter import EventFormatter
 from comnuoc.calendar.presentation.cli.helper.input_helper import InputHelper
 from comnuoc.calendar.presentation.cli.helper.menu_formatter import MenuFormatter
-from comnuoc.calendar.presentation.cli.helper.recurrence_event_input_helper import (
-    RecurrenceEventInputHelper,
-)
 
 
 class Application(object):
-    def __init__(self) -> None:
-        serviceContainer = ServiceContainer()
-        settingService = serviceContainer.getSettingService()
+    """
+    Controllers (and the modules they need) are created on first use.
+    When profiling, the stats of each action are printed as a summary (profile)
+    and/or appended as a JSON line to a file (profileOutputPath).
+    """
 
+    # @todo: implement update settings feature
+    MENU_OPTIONS = [
+        " 1  View month",
+        " 2. View week",
+        " 3. View year",
+        " 4. View today events",
+        " 5. View events on a day",
+        " 6. View event detail",
+        " 7. Search events",
+        " 8. Add event",
+        " 9. Update event",
+        "10. Delete event",
+        "11. Update settings",
+        "12. Exit",
+    ]
+    MENU_PROMPT = "Choose your action"
+    UPDATE_SETTINGS_ACTION = 11
+    # any action which is not in the menu exits too
+    EXIT_ACTION = 12
+
+    def __init__(
+        self,
+        settingsPath: str = None,
+        profile: bool = False,
+        profileOutputPath: str = None,
+    ) -> None:
+        self._settingsPath = settingsPath
+        self._profile = profile
+        self._profileOutputPath = profileOutputPath
+        self._serviceContainer = ServiceContainer(
+            settingsPath, profile or profileOutputPath is not None
+        )
         self._inputHelper = InputHelper()
         self._menuFormatter = MenuFormatter()
-        self._calendarController = CalendarController(
-            inputHelper=self._inputHelper,
-            menuFormatter=self._menuFormatter,
-            settingService=settingService,
-            calendarService=serviceContainer.getCalendarService(),
-            calendarFormatter=CalendarFormatter(settingService.getFirstWeekDay()),
-        )
-        self._eventController = EventController(
-            inputHelper=self._inputHelper,
-            settingService=settingService,
-            eventService=serviceContainer.getEventService(),
-            menuFormatter=self._menuFormatter,
-            eventFormatter=EventFormatter(),
-            recurrenceEventInputHelper=RecurrenceEventInputHelper(self._inputHelper),
-        )
-        self._settingController = SettingController(
-            inputHelper=self._inputHelper,
-            menuFormatter=self._menuFormatter,
-            settingService=settingService,
-        )
+        self._calendarController = None
+        self._eventController = None
+        self._settingController = None
 
     def run(self, clearScreen: bool = False) -> None:
         if clearScreen:
             self._inputHelper.clearScreen()
 
-        self._eventController.displayTodayEvents()
+        builtServices = self.__startProfile()
+        self.__getEventController().displayTodayEvents()
+        self.__reportProfile("View today events", builtServices)
         self.__displayMenu(clearScreen)
 
     def __displayMenu(self, clearScreen: bool = False) -> None:
-        # @todo: implement update settings feature
-        options = [
-            " 1  View month",
-            " 2. View week",
-            " 3. View today events",
-            " 4. View events on a day",
-            " 5. View event detail",
-            " 6. Add event",
-            " 7. Update event",
-            " 8. Delete event",
-            " 9. Update settings",
-            "10. Exit",
-        ]
+        options = self.MENU_OPTIONS
 
         print()
         print(self._menuFormatter.formatTitle("Calendar"))
         print(self._menuFormatter.formatOptions(options))
         print()
 
-        action = self._inputHelper.inputInt("Choose your action")
+        action = self._inputHelper.inputInt(self.MENU_PROMPT)
+        builtServices = self.__startProfile()
 
         if clearScreen:
             self._inputHelper.clearScreen()
 
         if 1 == action:
-            self._calendarController.displayMonth()
+            self.__getCalendarController().displayMonth()
         elif 2 == action:
-            self._calendarController.displayWeek()
+            self.__getCalendarController().displayWeek()
         elif 3 == action:
-            self._eventController.displayTodayEvents()
+            self.__getCalendarController().displayYear()
         elif 4 == action:
-            self._eventController.displayDayEvents()
+            self.__getEventController().displayTodayEvents()
         elif 5 == action:
-            self._eventController.displayEventDetail()
+            self.__getEventController().displayDayEvents()
         elif 6 == action:
-            self._eventController.addEvent()
+            self.__getEventController().displayEventDetail()
         elif 7 == action:
-            self._eventController.updateEvent()
+            self.__getEventController().searchEvents()
         elif 8 == action:
-            self._eventController.deleteEvent()
+            self.__getEventController().addEvent()
         elif 9 == action:
-            self._settingController.updateSettings()
-            # restart application in order to use new settings
-            self.__init__()
+            self.__getEventController().updateEvent()
+        elif 10 == action:
+            self.__getEventController().deleteEvent()
+        elif self.UPDATE_SETTINGS_ACTION == action:
+            self.__getSettingController().updateSettings()
         else:
             return
 
+        self.__reportProfile(options[action - 1][4:], builtServices)
+
+        if self.UPDATE_SETTINGS_ACTION == action:
+            # restart application in order to use new settings
+            self.__init__(self._settingsPath, self._profile, self._profileOutputPath)
+
         self.__displayMenu(clearScreen)
+
+    def __startProfile(self) -> set[str]:
+        """
+        Reset the profiler and return the names of the services built so far.
+        """
+        self._serviceContainer.getProfiler().reset()
+
+        return set(self._serviceContainer.getConstructionTimes())
+
+    def __reportProfile(self, action: str, builtServices: set[str]) -> None:
+        profiler = self._serviceContainer.getProfiler()
+
+        if not profiler.isEnabled():
+            return
+
+        stats = profiler.getStats()
+        # services built during the action
+        stats["constructionTimes"] = {
+            name: seconds
+            for name, seconds in self._serviceContainer.getConstructionTimes().items()
+            if name not in builtServices
+        }
+
+        if self._profile:
+            from comnuoc.calendar.presentation.cli.helper.profile_formatter import (
+                ProfileFormatter,
+            )
+
+            print()
+            print(
+                self._menuFormatter.formatContent(
+                    ProfileFormatter().formatStats(action, stats), True
+                )
+            )
+
+        if self._profileOutputPath is not None:
+            import json
+
+            with open(self._profileOutputPath, "a", encoding="utf-8") as file:
+                file.write(json.dumps({"action": action, **stats}) + "\n")
+
+    def __getCalendarController(self):
+        if self._calendarController is None:
+            from comnuoc.calendar.presentation.cli.controller.calendar_controller import (
+                CalendarController,
+            )
+            from comnuoc.calendar.presentation.cli.helper.calendar_formatter import (
+                CalendarFormatter,
+            )
+
+            settingService = self._serviceContainer.getSettingService()
+            self._calendarController = CalendarController(
+                inputHelper=self._inputHelper,
+                menuFormatter=self._menuFormatter,
+                settingService=settingService,
+                calendarService=self._serviceContainer.getCalendarService(),
+                calendarFormatter=CalendarFormatter(settingService.getFirstWeekDay()),
+            )
+
+        return self._calendarController
+
+    def __getEventController(self):
+        if self._eventController is None:
+            from comnuoc.calendar.presentation.cli.controller.event_controller import (
+                EventController,
+            )
+            from comnuoc.calendar.presentation.cli.helper.event_formatter import (
+                EventFormatter,
+            )
+            from comnuoc.calendar.presentation.cli.helper.recurrence_event_input_helper import (
+                RecurrenceEventInputHelper,
+            )
+
+            self._eventController = EventController(
+                inputHelper=self._inputHelper,
+                settingService=self._serviceContainer.getSettingService(),
+                eventService=self._serviceContainer.getEventService(),
+                menuFormatter=self._menuFormatter,
+                eventFormatter=EventFormatter(),
+                recurrenceEventInputHelper=RecurrenceEventInputHelper(
+                    self._inputHelper
+                ),
+            )
+
+        return self._eventController
+
+    def __getSettingController(self):
+        if self._settingController is None:
+            from comnuoc.calendar.presentation.cli.controller.setting_controller import (
+                SettingController,
+            )
+
+            self._settingController = SettingController(
+                inputHelper=self._inputHelper,
+                menuFormatter=self._menuFormatter,
+                settingService=self._serviceContainer.getSettingService(),
+            )
+
+        return self._settingController
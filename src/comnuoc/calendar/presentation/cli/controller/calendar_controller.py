@@ -59,3 +59,20 @@ class CalendarController(object):
                 self._calendarFormatter.formatWeek(year, weekNumber, dates), True, 53
             )
         )
+
+    def displayYear(self) -> None:
+        print()
+        print(self._menuFormatter.formatTitle("Calendar - View Year"))
+        print()
+
+        now = self._settingService.getNow()
+        year = self._inputHelper.inputYear(now["year"])
+
+        yearDates = self._calendarService.getYearDates(year)
+
+        print()
+        print(
+            self._menuFormatter.formatContent(
+                self._calendarFormatter.formatYear(year, yearDates), True
+            )
+        )
@@ -74,6 +74,29 @@ class EventController(object):
                 )
             )
 
+    def searchEvents(self) -> None:
+        print()
+        print(self._menuFormatter.formatTitle("Calendar - Search Events"))
+        print()
+
+        query = self._inputHelper.inputNotBlankStr("Title")
+        events = self._eventService.searchEvents(query)
+
+        print()
+
+        if 0 == len(events):
+            self._inputHelper.printInfoMessage("There is no matching event")
+
+            return
+
+        for event in events:
+            print(
+                self._menuFormatter.formatContent(
+                    self._eventFormatter.formatEvent(event), True
+                )
+            )
+            print()
+
     def addEvent(self) -> None:
         print()
         print(self._menuFormatter.formatTitle("Calendar - Add Event"))
@@ -96,6 +119,7 @@ class EventController(object):
                 self._eventFormatter.formatEvent(eventDto), True
             )
         )
+        self.__warnConflicts(eventDto)
 
     def updateEvent(self) -> None:
         print()
@@ -134,6 +158,7 @@ class EventController(object):
                 self._eventFormatter.formatEvent(eventDto), True
             )
         )
+        self.__warnConflicts(eventDto)
 
     def deleteEvent(self) -> None:
         print()
@@ -200,6 +225,15 @@ class EventController(object):
 
         return defaultDto
 
+    def __warnConflicts(self, eventDto: EventDto) -> None:
+        conflicts = self._eventService.findConflicts(eventDto)
+
+        if 0 == len(conflicts):
+            return
+
+        titles = ", ".join(f'"{conflict.title}"' for conflict in conflicts)
+        self._inputHelper.printWarningMessage(f"Event overlaps {titles}")
+
     def __inputEvent(self, defaultDto: EventDto) -> EventDto:
         eventDto = EventDto()
 
@@ -20,15 +20,19 @@ class SettingController(object):
         defaultTimeZone = self._settingService.getTimeZone()
         defaultIso8601 = self._settingService.getIso8601()
         defaultWeekStart = self._settingService.getFirstWeekDay()
-        defaultEventsPath = self._settingService.getEventsFilePath()
+        defaultEventsStorage = self._settingService.getEventsStorage()
 
         print()
         print(self._menuFormatter.formatTitle("Calendar - Settings"))
         print()
 
         timeZone = self._inputHelper.inputStr(
-            message="Time Zone",
+            message="Time Zone (press Tab to complete)",
             default=defaultTimeZone,
+            validator=lambda val: "" == val.strip()
+            or self._settingService.isTimeZoneValid(val.strip()),
+            errorMessage="Unknown time zone.",
+            completer=lambda prefix: self._settingService.findTimeZones(prefix, 50),
         )
         timeZone = timeZone.strip()
 
@@ -47,12 +51,36 @@ class SettingController(object):
         weekStart = weekStart.upper()
         weekStart = EventDto.RECURRENCE_WEEKDAYS.index(weekStart)
 
-        eventsPath = self._inputHelper.inputStr("Events File", defaultEventsPath)
+        eventsStorages = list(SettingService.EVENTS_STORAGES)
+        eventsStorage = self._inputHelper.inputStr(
+            message=f"Events Storage ({', '.join(eventsStorages)})",
+            default=defaultEventsStorage,
+            validator=lambda val: val.lower() in eventsStorages,
+            errorMessage="Wrong events storage.",
+        )
+        eventsStorage = eventsStorage.lower()
+
+        if eventsStorage == defaultEventsStorage:
+            defaultEventsPath = self._settingService.getEventsFilePath()
+        else:
+            # the file of the previous storage cannot be read by the new one
+            defaultEventsPath = self._settingService.getDefaultEventsFilePath(
+                eventsStorage
+            )
+
+        eventsPath = self._inputHelper.inputStr(
+            message="Events File",
+            default=defaultEventsPath,
+            validator=lambda val: val == defaultEventsPath
+            or self._settingService.isEventsFilePathValid(val, eventsStorage),
+            errorMessage="The events file extension does not match the storage.",
+        )
 
         try:
             self._settingService.setTimeZone(timeZone)
             self._settingService.setIso8601(iso8601)
             self._settingService.setFirstWeekDay(weekStart)
+            self._settingService.setEventsStorage(eventsStorage)
             self._settingService.setEventsFilePath(eventsPath)
         except Exception as e:
             print()
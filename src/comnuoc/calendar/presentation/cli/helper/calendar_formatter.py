@@ -56,6 +56,45 @@ class CalendarFormatter(object):
 
         return content
 
+    def formatYear(
+        self,
+        year: int,
+        yearDates: list[CalendarService.MonthDatesResponse],
+        columns: int = 3,
+        width: int = 3,
+        spacing: int = 3,
+    ) -> str:
+        """
+        Format the months side by side, by rows of columns months.
+        """
+        columns = max(1, columns)
+        width = max(3, width)
+        monthWidth = 8 * (width + 1) - 1
+        content = [str(year).center(columns * (monthWidth + spacing) - spacing), ""]
+
+        for i in range(0, len(yearDates), columns):
+            monthsLines = [
+                self.formatMonth(year, month, weekDates, width, 1).splitlines()
+                for month, weekDates in yearDates[i : i + columns]
+            ]
+            height = max(len(monthLines) for monthLines in monthsLines)
+
+            for row in range(height):
+                content.append(
+                    (" " * spacing)
+                    .join(
+                        (monthLines[row] if row < len(monthLines) else "").ljust(
+                            monthWidth
+                        )
+                        for monthLines in monthsLines
+                    )
+                    .rstrip()
+                )
+
+            content.append("")
+
+        return "\n".join(content).rstrip()
+
     def formatDay(self, day: int, hasEvent: bool, width: int) -> str:
         if 0 == day:
             content = " "
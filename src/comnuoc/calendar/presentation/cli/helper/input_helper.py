@@ -1,8 +1,27 @@
 from collections.abc import Callable
-from colorama import Fore, Back, Style
+from types import ModuleType
 import os
 from typing import Union
 
+try:
+    import readline
+except ImportError:  # e.g. on Windows
+    readline = None
+
+# colorama, imported on the first colored message (the menu does not need it)
+_colorama: Union[ModuleType, None] = None
+
+
+def _getColorama() -> ModuleType:
+    global _colorama
+
+    if _colorama is None:
+        import colorama
+
+        _colorama = colorama
+
+    return _colorama
+
 
 class InputHelper(object):
     def clearScreen(self) -> None:
@@ -109,12 +128,13 @@ class InputHelper(object):
         validator: Callable[[str], bool] = None,
         defaultInMessage: bool = True,
         errorMessage: str = None,
+        completer: Callable[[str], list[str]] = None,
     ) -> str:
         if defaultInMessage:
             message = self.messageWithDefault(message, default)
 
         while True:
-            value = input(message)
+            value = self.__inputWithCompleter(message, completer)
 
             if default is not None and "" == value:
                 value = default
@@ -279,20 +299,56 @@ class InputHelper(object):
         return message
 
     def printErrorMessage(self, message: str) -> None:
-        self.printMessageWithColor(message, Back.RED, Fore.WHITE)
+        colorama = _getColorama()
+        self.printMessageWithColor(message, colorama.Back.RED, colorama.Fore.WHITE)
 
     def printSuccessMessage(self, message: str) -> None:
-        self.printMessageWithColor(message, Back.GREEN, Fore.WHITE)
+        colorama = _getColorama()
+        self.printMessageWithColor(message, colorama.Back.GREEN, colorama.Fore.WHITE)
 
     def printInfoMessage(self, message: str) -> None:
-        self.printMessageWithColor(message, Back.CYAN, Fore.WHITE)
+        colorama = _getColorama()
+        self.printMessageWithColor(message, colorama.Back.CYAN, colorama.Fore.WHITE)
 
     def printWarningMessage(self, message: str) -> None:
-        self.printMessageWithColor(message, Back.YELLOW, Fore.BLACK)
+        colorama = _getColorama()
+        self.printMessageWithColor(message, colorama.Back.YELLOW, colorama.Fore.BLACK)
 
     def printMessageWithColor(self, message: str, bgColor: int, fgColor: int) -> None:
         recLen = len(message) + 2
         print(bgColor + fgColor + " " * recLen)
         print(" " + message + " ")
-        print(" " * recLen + Style.RESET_ALL)
+        print(" " * recLen + _getColorama().Style.RESET_ALL)
         print()
+
+    def __inputWithCompleter(
+        self, message: str, completer: Union[Callable[[str], list[str]], None]
+    ) -> str:
+        """
+        Input with completions (by the Tab key) if readline is available.
+        """
+        if completer is None or readline is None:
+            return input(message)
+
+        matches = []
+
+        def complete(text: str, state: int) -> Union[str, None]:
+            if 0 == state:
+                matches[:] = completer(text)
+
+            if state < len(matches):
+                return matches[state]
+
+            return None
+
+        oldCompleter = readline.get_completer()
+        oldDelims = readline.get_completer_delims()
+        readline.set_completer(complete)
+        readline.set_completer_delims("")
+        readline.parse_and_bind("tab: complete")
+
+        try:
+            return input(message)
+        finally:
+            readline.set_completer(oldCompleter)
+            readline.set_completer_delims(oldDelims)
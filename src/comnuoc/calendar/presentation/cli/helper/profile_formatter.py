@@ -0,0 +1,16 @@
+class ProfileFormatter(object):
+    def formatStats(self, action: str, stats: dict[str, dict]) -> str:
+        content = [f"Profile of: {action}"]
+
+        for name, timer in stats["timers"].items():
+            content.append(
+                f"{timer['seconds'] * 1000:10.3f} ms {timer['calls']:>6} calls  {name}"
+            )
+
+        for name, count in stats["counters"].items():
+            content.append(f"{count:>23}  {name}")
+
+        for name, seconds in stats.get("constructionTimes", {}).items():
+            content.append(f"{seconds * 1000:10.3f} ms   built  {name}")
+
+        return "\n".join(content)
@@ -0,0 +1,66 @@
+import contextlib
+import io
+import os
+import unittest
+from unittest import mock
+
+from comnuoc.calendar.application.tests.service_container_test_mixin import (
+    ServiceContainerTestMixin,
+)
+
+from comnuoc.calendar.presentation.cli.controller.setting_controller import (
+    SettingController,
+)
+from comnuoc.calendar.presentation.cli.helper.input_helper import InputHelper
+from comnuoc.calendar.presentation.cli.helper.menu_formatter import MenuFormatter
+
+
+class SettingControllerTest(ServiceContainerTestMixin, unittest.TestCase):
+    def _updateSettings(self, answers: list[str]) -> str:
+        """
+        Answer the prompts (time zone, ISO 8601, first week day, storage,
+        events file...) and return the output.
+        """
+        controller = SettingController(
+            inputHelper=InputHelper(),
+            menuFormatter=MenuFormatter(),
+            settingService=self._container.getSettingService(),
+        )
+        output = io.StringIO()
+
+        with mock.patch("builtins.input", side_effect=answers):
+            with contextlib.redirect_stdout(output):
+                controller.updateSettings()
+
+        return output.getvalue()
+
+    def testSwitchEventsStorage(self) -> None:
+        settingService = self._container.getSettingService()
+        sqlitePath = os.path.join(self._dir.name, "events.sqlite")
+
+        # the CSV file is rejected for the new storage
+        output = self._updateSettings(
+            ["", "", "", "sqlite", self._eventsPath, sqlitePath]
+        )
+
+        self.assertIn("The events file extension does not match the storage.", output)
+        self.assertEqual(settingService.getEventsStorage(), "sqlite")
+        self.assertEqual(settingService.getEventsFilePath(), sqlitePath)
+
+        # the file of the new storage is the default
+        self._updateSettings(["", "", "", "binary", ""])
+
+        self.assertEqual(settingService.getEventsStorage(), "binary")
+        self.assertEqual(
+            settingService.getEventsFilePath(),
+            settingService.getDefaultEventsFilePath("binary"),
+        )
+
+        # the file is kept if the storage is not changed
+        self._updateSettings(["", "", "", "sqlite", sqlitePath])
+        self._updateSettings(["", "", "", "", ""])
+
+        self.assertEqual(settingService.getEventsFilePath(), sqlitePath)
+        self.assertEqual(
+            self._container.getEventService().getEventsByDate(2024, 3, 5), []
+        )